@@ -0,0 +1,87 @@
+"""
+Block 内存基准：原先逐三角形生成的块体列表与紧凑数组（z 堆栈 + int32 三角网 + 惰性块体视图）的峰值内存。
+
+峰值由 tracemalloc 统计（含 NumPy 数组分配，不含 VTK 内部内存）。
+层面直接由合成解析曲面生成，不做克里金插值。
+
+用法（在 modelshow_back_end 目录下）:
+    python -m benchmarks.bench_block_memory --grids 80 200 500 --layers 6
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+import numpy as np
+from scipy.spatial import Delaunay
+
+from src.model_build.build_block_pyvista import Block
+
+from .synthetic import base_surface
+
+
+def make_stack(n, num_layers, extent=2000.0, thickness=20.0):
+    """n×n 规则网格与 num_layers+1 个层面的 z 值。"""
+    gx, gy = np.meshgrid(np.linspace(0, extent, n), np.linspace(0, extent, n))
+    xy = np.column_stack((gx.ravel(), gy.ravel()))
+    base = base_surface(xy[:, 0], xy[:, 1], extent)
+    z_list = [base + i * thickness * (1 + 0.2 * np.sin(xy[:, 0] / extent * (i + 1))) for i in range(num_layers + 1)]
+    return xy, z_list
+
+
+def legacy_blocks(xy, z_list, idx):
+    """原 build_prism_blocks 的做法：每个三角形一个由 6 个行视图组成的列表。"""
+    layer_list = [np.column_stack((xy[:, 0], xy[:, 1], z)) for z in z_list]
+    upper, lower = layer_list[idx], layer_list[idx + 1]
+    simplices = Delaunay(upper[:, :2]).simplices
+    blocks = []
+    for tri_ids in simplices:
+        A, B, C = upper[tri_ids]
+        A_, B_, C_ = lower[tri_ids]
+        blocks.append([A, B, C, A_, B_, C_])
+    return layer_list, blocks
+
+
+def compact_blocks(xy, z_list, idx, dtype):
+    block = Block(xy=xy, z_list=z_list, dtype=dtype)
+    blocks = block.build_prism_blocks(block.layer_points(idx), block.layer_points(idx + 1))
+    return block, blocks
+
+
+def measure(func, *args):
+    gc.collect()
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    result = func(*args)
+    seconds = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    gc.collect()
+    return peak, seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Block 内存基准")
+    parser.add_argument("--grids", type=int, nargs="*", default=[80, 200, 500])
+    parser.add_argument("--layers", type=int, default=6)
+    parser.add_argument("--legacy-max", type=int, default=500, help="原实现只测到该网格规模")
+    args = parser.parse_args()
+
+    print(f"{'网格':>8}{'三角形':>10}  {'方式':<16}{'峰值(MB)':>10}{'耗时(s)':>9}")
+    for n in args.grids:
+        xy, z_list = make_stack(n, args.layers)
+        triangles = 2 * (n - 1) ** 2
+        cases = [
+            ("紧凑 float64", compact_blocks, (xy, z_list, 0, np.float64)),
+            ("紧凑 float32", compact_blocks, (xy, z_list, 0, np.float32)),
+        ]
+        if n <= args.legacy_max:
+            cases.insert(0, ("原实现(列表)", legacy_blocks, (xy, z_list, 0)))
+        for label, func, func_args in cases:
+            peak, seconds = measure(func, *func_args)
+            print(f"{n}x{n:<4}{triangles:>10}  {label:<16}{peak / 1e6:>10.1f}{seconds:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
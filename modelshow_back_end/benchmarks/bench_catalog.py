@@ -0,0 +1,80 @@
+"""
+模型列表基准：逐目录遍历 + stat（原 /api/models）与 SQLite 模型目录索引的耗时对比。
+
+在临时目录中复制生成大量小模型文件，分别测量：
+原遍历方式、首次 sync（解析全部 glTF 头）、无变化时的增量 sync、分页查询与带筛选的查询。
+
+用法（在 modelshow_back_end 目录下）:
+    python -m benchmarks.bench_catalog --models 5000
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime
+
+from src.model_build.build_block_pyvista import Block
+from src.model_build.catalog import ModelCatalog
+
+from .bench_block_memory import make_stack
+
+
+def legacy_listing(directory):
+    """原 api_models 的遍历方式。"""
+    models = []
+    for f in os.scandir(directory):
+        if f.name.lower().endswith((".gltf", ".glb")):
+            st = f.stat()
+            models.append({"name": f.name, "size": st.st_size,
+                           "lastModified": datetime.fromtimestamp(st.st_mtime).isoformat()})
+    return models
+
+
+def timed(func, *args, repeat=5, **kwargs):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = func(*args, **kwargs)
+        best = min(best, time.perf_counter() - t0)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="模型目录索引基准")
+    parser.add_argument("--models", type=int, default=5000)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="catalog_bench_")
+    try:
+        models_dir = os.path.join(root, "model_gltf")
+        xy, z_list = make_stack(20, 4)
+        template = os.path.join(root, "template.glb")
+        Block(xy=xy, z_list=z_list, layer_names=["a", "b", "c", "d"]).export_to_gltf_shared(template)
+        os.makedirs(models_dir)
+        for i in range(args.models):
+            shutil.copyfile(template, os.path.join(models_dir, f"model_{i:05d}.glb"))
+        directories = {models_dir: "gltf"}
+
+        listing, t_legacy = timed(legacy_listing, models_dir)
+        print(f"{args.models} 个模型")
+        print(f"  遍历目录 + stat（原方式）      {t_legacy * 1000:9.2f} ms  ({len(listing)} 条，无地层/顶点信息)")
+
+        catalog = ModelCatalog(os.path.join(root, "catalog.sqlite"))
+        t0 = time.perf_counter()
+        catalog.sync(directories)
+        print(f"  首次 sync（解析全部 glTF 头）  {(time.perf_counter() - t0) * 1000:9.2f} ms")
+        _, seconds = timed(catalog.sync, directories, repeat=3)
+        print(f"  增量 sync（无变化）            {seconds * 1000:9.2f} ms")
+        (rows, total), seconds = timed(catalog.query, limit=100)
+        print(f"  查询第一页 (limit=100)         {seconds * 1000:9.2f} ms  (共 {total} 条)")
+        (rows, total), seconds = timed(catalog.query, name="model_04", sort="name", limit=100, offset=100)
+        print(f"  名称筛选 + 排序 + 分页         {seconds * 1000:9.2f} ms  (共 {total} 条)")
+        (rows, total), seconds = timed(catalog.query, layer="c", limit=100)
+        print(f"  按地层筛选                     {seconds * 1000:9.2f} ms  (共 {total} 条)")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+层面简化基准：不同误差上限 / 保留比例下的三角形数、GLTF 文件大小与构建耗时。
+
+用法（在 modelshow_back_end 目录下）:
+    python -m benchmarks.bench_decimation --grid 80 --errors 2 5 10 20 --ratios 0.5 0.2
+误差单位为模型坐标（已乘 z_scale=10）。
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from src.model_build import tin_kriging_prism_model as tkpm
+from src.model_build.build_block_pyvista import Block
+from src.model_build.decimation import decimate_horizons
+
+from .synthetic import make_layer_points
+
+
+def build_and_export(grid_points, z_list, layer_names, out_dir):
+    """构建块体并导出共享界面 GLTF，返回 (三角形数, 文件总字节数)。"""
+    block = Block(xy=grid_points, z_list=z_list, layer_names=layer_names)
+    stats = block.export_to_gltf_shared(os.path.join(out_dir, "model.gltf"))
+    return stats["triangles"], stats["bytes"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="层面简化基准")
+    parser.add_argument("--grid", type=int, default=80, help="规则网格每边点数")
+    parser.add_argument("--boreholes", type=int, default=40)
+    parser.add_argument("--layers", type=int, default=6)
+    parser.add_argument("--errors", type=float, nargs="*", default=[2.0, 5.0, 10.0, 20.0])
+    parser.add_argument("--ratios", type=float, nargs="*", default=[0.5, 0.2])
+    parser.add_argument("--json", help="将结果写入 JSON 文件")
+    args = parser.parse_args()
+
+    layer_points = tkpm.group_layer_points(make_layer_points(args.boreholes, args.layers))
+    grid_points = tkpm.build_model_grid(layer_points, args.grid, args.grid)
+    order, z_list = tkpm.interpolate_all_layers(layer_points, grid_points)
+    layer_names = [name for name in order if name != "地表层"]
+
+    cases = [("原始", None, None)]
+    cases += [(f"误差≤{e}", None, e) for e in args.errors]
+    cases += [(f"比例{r}", r, None) for r in args.ratios]
+
+    results = []
+    for label, ratio, error in cases:
+        out_dir = tempfile.mkdtemp(prefix="bench_decimation_")
+        try:
+            t0 = time.perf_counter()
+            if ratio is None and error is None:
+                pts, zs, measured = grid_points, z_list, 0.0
+            else:
+                pts, zs, info = decimate_horizons(grid_points, z_list, ratio, error)
+                measured = info["max_error"]
+            t_decimate = time.perf_counter() - t0
+            triangles, size = build_and_export(pts, zs, layer_names, out_dir)
+            results.append({
+                "case": label,
+                "vertices": len(pts),
+                "triangles": triangles,
+                "bytes": size,
+                "max_error": measured,
+                "decimate_s": t_decimate,
+                "total_s": time.perf_counter() - t0,
+            })
+        finally:
+            shutil.rmtree(out_dir, ignore_errors=True)
+
+    print(f"网格 {args.grid}×{args.grid}，钻孔 {args.boreholes}，地层 {args.layers}")
+    print(f"{'工况':<12}{'顶点':>8}{'三角形':>10}{'大小(MB)':>10}{'最大偏差':>10}{'简化(s)':>9}{'总计(s)':>9}")
+    for r in results:
+        print(f"{r['case']:<12}{r['vertices']:>8}{r['triangles']:>10}{r['bytes'] / 1e6:>10.2f}"
+              f"{r['max_error']:>10.3f}{r['decimate_s']:>9.2f}{r['total_s']:>9.2f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"grid": args.grid, "results": results}, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
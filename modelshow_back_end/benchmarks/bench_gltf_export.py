@@ -0,0 +1,73 @@
+"""
+GLTF 导出对比：逐层三棱柱网格（trimesh）与共享界面导出的顶点数、三角形数、文件大小与耗时。
+
+用法（在 modelshow_back_end 目录下）:
+    python -m benchmarks.bench_gltf_export --grid 80 --layers 4 8 12
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from src.model_build import tin_kriging_prism_model as tkpm
+from src.model_build.build_block_pyvista import Block
+
+from .synthetic import make_layer_points
+
+
+def dir_size(path):
+    return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+
+
+def bench_prism(block, out_dir):
+    t0 = time.perf_counter()
+    block.mesh_list = [block.build_layer_mesh(i) for i in range(len(block.z_list) - 1)]
+    block.export_to_gltf_trimesh(os.path.join(out_dir, "model.gltf"))
+    seconds = time.perf_counter() - t0
+    meshes = [block.mesh_to_trimesh(m, i) for i, m in enumerate(block.mesh_list)]
+    return {
+        "vertices": sum(len(m.vertices) for m in meshes),
+        "triangles": sum(len(m.faces) for m in meshes),
+        "bytes": dir_size(out_dir),
+        "seconds": seconds,
+    }
+
+
+def bench_shared(block, out_dir):
+    t0 = time.perf_counter()
+    stats = block.export_to_gltf_shared(os.path.join(out_dir, "model.gltf"))
+    stats["seconds"] = time.perf_counter() - t0
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GLTF 导出对比")
+    parser.add_argument("--grid", type=int, default=80)
+    parser.add_argument("--boreholes", type=int, default=40)
+    parser.add_argument("--layers", type=int, nargs="*", default=[4, 8])
+    args = parser.parse_args()
+
+    rows = []
+    for num_layers in args.layers:
+        layer_points = tkpm.group_layer_points(make_layer_points(args.boreholes, num_layers))
+        grid_points = tkpm.build_model_grid(layer_points, args.grid, args.grid)
+        order, z_list = tkpm.interpolate_all_layers(layer_points, grid_points)
+        layer_names = [name for name in order if name != "地表层"]
+        for label, func in (("三棱柱", bench_prism), ("共享界面", bench_shared)):
+            out_dir = tempfile.mkdtemp(prefix="bench_gltf_")
+            try:
+                block = Block(xy=grid_points, z_list=z_list, layer_names=layer_names)
+                rows.append((num_layers, label, func(block, out_dir)))
+            finally:
+                shutil.rmtree(out_dir, ignore_errors=True)
+
+    print(f"网格 {args.grid}×{args.grid}")
+    print(f"{'地层':>4}  {'方式':<8}{'顶点':>10}{'三角形':>10}{'大小(MB)':>10}{'耗时(s)':>9}")
+    for num_layers, label, r in rows:
+        print(f"{num_layers:>4}  {label:<8}{r['vertices']:>10}{r['triangles']:>10}"
+              f"{r['bytes'] / 1e6:>10.2f}{r['seconds']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
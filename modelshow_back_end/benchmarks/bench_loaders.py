@@ -0,0 +1,99 @@
+"""
+地层坐标加载基准：比较 Excel / CSV / Parquet / Feather / NPZ 读取耗时，
+以及 Excel/CSV 首次读取（写旁路缓存）与再次读取（命中缓存）的差异。
+
+用法（在 modelshow_back_end 目录下）:
+    python -m benchmarks.bench_loaders --points 200000 --layers 8
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.model_build.tin_kriging_prism_model import load_layer_points
+from src.model_build.table_io import CACHE_DIR_NAME
+
+
+def make_points(num_points: int, num_layers: int, random_state: int = 42) -> pd.DataFrame:
+    """生成 地层名称/x/y/z 格式的合成地层点。"""
+    rng = np.random.default_rng(random_state)
+    names = np.array([f"layer_{i}" for i in range(num_layers)])
+    layer_idx = rng.integers(0, num_layers, num_points)
+    x = rng.uniform(0, 5000, num_points)
+    y = rng.uniform(0, 5000, num_points)
+    z = -layer_idx * 20.0 + 3.0 * np.sin(x / 500.0) + rng.normal(0, 0.5, num_points)
+    return pd.DataFrame({"地层名称": names[layer_idx], "x": x, "y": y, "z": z})
+
+
+def write_formats(df: pd.DataFrame, out_dir: str, include_excel: bool) -> dict:
+    paths = {
+        "csv": os.path.join(out_dir, "points.csv"),
+        "parquet": os.path.join(out_dir, "points.parquet"),
+        "feather": os.path.join(out_dir, "points.feather"),
+        "npz": os.path.join(out_dir, "points.npz"),
+    }
+    df.to_csv(paths["csv"], index=False)
+    df.to_parquet(paths["parquet"], index=False)
+    df.reset_index(drop=True).to_feather(paths["feather"])
+    np.savez(paths["npz"], **{c: df[c].to_numpy().astype(str if c == "地层名称" else float) for c in df.columns})
+    if include_excel:
+        paths["excel"] = os.path.join(out_dir, "points.xlsx")
+        df.to_excel(paths["excel"], index=False)
+    return paths
+
+
+def time_call(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="地层坐标加载基准")
+    parser.add_argument("--points", type=int, default=100000)
+    parser.add_argument("--layers", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-excel", action="store_true", help="跳过 Excel（大数据量时写入很慢）")
+    parser.add_argument("--json", help="将结果写入 JSON 文件")
+    args = parser.parse_args()
+
+    out_dir = tempfile.mkdtemp(prefix="bench_loaders_")
+    try:
+        df = make_points(args.points, args.layers)
+        paths = write_formats(df, out_dir, include_excel=not args.no_excel)
+        cache_dir = os.path.join(out_dir, CACHE_DIR_NAME)
+
+        results = []
+        for fmt, path in paths.items():
+            size = os.path.getsize(path)
+            uncached = time_call(lambda: load_layer_points(path, use_cache=False), args.repeat)
+            row = {"format": fmt, "bytes": size, "uncached_s": uncached}
+            if fmt in ("csv", "excel"):
+                shutil.rmtree(cache_dir, ignore_errors=True)
+                row["first_cached_s"] = time_call(lambda: load_layer_points(path), 1)
+                row["warm_cached_s"] = time_call(lambda: load_layer_points(path), args.repeat)
+            results.append(row)
+
+        print(f"点数 {args.points}，地层数 {args.layers}")
+        print(f"{'格式':<10}{'大小(MB)':>10}{'无缓存(s)':>12}{'首次(s)':>10}{'缓存命中(s)':>13}")
+        for r in results:
+            print(f"{r['format']:<10}{r['bytes'] / 1e6:>10.2f}{r['uncached_s']:>12.4f}"
+                  f"{r.get('first_cached_s', float('nan')):>10.4f}{r.get('warm_cached_s', float('nan')):>13.4f}")
+
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump({"points": args.points, "layers": args.layers, "results": results}, f, indent=2)
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""
+建模流水线分阶段基准：在不同网格规模、钻孔数与地层数下，分别计时
+读取 (load_layer_points) → 规则网格 (build_unified_grid) → 克里金插值 (interpolate_all_layers)
+→ 三棱柱网格 (build_prism_blocks + create_pyvista_mesh_from_blocks) → 各导出器，
+并记录每个阶段的内存峰值，结果写为 JSON 便于不同提交之间对比。
+
+合成数据沿用 generate_test_layers_csv 的分层曲面思路（benchmarks/synthetic.py）。
+每个用例在独立的子进程中运行，进程常驻内存峰值 (ru_maxrss) 互不影响；
+tracemalloc 统计 Python 与 NumPy 分配的峰值（不含 VTK 等 C++ 库内部分配）。
+
+用法（在 modelshow_back_end 目录下）:
+    python -m benchmarks.bench_pipeline --grids 40 80 --boreholes 30 100 --layers 4 8 --output base.json
+    python -m benchmarks.bench_pipeline --grids 40 80 --boreholes 30 100 --layers 4 8 --compare base.json
+"""
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+EXPORTERS = ("gltf_shared", "gltf_trimesh", "vtm", "3dtiles")
+
+
+def rss_peak_mb():
+    """进程常驻内存峰值 (MB)，不支持的平台返回 None。"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为 KB，macOS 为字节
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+class StageTimer:
+    """逐阶段记录耗时与内存峰值。"""
+
+    def __init__(self, trace_memory: bool, verbose: bool):
+        self.trace_memory = trace_memory
+        self.verbose = verbose
+        self.stages = {}
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        sink = contextlib.nullcontext() if self.verbose else contextlib.redirect_stdout(io.StringIO())
+        t0 = time.perf_counter()
+        with sink:
+            yield
+        record = {"seconds": round(time.perf_counter() - t0, 4)}
+        if self.trace_memory:
+            record["traced_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 1)
+        record["rss_peak_mb"] = rss_peak_mb()
+        self.stages[name] = record
+
+
+def run_case(case: dict) -> dict:
+    """在子进程中运行一个用例，返回各阶段记录。"""
+    from src.model_build.build_block_pyvista import Block
+    from src.model_build import tin_kriging_prism_model as tkpm
+
+    from .synthetic import make_layer_points
+
+    if case["trace_memory"]:
+        tracemalloc.start()
+    timer = StageTimer(case["trace_memory"], case["verbose"])
+    work_dir = tempfile.mkdtemp(prefix="bench_pipeline_")
+    try:
+        data_path = os.path.join(work_dir, "layers.csv")
+        make_layer_points(case["boreholes"], case["layers"]).to_csv(data_path, index=False)
+
+        with timer.stage("load"):
+            layer_points = tkpm.load_layer_points(data_path, use_cache=False)
+        with timer.stage("build_unified_grid"):
+            _, _, grid_points = tkpm.build_unified_grid(layer_points, case["grid"], case["grid"])
+        with timer.stage("interpolate_all_layers"):
+            order, z_list = tkpm.interpolate_all_layers(layer_points, grid_points)
+
+        block = Block(xy=grid_points, z_list=z_list, layer_names=[n for n in order if n != "地表层"])
+        with timer.stage("prism_mesh"):
+            block.mesh_list = [block.build_layer_mesh(i) for i in range(len(z_list) - 1)]
+
+        out_dir = os.path.join(work_dir, "out")
+        os.makedirs(out_dir)
+        exports = {
+            "gltf_shared": lambda: block.export_to_gltf_shared(os.path.join(out_dir, "shared.glb")),
+            "gltf_trimesh": lambda: block.export_to_gltf_trimesh(os.path.join(out_dir, "trimesh.gltf")),
+            "vtm": lambda: block.export_model(os.path.join(out_dir, "model.vtm")),
+            "3dtiles": lambda: block.export_to_3dtiles(os.path.join(out_dir, "3dtiles")),
+        }
+        for name in case["exporters"]:
+            with timer.stage(f"export_{name}"):
+                exports[name]()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        "grid": case["grid"],
+        "boreholes": case["boreholes"],
+        "layers": case["layers"],
+        "grid_points": case["grid"] ** 2,
+        "stages": timer.stages,
+        "total_seconds": round(sum(s["seconds"] for s in timer.stages.values()), 4),
+    }
+
+
+def environment() -> dict:
+    """记录提交与运行环境，便于比较不同结果文件。"""
+    def git(*args):
+        try:
+            return subprocess.run(["git", *args], capture_output=True, text=True, timeout=30,
+                                  cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            return ""
+
+    return {
+        "commit": git("rev-parse", "HEAD") or "unknown",
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def case_key(result: dict):
+    return result["grid"], result["boreholes"], result["layers"]
+
+
+def compare(results: list, baseline_path: str, tolerance: float, min_seconds: float) -> list:
+    """与基线结果逐阶段对比，打印比值并返回回归项。"""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    base = {case_key(r): r for r in baseline["results"]}
+    print(f"\n对比基线 {baseline_path}（提交 {baseline['environment']['commit'][:10]}）")
+    regressions = []
+    for r in results:
+        old = base.get(case_key(r))
+        if old is None:
+            continue
+        cells = []
+        for name, stage in r["stages"].items():
+            before = old["stages"].get(name, {}).get("seconds")
+            if not before:
+                continue
+            ratio = stage["seconds"] / before
+            slower = ratio > 1 + tolerance and stage["seconds"] - before > min_seconds
+            cells.append(f"{name} {ratio:.2f}x{' !' if slower else ''}")
+            if slower:
+                regressions.append({"case": case_key(r), "stage": name, "before": before,
+                                    "after": stage["seconds"], "ratio": round(ratio, 3)})
+        print(f"  grid={r['grid']} boreholes={r['boreholes']} layers={r['layers']}: " + ", ".join(cells))
+    if regressions:
+        print(f"发现 {len(regressions)} 个阶段变慢超过 {tolerance:.0%}（标记为 !）")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="建模流水线分阶段基准")
+    parser.add_argument("--grids", type=int, nargs="*", default=[40, 80, 120], help="规则网格每边点数")
+    parser.add_argument("--boreholes", type=int, nargs="*", default=[30, 100])
+    parser.add_argument("--layers", type=int, nargs="*", default=[4, 8])
+    parser.add_argument("--exporters", nargs="*", default=list(EXPORTERS), choices=EXPORTERS)
+    parser.add_argument("--no-tracemalloc", action="store_true", help="不统计 Python/NumPy 分配峰值（其开销会拖慢纯 Python 阶段）")
+    parser.add_argument("--verbose", action="store_true", help="显示被测函数自身的输出")
+    parser.add_argument("--output", help="结果 JSON 路径")
+    parser.add_argument("--compare", help="作为基线对比的结果 JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="判定变慢的相对阈值")
+    parser.add_argument("--min-seconds", type=float, default=0.05, help="判定变慢的最小绝对差 (s)")
+    parser.add_argument("--fail-on-regression", action="store_true", help="存在变慢阶段时以非零状态退出")
+    args = parser.parse_args()
+
+    cases = [
+        {"grid": g, "boreholes": b, "layers": l, "exporters": args.exporters,
+         "trace_memory": not args.no_tracemalloc, "verbose": args.verbose}
+        for g, b, l in itertools.product(args.grids, args.boreholes, args.layers)
+    ]
+    env = environment()
+    print(f"提交 {env['commit'][:10]}{' (有未提交修改)' if env['dirty'] else ''}，{len(cases)} 个用例，CPU {env['cpu_count']}")
+
+    results = []
+    # 每个用例一个新进程：内存峰值互不累积，导入与缓存状态一致
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(1, maxtasksperchild=1) as pool:
+        for r in pool.imap(run_case, cases):
+            results.append(r)
+            stages = "  ".join(f"{k} {v['seconds']:.3f}s" for k, v in r["stages"].items())
+            peak = max((v["rss_peak_mb"] or 0) for v in r["stages"].values())
+            print(f"grid={r['grid']:<4} boreholes={r['boreholes']:<4} layers={r['layers']:<3} "
+                  f"total {r['total_seconds']:.3f}s  RSS {peak:.0f}MB\n    {stages}")
+
+    report = {"environment": env, "parameters": vars(args), "results": results}
+    if args.compare:
+        report["regressions"] = compare(results, args.compare, args.tolerance, args.min_seconds)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"结果已写入 {args.output}")
+    if args.fail_on_regression and report.get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
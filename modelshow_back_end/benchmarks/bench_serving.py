@@ -0,0 +1,327 @@
+"""
+模型服务压测：在空闲端口上启动 deploy-server.py（或指向已运行的服务），
+以给定并发模拟前端查看会话，统计各端点的 p50/p95/p99 延迟、吞吐与传输速率。
+
+一次查看会话与前端加载流程一致：
+    GET /api/models → GET /api/model/<模型名>（或默认 /api/model）→ 并行拉取 GLTF 引用的全部缓冲区
+回访会话 (--revisit) 模拟浏览器缓存：模型带 If-None-Match 协商，immutable 缓冲区直接命中本地缓存不再请求。
+
+仅使用标准库；压测端与服务端同机运行时会互相争用 CPU，结果用于同一台机器上不同提交之间的对比。
+
+用法（在 modelshow_back_end 目录下）:
+    python -m benchmarks.bench_serving --concurrency 1 4 16 --duration 20
+    python -m benchmarks.bench_serving --url http://192.168.1.10:3000 --concurrency 8 --output serving.json
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote, urlsplit
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port: int, log_path: str) -> subprocess.Popen:
+    """以子进程启动 deploy-server.py，等待健康检查通过。"""
+    env = dict(os.environ, PORT=str(port), CATALOG_WATCH_INTERVAL="0", PYTHONUNBUFFERED="1")
+    log = open(log_path, "w", encoding="utf-8")
+    proc = subprocess.Popen([sys.executable, "deploy-server.py"], cwd=BASE_DIR, env=env,
+                            stdout=log, stderr=subprocess.STDOUT)
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"服务启动失败，日志见 {log_path}")
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            conn.request("GET", "/api/health")
+            if conn.getresponse().status == 200:
+                return proc
+        except OSError:
+            time.sleep(0.5)
+    proc.kill()
+    raise RuntimeError(f"等待服务启动超时，日志见 {log_path}")
+
+
+def endpoint_of(path: str) -> str:
+    """请求路径 → 统计分组"""
+    if path.startswith("/api/models"):
+        return "/api/models"
+    if "/assets/" in path:
+        return "/api/model/<模型>/assets/<哈希>/<文件>"
+    if path.endswith("/thumbnail"):
+        return "/api/model/<模型>/thumbnail"
+    if path.startswith("/api/model/"):
+        return "/api/model/<模型>"
+    if path.endswith(".bin"):
+        return "<旧版缓冲区 .bin>"
+    return path
+
+
+class Recorder:
+    """线程安全地收集 (端点, 延迟, 字节数, 状态码)。"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.sessions = []
+        self.enabled = False
+
+    def add(self, endpoint, seconds, size, status):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.samples[endpoint].append((seconds, size, status))
+            if status >= 400 or status == 0:
+                self.errors[endpoint] += 1
+
+    def session(self, seconds):
+        if self.enabled:
+            with self.lock:
+                self.sessions.append(seconds)
+
+
+class Client:
+    """单个 keep-alive 连接，断开时自动重连。"""
+
+    def __init__(self, host, port, recorder, timeout=60):
+        self.host, self.port, self.timeout = host, port, timeout
+        self.recorder = recorder
+        self.conn = None
+
+    def get(self, path, headers=None):
+        t0 = time.perf_counter()
+        for attempt in range(2):
+            try:
+                if self.conn is None:
+                    self.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+                self.conn.request("GET", path, headers=headers or {})
+                resp = self.conn.getresponse()
+                body = resp.read()
+                if resp.getheader("Connection", "").lower() == "close" or resp.version == 10:
+                    self.close()
+                self.recorder.add(endpoint_of(path), time.perf_counter() - t0, len(body), resp.status)
+                return resp, body
+            except (OSError, http.client.HTTPException):
+                self.close()
+                if attempt:
+                    self.recorder.add(endpoint_of(path), time.perf_counter() - t0, 0, 0)
+                    return None, b""
+        return None, b""
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+class Viewer:
+    """一个虚拟用户：持有模型请求连接与并行拉取缓冲区的连接池，并维护自己的浏览器缓存。"""
+
+    def __init__(self, host, port, recorder, args, models):
+        self.main = Client(host, port, recorder)
+        self.fetchers = [Client(host, port, recorder) for _ in range(args.parallel_fetches)]
+        self.pool = ThreadPoolExecutor(args.parallel_fetches)
+        self.recorder = recorder
+        self.args = args
+        self.models = models
+        self.etags = {}
+        self.model_assets = {}
+        self.cached_assets = set()
+        self.rng = random.Random()
+
+    def fetch_all(self, paths):
+        batches = [paths[i::len(self.fetchers)] for i in range(len(self.fetchers))]
+
+        def run(client, batch):
+            for path in batch:
+                client.get(path)
+
+        list(self.pool.map(run, self.fetchers, batches))
+
+    def session(self):
+        t0 = time.perf_counter()
+        revisit = self.rng.random() < self.args.revisit
+        self.main.get("/api/models?limit=100")
+        model = self.rng.choice(self.models) if self.models else None
+        path = f"/api/model/{quote(model)}" if model else "/api/model"
+        headers = {"If-None-Match": self.etags[path]} if revisit and path in self.etags else None
+        resp, body = self.main.get(path, headers)
+        if resp is None or resp.status >= 400:
+            return
+        if resp.getheader("ETag"):
+            self.etags[path] = resp.getheader("ETag")
+
+        if resp.status == 304:
+            assets = self.model_assets.get(path, [])
+        else:
+            assets = []
+            if not body.startswith(b"glTF"):
+                try:
+                    gltf = json.loads(body)
+                    uris = [b.get("uri") for b in gltf.get("buffers", []) + gltf.get("images", [])]
+                    assets = [u for u in uris if isinstance(u, str) and not u.startswith(("data:", "http:", "https:"))]
+                    assets = [u if u.startswith("/") else "/" + u for u in assets]
+                except ValueError:
+                    pass
+            self.model_assets[path] = assets
+        if revisit:
+            # 回访：immutable 资源命中浏览器缓存，不再请求
+            assets = [u for u in assets if u not in self.cached_assets]
+        self.fetch_all(assets)
+        self.cached_assets.update(assets)
+        if self.args.thumbnails and model:
+            self.main.get(f"/api/model/{quote(model)}/thumbnail")
+        self.recorder.session(time.perf_counter() - t0)
+
+    def close(self):
+        self.pool.shutdown()
+        for c in [self.main] + self.fetchers:
+            c.close()
+
+
+def run_level(host, port, args, models, concurrency):
+    """以给定并发运行 warmup + duration 秒，返回统计结果。"""
+    recorder = Recorder()
+    stop = threading.Event()
+
+    def user():
+        viewer = Viewer(host, port, recorder, args, models)
+        try:
+            while not stop.is_set():
+                viewer.session()
+                if args.think_time:
+                    stop.wait(random.expovariate(1.0 / args.think_time))
+        finally:
+            viewer.close()
+
+    threads = [threading.Thread(target=user, daemon=True) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    time.sleep(args.warmup)
+    recorder.enabled = True
+    t0 = time.perf_counter()
+    time.sleep(args.duration)
+    recorder.enabled = False
+    elapsed = time.perf_counter() - t0
+    stop.set()
+    for t in threads:
+        t.join()
+    return summarize(recorder, elapsed, concurrency)
+
+
+def percentiles(values):
+    p50, p95, p99 = np.percentile(values, [50, 95, 99]) * 1000
+    return round(float(p50), 2), round(float(p95), 2), round(float(p99), 2)
+
+
+def summarize(recorder, elapsed, concurrency):
+    endpoints = {}
+    for endpoint, samples in sorted(recorder.samples.items()):
+        seconds = np.array([s[0] for s in samples])
+        sizes = sum(s[1] for s in samples)
+        p50, p95, p99 = percentiles(seconds)
+        statuses = defaultdict(int)
+        for s in samples:
+            statuses[str(s[2])] += 1
+        endpoints[endpoint] = {
+            "requests": len(samples),
+            "errors": recorder.errors[endpoint],
+            "statuses": dict(statuses),
+            "p50_ms": p50, "p95_ms": p95, "p99_ms": p99,
+            "requests_per_s": round(len(samples) / elapsed, 2),
+            "mb_per_s": round(sizes / elapsed / 2 ** 20, 2),
+        }
+    sessions = {"count": len(recorder.sessions), "per_s": round(len(recorder.sessions) / elapsed, 2)}
+    if recorder.sessions:
+        sessions["p50_ms"], sessions["p95_ms"], sessions["p99_ms"] = percentiles(np.array(recorder.sessions))
+    return {"concurrency": concurrency, "seconds": round(elapsed, 2), "sessions": sessions, "endpoints": endpoints}
+
+
+def print_level(result):
+    s = result["sessions"]
+    print(f"\n并发 {result['concurrency']}：{s['count']} 个会话 ({s['per_s']}/s)，"
+          f"会话完整加载 p50 {s.get('p50_ms', 0):.0f}ms p95 {s.get('p95_ms', 0):.0f}ms p99 {s.get('p99_ms', 0):.0f}ms")
+    print(f"  {'端点':<38}{'请求':>7}{'错误':>6}{'p50ms':>9}{'p95ms':>9}{'p99ms':>9}{'req/s':>9}{'MB/s':>8}")
+    for endpoint, e in result["endpoints"].items():
+        print(f"  {endpoint:<38}{e['requests']:>7}{e['errors']:>6}{e['p50_ms']:>9.1f}{e['p95_ms']:>9.1f}"
+              f"{e['p99_ms']:>9.1f}{e['requests_per_s']:>9.1f}{e['mb_per_s']:>8.1f}")
+
+
+def list_models(host, port, model_type):
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    conn.request("GET", f"/api/models?type={model_type}&limit=1000")
+    return [m["name"] for m in json.loads(conn.getresponse().read())["models"]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="模型服务压测")
+    parser.add_argument("--url", help="压测已运行的服务（默认在空闲端口上启动 deploy-server.py）")
+    parser.add_argument("--concurrency", type=int, nargs="*", default=[1, 4, 16], help="并发查看用户数，可给多个档位")
+    parser.add_argument("--duration", type=float, default=15.0, help="每个档位的统计时长 (s)")
+    parser.add_argument("--warmup", type=float, default=3.0, help="每个档位开始统计前的预热时长 (s)")
+    parser.add_argument("--models", nargs="*", help="参与压测的模型名，默认取 /api/models 中 --model-type 类型的全部模型")
+    parser.add_argument("--model-type", default="gltf")
+    parser.add_argument("--default-model", action="store_true", help="请求默认 /api/model 而非按名称")
+    parser.add_argument("--parallel-fetches", type=int, default=6, help="每个用户并行拉取缓冲区的连接数（浏览器同域默认 6）")
+    parser.add_argument("--revisit", type=float, default=0.0, help="回访会话比例（带缓存），0~1")
+    parser.add_argument("--think-time", type=float, default=0.0, help="会话之间的平均间隔 (s)，0 为持续加压")
+    parser.add_argument("--thumbnails", action="store_true", help="每个会话额外请求模型缩略图")
+    parser.add_argument("--output", help="结果 JSON 路径")
+    args = parser.parse_args()
+
+    proc = None
+    if args.url:
+        parts = urlsplit(args.url)
+        host, port = parts.hostname, parts.port or 80
+    else:
+        host, port = "127.0.0.1", free_port()
+        log_path = os.path.join(tempfile.gettempdir(), f"bench_serving_{port}.log")
+        print(f"启动 deploy-server.py 于端口 {port}，日志 {log_path}")
+        proc = start_server(port, log_path)
+
+    try:
+        models = [] if args.default_model else (args.models or list_models(host, port, args.model_type))
+        print(f"目标 http://{host}:{port}，模型: {', '.join(models) or '/api/model (默认)'}")
+        results = []
+        for concurrency in args.concurrency:
+            result = run_level(host, port, args, models, concurrency)
+            print_level(result)
+            results.append(result)
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=30)
+
+    if args.output:
+        report = {
+            "parameters": vars(args),
+            "models": models,
+            "cpu_count": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "levels": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n结果已写入 {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+服务启动基准：在新进程中加载 deploy-server.py，测量导入耗时与常驻内存峰值。
+
+- lazy:  当前行为，建模模块在首次调用建模/层面接口时才导入；
+- eager: 先导入全部建模模块再加载服务，即改为惰性导入之前的行为；
+另外测量 lazy 模式下首次建模接口需要补上的导入耗时（代价转移到第一次建模请求）。
+
+用法（在 modelshow_back_end 目录下）:
+    python -m benchmarks.bench_startup --repeat 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ("pandas", "scipy", "matplotlib", "pykrige", "pyvista", "vtkmodules", "trimesh", "py3dtiles")
+
+BUILD_MODULES = (
+    "src.model_build.pipeline",
+    "src.model_build.tin_kriging_prism_model",
+    "src.model_build.horizon_store",
+    "src.model_build.sections",
+    "src.model_build.volume_stats",
+)
+
+CHILD = """
+import importlib, importlib.util, json, sys, time
+try:
+    import resource
+except ImportError:
+    resource = None
+
+def rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+t0 = time.perf_counter()
+if {eager}:
+    for name in {build_modules!r}:
+        importlib.import_module(name)
+spec = importlib.util.spec_from_file_location("deploy_server", "deploy-server.py")
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+startup = time.perf_counter() - t0
+startup_rss = rss_mb()
+heavy = [m for m in {heavy!r} if m in sys.modules]
+
+t0 = time.perf_counter()
+for name in {build_modules!r}:
+    importlib.import_module(name)
+first_build_import = time.perf_counter() - t0
+
+print(json.dumps({{"startup": startup, "rss_mb": startup_rss, "heavy": heavy,
+                  "first_build_import": first_build_import, "modules": len(sys.modules)}}))
+"""
+
+
+def measure(eager: bool) -> dict:
+    code = CHILD.format(eager=eager, build_modules=BUILD_MODULES, heavy=HEAVY_MODULES)
+    env = dict(os.environ, CATALOG_WATCH_INTERVAL="0")
+    out = subprocess.run([sys.executable, "-c", code], cwd=BASE_DIR, env=env,
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(next(line for line in reversed(out.splitlines()) if line.startswith("{")))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="服务启动耗时与内存基准")
+    parser.add_argument("--repeat", type=int, default=5, help="每种模式的测量次数（取中位数）")
+    parser.add_argument("--output", help="结果 JSON 路径")
+    args = parser.parse_args()
+
+    # 预热一次，使两种模式都在文件系统缓存已热的状态下比较
+    measure(eager=True)
+
+    report = {}
+    for mode in ("eager", "lazy"):
+        runs = [measure(eager=(mode == "eager")) for _ in range(args.repeat)]
+        report[mode] = {
+            "startup_s": round(statistics.median(r["startup"] for r in runs), 3),
+            "rss_mb": round(statistics.median(r["rss_mb"] or 0 for r in runs), 1),
+            "modules": runs[-1]["modules"],
+            "heavy_modules": runs[-1]["heavy"],
+            "first_build_import_s": round(statistics.median(r["first_build_import"] for r in runs), 3),
+        }
+
+    eager, lazy = report["eager"], report["lazy"]
+    print(f"{'模式':<8}{'启动耗时':>10}{'常驻内存':>10}  已加载的重型模块")
+    for mode in ("eager", "lazy"):
+        r = report[mode]
+        print(f"{mode:<10}{r['startup_s']:>8.3f}s{r['rss_mb']:>8.0f}MB  {', '.join(r['heavy_modules']) or '-'}")
+    print(f"启动加速 {eager['startup_s'] / lazy['startup_s']:.1f}x，内存减少 {eager['rss_mb'] - lazy['rss_mb']:.0f}MB；"
+          f"lazy 模式首次建模请求需额外导入 {lazy['first_build_import_s']:.3f}s")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"结果已写入 {args.output}")
+
+
+if __name__ == "__main__":
+    main()
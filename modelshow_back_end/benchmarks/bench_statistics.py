@@ -0,0 +1,50 @@
+"""
+地层体积统计基准：不同网格规模下 compute_statistics 的耗时。
+
+层面由合成解析曲面生成并写入临时层面缓存（内存映射），不做克里金插值。
+
+用法（在 modelshow_back_end 目录下）:
+    python -m benchmarks.bench_statistics --grids 500 1000 2000 --layers 6
+"""
+import argparse
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from src.model_build.horizon_store import HorizonStack, save_horizon_stack
+from src.model_build.volume_stats import compute_statistics
+
+from .bench_block_memory import make_stack
+
+
+def main():
+    parser = argparse.ArgumentParser(description="地层体积统计基准")
+    parser.add_argument("--grids", type=int, nargs="*", default=[500, 1000, 2000])
+    parser.add_argument("--layers", type=int, default=6)
+    parser.add_argument("--thresholds", type=float, nargs="*", default=[5.0, 10.0, 20.0])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'网格':>10}{'单元数':>12}{'地层':>6}{'耗时(s)':>10}{'总体积(m³)':>16}")
+    for n in args.grids:
+        xy, z_list = make_stack(n, args.layers)
+        store = tempfile.mkdtemp(prefix="bench_stats_")
+        try:
+            save_horizon_stack(store, xy, z_list, [f"h{i}" for i in range(len(z_list))])
+            del z_list
+            stack = HorizonStack.open(store)
+            best = np.inf
+            for _ in range(args.repeat):
+                t0 = time.perf_counter()
+                stats = compute_statistics(stack, args.thresholds)
+                best = min(best, time.perf_counter() - t0)
+            total = sum(s["volume"] for s in stats["strata"])
+            print(f"{n}x{n:<5}{(n - 1) ** 2:>12}{args.layers:>6}{best:>10.3f}{total:>16.4g}")
+        finally:
+            shutil.rmtree(store, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
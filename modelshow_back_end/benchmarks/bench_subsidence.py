@@ -0,0 +1,86 @@
+"""
+沉陷计算基准：原 pandas 路径（subsidence_multilayer）与 NumPy 网格引擎（可分离 erf + 多层广播）。
+
+用法（在 modelshow_back_end 目录下）:
+    python -m benchmarks.bench_subsidence --grids 200 500 1000 --layers 3
+"""
+import argparse
+import importlib.util
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.model_build.subsidence import subsidence_multilayer_grid
+
+from .synthetic import base_surface
+
+LEGACY_PATH = os.path.join(os.path.dirname(__file__), "..", "src", "model_build",
+                           "post-subsidence_point_conversion.py")
+
+
+def load_legacy():
+    """原模块文件名含连字符，按路径加载。"""
+    spec = importlib.util.spec_from_file_location("post_subsidence_point_conversion", LEGACY_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_grid_layers(n, num_layers, extent=500.0, spacing=30.0):
+    xi = np.linspace(0, extent, n)
+    yi = np.linspace(0, extent * 0.6, n)
+    gx, gy = np.meshgrid(xi, yi)
+    base = base_surface(gx, gy, extent)
+    z_stack = np.stack([base + i * spacing for i in range(num_layers)])
+    return xi, yi, z_stack
+
+
+def main():
+    parser = argparse.ArgumentParser(description="沉陷计算基准")
+    parser.add_argument("--grids", type=int, nargs="*", default=[200, 500, 1000])
+    parser.add_argument("--layers", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    legacy = load_legacy()
+    params = dict(
+        q_base=0.9, H_base=150.0, tan_beta_base=np.tan(np.deg2rad(45)), theta0_base=np.deg2rad(70),
+        center_x=250.0, center_y=150.0, Lx=100.0, Ly=60.0, alpha=0.0,
+    )
+    print(f"{'网格':>10}{'点数':>10}{'pandas(s)':>11}{'NumPy(s)':>10}{'加速':>8}{'最大差异':>12}")
+    for n in args.grids:
+        xi, yi, z_stack = make_grid_layers(n, args.layers)
+        names = [f"layer_{i}" for i in range(args.layers)]
+        layer_types = {names[-1]: "loose"}
+        gx, gy = np.meshgrid(xi, yi)
+        layers = {
+            name: pd.DataFrame({"X": gx.ravel(), "Y": gy.ravel(), "Z": z.ravel()})
+            for name, z in zip(names, z_stack)
+        }
+        mining_depth = float(z_stack[1].mean())
+
+        t_legacy = np.inf
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            result = legacy.subsidence_multilayer(layers, names[1], mining_depth, layer_types=layer_types, **params)
+            t_legacy = min(t_legacy, time.perf_counter() - t0)
+
+        t_numpy = np.inf
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            subsidence, _ = subsidence_multilayer_grid(
+                xi, yi, z_stack, mining_depth, layer_names=names, layer_types=layer_types, **params
+            )
+            t_numpy = min(t_numpy, time.perf_counter() - t0)
+
+        diff = max(
+            np.abs(result[name]["Subsidence"].to_numpy() - subsidence[i].ravel()).max()
+            for i, name in enumerate(names)
+        )
+        print(f"{n}x{n:<5}{n * n:>10}{t_legacy:>11.3f}{t_numpy:>10.4f}{t_legacy / t_numpy:>8.1f}{diff:>12.2e}")
+
+
+if __name__ == "__main__":
+    main()
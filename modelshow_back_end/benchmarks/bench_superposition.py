@@ -0,0 +1,98 @@
+"""
+多工作面沉陷叠加基准：逐工作面循环调用原 pandas 函数 与 分块向量化引擎（串行 / 线程池）、
+规则网格可分离矩阵乘法路径的耗时对比。
+
+用法（在 modelshow_back_end 目录下）:
+    python -m benchmarks.bench_superposition --panels 100 --points 1000000 --workers 1 4
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.model_build.subsidence import superpose_grid, superpose_points
+
+from .bench_subsidence import load_legacy
+
+PARAMS = dict(q=0.85, H=150.0, tan_beta=np.tan(np.deg2rad(30)), theta0=np.deg2rad(80))
+
+
+def make_panels(num_panels, extent, random_state=0):
+    """沿走向依次排列的条带工作面，开采顺序即编号。"""
+    rng = np.random.default_rng(random_state)
+    cols = int(np.ceil(np.sqrt(num_panels)))
+    i = np.arange(num_panels)
+    return pd.DataFrame({
+        "center_x": (i % cols + 0.5) / cols * extent,
+        "center_y": (i // cols + 0.5) / cols * extent,
+        "Lx": rng.uniform(80, 200, num_panels),
+        "Ly": rng.uniform(60, 150, num_panels),
+        "alpha": rng.uniform(-0.3, 0.3, num_panels),
+        "sequence": i.astype(float),
+        "rate": 2.0,
+    })
+
+
+def legacy_loop(legacy, x, y, panels):
+    """逐工作面调用 subsidence_probability_integral 并累加。"""
+    df = pd.DataFrame({"X": x, "Y": y, "Z": 0.0})
+    total = np.zeros(len(x))
+    for row in panels.itertuples():
+        out = legacy.subsidence_probability_integral(
+            df.copy(), PARAMS["q"], PARAMS["H"], PARAMS["tan_beta"], PARAMS["theta0"],
+            row.center_x, row.center_y, row.Lx, row.Ly, row.alpha
+        )
+        total += out["Subsidence"].to_numpy()
+    return total
+
+
+def timed(func, *args, **kwargs):
+    t0 = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="多工作面沉陷叠加基准")
+    parser.add_argument("--panels", type=int, default=100)
+    parser.add_argument("--points", type=int, default=1_000_000)
+    parser.add_argument("--extent", type=float, default=5000.0)
+    parser.add_argument("--chunk", type=int, default=16384)
+    parser.add_argument("--workers", type=int, nargs="*", default=[1, os.cpu_count() or 1])
+    parser.add_argument("--skip-legacy", action="store_true", help="跳过逐工作面循环基线")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1)
+    x = rng.uniform(0, args.extent, args.points)
+    y = rng.uniform(0, args.extent, args.points)
+    panels = make_panels(args.panels, args.extent)
+    print(f"{args.panels} 个工作面 × {args.points} 个点，分块 {args.chunk}，CPU {os.cpu_count()}")
+
+    reference = None
+    if not args.skip_legacy:
+        reference, seconds = timed(legacy_loop, load_legacy(), x, y, panels)
+        print(f"  逐工作面循环 (pandas)       {seconds:8.2f}s")
+
+    for workers in sorted(set(args.workers)):
+        result, seconds = timed(superpose_points, x, y, panels, chunk_size=args.chunk, workers=workers, **PARAMS)
+        diff = "" if reference is None else f"  最大差异 {np.abs(result - reference).max():.2e}"
+        print(f"  分块向量化 workers={workers:<3}      {seconds:8.2f}s{diff}")
+
+    times = np.linspace(0, args.panels + 5, 12)
+    _, seconds = timed(superpose_points, x, y, panels, times=times, chunk_size=args.chunk, **PARAMS)
+    print(f"  分块向量化 + {len(times)} 个时刻        {seconds:8.2f}s")
+
+    n = int(np.sqrt(args.points))
+    xi = np.linspace(0, args.extent, n)
+    yi = np.linspace(0, args.extent, n)
+    straight = panels.assign(alpha=0.0)
+    _, seconds = timed(superpose_grid, xi, yi, straight, **PARAMS)
+    print(f"  规则网格 {n}x{n} 可分离 (alpha=0) {seconds:8.3f}s")
+    _, seconds = timed(superpose_grid, xi, yi, straight, times=times, **PARAMS)
+    print(f"  规则网格 + {len(times)} 个时刻          {seconds:8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
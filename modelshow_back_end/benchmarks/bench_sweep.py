@@ -0,0 +1,96 @@
+"""
+沉陷参数扫描基准：逐组合调用原 subsidence_multilayer 再统计 与 批量扫描（run_sweep）的耗时对比，
+并核对两者的汇总统计是否一致。
+
+用法（在 modelshow_back_end 目录下）:
+    python -m benchmarks.bench_sweep --grid 200 --layers 3 --samples 200 --workers 1 4
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.model_build.subsidence_sweep import (
+    parameter_combinations, run_sweep, sensitivity, sweep_context
+)
+
+from .bench_subsidence import load_legacy, make_grid_layers
+
+THRESHOLD = 0.01
+
+
+def legacy_sweep(legacy, layers, combos, mining_depth, layer_types, workface, cell_area):
+    """每个参数组合完整跑一遍 subsidence_multilayer，再从完整结果统计。"""
+    rows = []
+    for row in combos.itertuples(index=False):
+        result = legacy.subsidence_multilayer(
+            layers, None, mining_depth, row.q_base, row.H_base, row.tan_beta_base, row.theta0_base,
+            layer_types=layer_types, **workface
+        )
+        s = {name: df["Subsidence"].to_numpy() for name, df in result.items()}
+        rows.append({
+            "max_subsidence": max(v.max() for v in s.values()),
+            **{f"{name}_mean": v.mean() for name, v in s.items()},
+            **{f"{name}_area": np.count_nonzero(v >= THRESHOLD) * cell_area for name, v in s.items()},
+        })
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="沉陷参数扫描基准")
+    parser.add_argument("--grid", type=int, default=200)
+    parser.add_argument("--layers", type=int, default=3)
+    parser.add_argument("--samples", type=int, default=200)
+    parser.add_argument("--workers", type=int, nargs="*", default=[1, os.cpu_count() or 1])
+    parser.add_argument("--legacy-samples", type=int, default=50, help="原路径只跑前若干组用于计时与核对")
+    args = parser.parse_args()
+
+    xi, yi, z_stack = make_grid_layers(args.grid, args.layers)
+    names = [f"layer_{i}" for i in range(args.layers)]
+    layer_types = {names[-1]: "loose"}
+    mining_depth = float(z_stack[0].mean()) - 20.0
+    workface = dict(center_x=250.0, center_y=150.0, Lx=100.0, Ly=60.0, alpha=0.0)
+    combos = parameter_combinations(
+        distributions={
+            "q_base": ("uniform", 0.6, 1.0),
+            "H_base": ("uniform", 100.0, 250.0),
+            "tan_beta_base": ("uniform", np.tan(np.deg2rad(35)), np.tan(np.deg2rad(60))),
+            "theta0_base": ("normal", np.deg2rad(70), np.deg2rad(3)),
+        },
+        samples=args.samples, random_state=0,
+    )
+    print(f"{args.samples} 组参数 × {args.layers} 层 × {args.grid}x{args.grid} 网格，CPU {os.cpu_count()}")
+
+    gx, gy = np.meshgrid(xi, yi)
+    layers = {name: pd.DataFrame({"X": gx.ravel(), "Y": gy.ravel(), "Z": z.ravel()})
+              for name, z in zip(names, z_stack)}
+    legacy_n = min(args.legacy_samples, len(combos))
+    grid_ctx = sweep_context(mining_depth, grid=(xi, yi, z_stack), layer_names=names,
+                             layer_types=layer_types, threshold=THRESHOLD, **workface)
+
+    t0 = time.perf_counter()
+    reference = legacy_sweep(load_legacy(), layers, combos.iloc[:legacy_n], mining_depth, layer_types,
+                             workface, grid_ctx["cell_area"])
+    t_legacy = (time.perf_counter() - t0) / legacy_n
+    print(f"  逐组合 subsidence_multilayer   {t_legacy * 1000:8.2f} ms/组（前 {legacy_n} 组）")
+
+    point_ctx = sweep_context(mining_depth, layers=layers, layer_types=layer_types, threshold=THRESHOLD, **workface)
+    point_ctx["point_area"] = grid_ctx["cell_area"]
+    for label, ctx in (("散点分块", point_ctx), ("规则网格可分离", grid_ctx)):
+        for workers in sorted(set(args.workers)):
+            t0 = time.perf_counter()
+            summary = run_sweep(combos, ctx, workers=workers)
+            seconds = time.perf_counter() - t0
+            check = summary.iloc[:legacy_n][reference.columns]
+            diff = np.abs(check.to_numpy() - reference.to_numpy()).max()
+            print(f"  {label} workers={workers:<3}      {seconds / len(combos) * 1000:8.3f} ms/组"
+                  f"  加速 {t_legacy * len(combos) / seconds:7.1f}x  最大差异 {diff:.2e}")
+
+    print("Spearman 敏感性:")
+    print(sensitivity(summary).round(3).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+建模工作进程池基准：
+- cold: 新进程中导入建模模块并建模一次（惰性导入后，服务进程内首次建模的代价）；
+- pool: 预热工作进程中连续建模（导入已在进程启动时完成）；
+- 大数组返回：经管道序列化 与 经共享内存目录映射 的耗时对比；
+- 按任务数替换进程后，下一次建模是否仍然是热的。
+
+用法（在 modelshow_back_end 目录下）:
+    python -m benchmarks.bench_workers --builds 5 --grid 60
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from src.model_build import workers
+
+from .synthetic import make_layer_points
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+COLD = """
+import sys, time
+t0 = time.perf_counter()
+import pandas as pd
+from src.model_build import workers
+workers.build_model(pd.read_pickle(sys.argv[1]), output_dir=sys.argv[2], save_file_name="cold.glb",
+                    store_dir=sys.argv[2], grid_nx={grid}, grid_ny={grid}, thumbnail=False)
+print("SECONDS", time.perf_counter() - t0)
+"""
+
+
+def wait_ready(pool):
+    """执行一个空任务，确保工作进程已完成预加载。"""
+    pool.run(os.getpid)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="建模工作进程池基准")
+    parser.add_argument("--builds", type=int, default=5)
+    parser.add_argument("--grid", type=int, default=60)
+    parser.add_argument("--boreholes", type=int, default=30)
+    parser.add_argument("--layers", type=int, default=6)
+    parser.add_argument("--array-mb", type=int, default=200, help="大数组返回测试的数组大小 (MB)")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="bench_workers_")
+    try:
+        points = make_layer_points(args.boreholes, args.layers)
+        data_path = os.path.join(work_dir, "points.pkl")
+        points.to_pickle(data_path)
+        options = dict(output_dir=work_dir, store_dir=work_dir, grid_nx=args.grid, grid_ny=args.grid, thumbnail=False)
+        print(f"网格 {args.grid}x{args.grid}，{args.boreholes} 个钻孔，{args.layers} 层，CPU {os.cpu_count()}")
+
+        out = subprocess.run([sys.executable, "-c", COLD.format(grid=args.grid), data_path, work_dir],
+                             cwd=BASE_DIR, capture_output=True, text=True, check=True).stdout
+        cold = float(next(l for l in out.splitlines() if l.startswith("SECONDS")).split()[1])
+        print(f"  cold  新进程导入 + 建模          {cold:8.3f}s")
+
+        pool = workers.BuildWorkerPool(1, max_jobs=args.builds + 10)
+        t0 = time.perf_counter()
+        wait_ready(pool)
+        print(f"  pool  工作进程预热（启动时一次）  {time.perf_counter() - t0:8.3f}s")
+        seconds = []
+        for i in range(args.builds):
+            t0 = time.perf_counter()
+            pool.run(workers.build_model, points, save_file_name=f"pool_{i}.glb", **options)
+            seconds.append(time.perf_counter() - t0)
+        print(f"  pool  预热进程建模 中位数         {np.median(seconds):8.3f}s  (首次 {seconds[0]:.3f}s)")
+
+        n = args.array_mb * 2 ** 20 // 8
+        for label, spill in (("管道序列化", 1 << 62), ("共享内存映射", 1 << 20)):
+            transfer = workers.BuildWorkerPool(1, spill_bytes=spill, preload=())
+            wait_ready(transfer)
+            t0 = time.perf_counter()
+            array = transfer.run(np.ones, n)
+            float(array[-1])
+            print(f"  返回 {args.array_mb}MB 数组：{label:<10}  {time.perf_counter() - t0:8.3f}s")
+            del array
+            transfer.close()
+        pool.close()
+
+        # 空任务 + 一次建模后达到 max_jobs=2，进程被替换
+        recycled = workers.BuildWorkerPool(1, max_jobs=2)
+        wait_ready(recycled)
+        recycled.run(workers.build_model, points, save_file_name="r0.glb", **options)
+        time.sleep(2 * cold)  # 替换进程在后台完成预加载
+        t0 = time.perf_counter()
+        recycled.run(workers.build_model, points, save_file_name="r1.glb", **options)
+        print(f"  替换后新进程的首次建模           {time.perf_counter() - t0:8.3f}s  (替换 {recycled.replaced} 次)")
+        recycled.close()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+基准测试用合成钻孔地层数据。
+
+沿用 post-subsidence_point_conversion.generate_test_layers_csv 的思路：
+平滑基面 + 层间平均厚度 + 小扰动，保证同一钻孔处各层 z 自下而上递增。
+"""
+import numpy as np
+import pandas as pd
+
+
+def base_surface(x, y, extent: float):
+    """平滑起伏基面，波长随范围缩放。"""
+    return 2.0 * np.sin(2 * np.pi * x / (extent * 1.2)) + 1.5 * np.cos(2 * np.pi * y / (extent * 0.8))
+
+
+def make_layer_points(num_boreholes: int = 30, num_layers: int = 6, extent: float = 2000.0,
+                      thickness: float = 20.0, random_state: int = 42) -> pd.DataFrame:
+    """
+    生成 地层名称/x/y/z 格式的合成地层坐标，每个钻孔包含全部层面（含“地表层”）。
+    参数:
+        num_boreholes: 钻孔数
+        num_layers: 地层数（层面数为 num_layers + 1）
+        extent: 平面范围边长
+        thickness: 平均地层厚度
+        random_state: 随机种子
+    """
+    rng = np.random.default_rng(random_state)
+    x = rng.uniform(0, extent, num_boreholes)
+    y = rng.uniform(0, extent, num_boreholes)
+    base = base_surface(x, y, extent)
+    # 每层厚度在钻孔间平滑变化，且恒为正
+    z = base + rng.normal(0, 0.5, num_boreholes)
+    frames = [pd.DataFrame({"地层名称": "layer_0", "x": x, "y": y, "z": z})]
+    for i in range(1, num_layers + 1):
+        t = thickness * (1 + 0.3 * np.sin(x / extent * (i + 1)) * np.cos(y / extent * (i + 2)))
+        z = z + np.abs(t + rng.normal(0, 0.5, num_boreholes))
+        name = "地表层" if i == num_layers else f"layer_{i}"
+        frames.append(pd.DataFrame({"地层名称": name, "x": x, "y": y, "z": z}))
+    return pd.concat(frames, ignore_index=True)
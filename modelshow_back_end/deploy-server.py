@@ -1,18 +1,26 @@
 # app.py
+import hashlib
 import json
 import os
 import socket
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
 from typing import List
+from urllib.parse import quote, unquote
 import uuid
-from werkzeug.utils import secure_filename
-import pandas as pd
-import src.model_build.tin_kriging_prism_model as tkpm
+from werkzeug.utils import secure_filename, safe_join
+# 建模相关模块（pykrige、pyvista/VTK、trimesh、scipy、matplotlib、pandas）在
+# 首次用到的接口内再导入，只提供模型文件的进程无需加载，启动更快、常驻内存更小
+from src.model_build.thumbnails import thumbnail_path, thumbnail_is_fresh
+from src.model_build.catalog import ModelCatalog, CatalogWatcher
+from src.model_build import metrics, workers
+import numpy as np
 
 from flask import (
     Flask, jsonify, request, send_from_directory,
-    make_response, abort
+    make_response, abort, g
 )
 from flask_cors import CORS
 
@@ -23,16 +31,39 @@ PUBLIC_DIR = BASE_DIR / "public"
 MODEL_GLTF_DIR = PUBLIC_DIR / "model_gltf"
 MODEL_3DTILES_DIR = PUBLIC_DIR / "model_3dtiles" / "output_model"
 MODEL_GLTF_TEST_DIR = PUBLIC_DIR / "model_gltf_test"
+# 派生模型（开采沉陷变形等）单独存放，不参与 /api/model 默认模型的选择
+MODEL_VARIANT_DIR = MODEL_GLTF_DIR / "variants"
 
 # 钻孔数据目录
 UPLOADS_DIR = BASE_DIR / "uploads"
 BOREHOLE_DATA_DIR = UPLOADS_DIR / "borehole_data"
+# 层面堆栈内存映射缓存（剖面、体积统计等接口直接读取，无需重新插值）
+HORIZON_STORE_DIR = UPLOADS_DIR / "horizons"
 
 # 确保目录存在
 UPLOADS_DIR.mkdir(exist_ok=True)
 BOREHOLE_DATA_DIR.mkdir(exist_ok=True)
-
-SEARCH_DIRS = [MODEL_GLTF_DIR, MODEL_3DTILES_DIR, MODEL_GLTF_TEST_DIR]
+HORIZON_STORE_DIR.mkdir(exist_ok=True)
+
+SEARCH_DIRS = [MODEL_GLTF_DIR, MODEL_3DTILES_DIR, MODEL_GLTF_TEST_DIR, MODEL_VARIANT_DIR]
+
+# 模型目录索引：启动时同步一次，之后由导出流程登记、后台线程定期补充同步
+CATALOG_DIRS = {MODEL_GLTF_DIR: "gltf", MODEL_3DTILES_DIR: "3dtiles", MODEL_GLTF_TEST_DIR: "test",
+                MODEL_VARIANT_DIR: "variant"}
+CATALOG = ModelCatalog(UPLOADS_DIR / "catalog.sqlite")
+CATALOG_WATCH_INTERVAL = float(os.environ.get("CATALOG_WATCH_INTERVAL", "10"))
+# 建模工作进程以 spawn 方式启动时会以 __mp_main__ 重新执行本脚本，其中不做同步、不启动后台线程
+if __name__ != "__mp_main__":
+    CATALOG.sync(CATALOG_DIRS)
+    if CATALOG_WATCH_INTERVAL > 0:
+        CatalogWatcher(CATALOG, CATALOG_DIRS, CATALOG_WATCH_INTERVAL).start()
+
+# 建模工作进程池（见 src/model_build/workers.py）：服务启动时创建，BUILD_WORKERS=0 时在请求线程中直接建模
+BUILD_WORKERS = int(os.environ.get("BUILD_WORKERS", "1"))
+BUILD_WORKER_MAX_JOBS = int(os.environ.get("BUILD_WORKER_MAX_JOBS", "20"))
+BUILD_WORKER_MAX_RSS_MB = float(os.environ.get("BUILD_WORKER_MAX_RSS_MB", "2048"))
+BUILD_TIMEOUT = float(os.environ.get("BUILD_TIMEOUT", "0")) or None
+BUILD_POOL = None
 
 # 允许上传的文件类型
 ALLOWED_EXTENSIONS = {'.txt', '.xlsx', '.xls', '.csv'}
@@ -90,16 +121,27 @@ def json_response(data, status=200):
     resp = make_response(jsonify(data), status)
     return resp
 
-def set_bin_headers(resp, size: int | None = None):
+def set_bin_headers(resp, size: int | None = None, immutable: bool = False):
     resp.headers["Content-Type"] = "application/octet-stream"
     resp.headers["Access-Control-Allow-Origin"] = "*"
     resp.headers["Access-Control-Allow-Methods"] = "GET, HEAD, OPTIONS"
     resp.headers["Access-Control-Allow-Headers"] = "Origin, X-Requested-With, Content-Type, Accept, Range"
-    resp.headers["Cache-Control"] = "public, max-age=31536000"  # 缓存 1 年
+    if immutable:
+        # 地址中含内容哈希，内容变化即换地址，可永久缓存
+        resp.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    else:
+        # 固定文件名的缓冲区会被其他模型或重新生成覆盖，每次需向服务器确认
+        resp.headers["Cache-Control"] = "no-cache"
     if size is not None:
         resp.headers["Content-Length"] = str(size)
     return resp
 
+def run_build_job(func, **kwargs):
+    """执行建模任务（workers 模块中的任务函数）：有进程池时在预热的工作进程中执行"""
+    if BUILD_POOL is None:
+        return func(**kwargs)
+    return BUILD_POOL.run(func, timeout=BUILD_TIMEOUT, **kwargs)
+
 def allowed_file(filename):
     """检查文件类型是否允许"""
     return Path(filename).suffix.lower() in ALLOWED_EXTENSIONS
@@ -121,8 +163,44 @@ def save_uploaded_file(file):
         return file_path, unique_filename
     return None, None
 
+def read_stratum_from_txt(file_path):
+    """读取TXT格式（空白分隔）的地层坐标数据"""
+    data = []
+    with open(file_path, 'r', encoding='utf-8') as f:
+        for line_num, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            parts = line.split()
+            if len(parts) >= 4:
+                try:
+                    data.append({
+                        'stratum_name': parts[0],
+                        'x_coord': float(parts[1]),
+                        'y_coord': float(parts[2]),
+                        'z_coord': float(parts[3])
+                    })
+                except (ValueError, IndexError):
+                    continue
+    return data
+
+def read_stratum_points(file_path):
+    """读取任意支持格式的地层坐标文件，返回建模所需的 地层名称/x/y/z DataFrame"""
+    import pandas as pd
+
+    if Path(file_path).suffix.lower() == '.txt':
+        data = read_stratum_from_txt(file_path)
+    else:
+        data = read_stratum_from_excel_csv(file_path)
+    df = pd.DataFrame(data, columns=['stratum_name', 'x_coord', 'y_coord', 'z_coord'])
+    return df.rename(columns={
+        'stratum_name': '地层名称', 'x_coord': 'x', 'y_coord': 'y', 'z_coord': 'z'
+    })
+
 def read_stratum_from_excel_csv(file_path):
     """读取Excel/CSV格式的地层坐标数据"""
+    import pandas as pd
+
     try:
         file_ext = Path(file_path).suffix.lower()
         
@@ -197,80 +275,172 @@ def api_health():
         "server": "ModelShow API Server (Flask)"
     })
 
+@app.route("/api/metrics", methods=["GET"])
+def api_metrics():
+    """运行指标（Prometheus 文本格式）：建模各阶段耗时、请求耗时与次数"""
+    resp = make_response(metrics.render())
+    resp.headers["Content-Type"] = "text/plain; version=0.0.4; charset=utf-8"
+    resp.headers["Cache-Control"] = "no-store"
+    return resp
+
 @app.route("/api/models", methods=["GET"])
 def api_models():
+    """
+    模型列表（查询模型目录索引）：
+    ?type=gltf&q=名称子串&layer=地层名&source=源数据哈希&sort=mtime&order=desc&limit=100&offset=0
+    """
     print("获取模型列表请求")
-    models = []
-    for d, typ in [
-        (MODEL_GLTF_DIR, "gltf"),
-        (MODEL_3DTILES_DIR, "3dtiles"),
-        (MODEL_GLTF_TEST_DIR, "test"),
-    ]:
-        if not d.exists():
-            continue
-        for f in d.iterdir():
-            if f.suffix.lower() in (".gltf", ".glb"):
-                st = f.stat()
-                models.append({
-                    "name": f.name,
-                    "type": typ,
-                    "size": st.st_size,
-                    "path": "/api/model",
-                    "lastModified": datetime.fromtimestamp(st.st_mtime).isoformat()
-                })
-    return json_response({"models": models, "count": len(models)})
-
-@app.route("/api/model", methods=["GET"])
-def api_model():
-    print("收到模型请求 - 优先使用 public/model_gltf 目录")
-    model_path = pick_model_file()
-    print("找到模型文件:", str(model_path) if model_path else None)
-
-    if not model_path:
-        return json_response({
-            "error": "模型文件不存在",
-            "message": "请确保以下目录中至少有一个 .gltf 或 .glb 文件",
-            "searchedPaths": [
-                "public/model_gltf/",
-                "public/model_3dtiles/output_model/",
-                "public/model_gltf_test/"
-            ]
-        }, status=404)
-
+    args = request.args
+    try:
+        rows, total = CATALOG.query(
+            type=args.get('type'),
+            name=args.get('q'),
+            layer=args.get('layer'),
+            source_hash=args.get('source'),
+            sort=args.get('sort', 'mtime'),
+            descending=args.get('order', 'desc') != 'asc',
+            limit=min(int(args.get('limit', 1000)), 1000),
+            offset=max(int(args.get('offset', 0)), 0),
+        )
+    except ValueError as e:
+        return json_response({"error": "查询参数错误", "message": str(e)}, status=400)
+    models = [{
+        "name": r["name"],
+        "type": r["type"],
+        "size": r["size"],
+        "path": f"/api/model/{quote(r['name'])}",
+        "lastModified": datetime.fromtimestamp(r["mtime"]).isoformat(),
+        # 缩略图按需渲染并缓存，列表页直接引用该地址即可
+        "thumbnail": f"/api/model/{quote(r['name'])}/thumbnail" if r["type"] == "gltf" else None,
+        "layers": r["layers"],
+        "vertices": r["vertices"],
+        "triangles": r["triangles"],
+        "bbox": r["bbox"],
+        "sourceHash": r["source_hash"],
+        "params": r["params"],
+        "assets": r["assets"],
+    } for r in rows]
+    return json_response({"models": models, "count": len(models), "total": total})
+
+# 文件内容哈希缓存：(路径, 大小, 修改时间) 不变时不重复计算
+_DIGEST_CACHE = {}
+_DIGEST_LOCK = threading.Lock()
+
+
+def file_digest(path: Path) -> str:
+    """文件内容的 SHA-256（前 16 位十六进制），按大小与修改时间缓存。"""
+    st = path.stat()
+    key = (str(path), st.st_size, st.st_mtime_ns)
+    with _DIGEST_LOCK:
+        digest = _DIGEST_CACHE.get(key)
+    if digest is None:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        digest = h.hexdigest()[:16]
+        with _DIGEST_LOCK:
+            _DIGEST_CACHE[key] = digest
+    return digest
+
+
+def resolve_model(model: str) -> Path | None:
+    """模型标识（文件名，可省略扩展名）→ 模型文件路径，按 SEARCH_DIRS 顺序查找"""
+    if not model or model.startswith(".") or Path(model).name != model:
+        return None
+    names = [model] if Path(model).suffix.lower() in (".gltf", ".glb") else [f"{model}.glb", f"{model}.gltf"]
+    return first_existing(*(d / name for d in SEARCH_DIRS for name in names))
+
+
+def model_asset_url(model_path: Path, uri: str) -> str:
+    """glTF 外部文件 → /api/model/<模型>/assets/<内容哈希>/<文件名>，不同模型、不同内容互不冲突"""
+    asset = Path(safe_join(str(model_path.parent), unquote(uri)) or "")
+    if not asset.is_file():
+        return uri
+    return f"/api/model/{quote(model_path.name)}/assets/{file_digest(asset)}/{quote(unquote(uri))}"
+
+
+def send_model(model_path: Path):
+    """
+    发送模型文件：GLB 原样发送；GLTF 把 buffers/images 的相对 URI 改写为带命名空间与内容哈希的地址。
+    模型本身可能被重新生成，使用 ETag 协商缓存；其引用的缓冲区地址随内容变化，可永久缓存。
+    """
     ext = model_path.suffix.lower()
     if ext == ".glb":
-        # 直接发送二进制 glb
-        st = model_path.stat()
-        resp = send_from_directory(str(model_path.parent), model_path.name)
+        resp = send_from_directory(str(model_path.parent), model_path.name, etag=file_digest(model_path))
         resp.headers["Content-Type"] = "model/gltf-binary"
         resp.headers["Access-Control-Allow-Origin"] = "*"
-        resp.headers["Content-Length"] = str(st.st_size)
-        print(f"发送 GLB 文件: {model_path.name} ({st.st_size} bytes)")
+        resp.headers["Cache-Control"] = "no-cache"
+        print(f"发送 GLB 文件: {model_path.name} ({model_path.stat().st_size} bytes)")
         return resp
 
     if ext == ".gltf":
-        # 读取 gltf 并将 buffers[].uri 指向 /model_gltf/<bin>
         try:
-            content = model_path.read_text(encoding="utf-8")
-            data = json.loads(content)
-            if isinstance(data, dict) and "buffers" in data:
-                for buf in data.get("buffers", []):
-                    uri = buf.get("uri")
-                    if isinstance(uri, str) and uri.lower().endswith(".bin"):
-                        buf["uri"] = f"/model_gltf/{uri}"
+            data = json.loads(model_path.read_text(encoding="utf-8"))
+            if isinstance(data, dict):
+                for item in data.get("buffers", []) + data.get("images", []):
+                    uri = item.get("uri")
+                    if isinstance(uri, str) and not uri.startswith(("data:", "/", "http:", "https:")):
+                        item["uri"] = model_asset_url(model_path, uri)
             modified = json.dumps(data, ensure_ascii=False)
             resp = make_response(modified)
             resp.headers["Content-Type"] = "model/gltf+json"
-            resp.headers["Content-Length"] = str(len(modified.encode("utf-8")))
             resp.headers["Access-Control-Allow-Origin"] = "*"
+            resp.headers["Cache-Control"] = "no-cache"
+            # 改写后的内容已包含各缓冲区哈希，ETag 由其整体计算
+            resp.set_etag(hashlib.sha256(modified.encode("utf-8")).hexdigest()[:16])
             print(f"发送修正后的 GLTF 文件: {model_path.name} ({len(modified)} chars)")
-            return resp
+            return resp.make_conditional(request)
         except Exception as e:
             print("读取/处理 GLTF 出错:", e)
             return json_response({"error": "读取模型文件失败", "message": str(e)}, status=500)
 
     return json_response({"error": "不支持的模型类型"}, status=400)
 
+
+@app.route("/api/model", methods=["GET"])
+def api_model():
+    print("收到模型请求 - 优先使用 public/model_gltf 目录")
+    model_path = pick_model_file()
+    print("找到模型文件:", str(model_path) if model_path else None)
+
+    if not model_path:
+        return json_response({
+            "error": "模型文件不存在",
+            "message": "请确保以下目录中至少有一个 .gltf 或 .glb 文件",
+            "searchedPaths": [
+                "public/model_gltf/",
+                "public/model_3dtiles/output_model/",
+                "public/model_gltf_test/"
+            ]
+        }, status=404)
+    return send_model(model_path)
+
+
+@app.route("/api/model/<model>", methods=["GET"])
+def api_model_by_name(model: str):
+    """按模型名（/api/models 中的 name）获取模型"""
+    model_path = resolve_model(model)
+    if model_path is None:
+        return json_response({"error": "模型文件不存在", "message": f"未找到模型 {model}"}, status=404)
+    return send_model(model_path)
+
+
+@app.route("/api/model/<model>/assets/<digest>/<path:filename>", methods=["GET"])
+def api_model_asset(model: str, digest: str, filename: str):
+    """模型引用的缓冲区/贴图；内容哈希与当前文件不一致时返回 404，避免旧地址拿到新内容"""
+    model_path = resolve_model(model)
+    asset = safe_join(str(model_path.parent), filename) if model_path else None
+    if not asset or not os.path.isfile(asset) or file_digest(Path(asset)) != digest:
+        return json_response({"error": f"资源不存在或已更新: {filename}"}, status=404)
+    resp = send_from_directory(os.path.dirname(asset), os.path.basename(asset), etag=digest)
+    if filename.lower().endswith(".bin"):
+        set_bin_headers(resp, immutable=True)
+    else:
+        resp.headers["Access-Control-Allow-Origin"] = "*"
+        resp.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    return resp
+
 # 专门处理形如 /gltf_buffer_XX.bin 的缓冲区文件
 @app.route("/gltf_buffer_<id>.bin", methods=["GET"])
 def api_gltf_buffer(id: str):
@@ -385,22 +555,7 @@ def get_stratum_data(filename):
         
         if file_ext == '.txt':
             # 读取TXT文件
-            with open(file_path, 'r', encoding='utf-8') as f:
-                for line_num, line in enumerate(f, 1):
-                    line = line.strip()
-                    if not line:
-                        continue
-                    parts = line.split()
-                    if len(parts) >= 4:
-                        try:
-                            data.append({
-                                'stratum_name': parts[0],
-                                'x_coord': float(parts[1]),
-                                'y_coord': float(parts[2]),
-                                'z_coord': float(parts[3])
-                            })
-                        except (ValueError, IndexError):
-                            continue
+            data = read_stratum_from_txt(file_path)
         
         elif file_ext in ['.xlsx', '.xls', '.csv']:
             # 读取Excel/CSV文件
@@ -431,11 +586,21 @@ def get_stratum_data(filename):
             "message": f"读取文件失败: {str(e)}"
         }, status=500)
 
+def positive_param(data: dict, key: str, cast=float):
+    """请求体中的可选正数参数：缺省时为 None，无法转换或不大于 0 时抛出 ValueError/TypeError"""
+    value = data.get(key)
+    if value is None:
+        return None
+    value = cast(value)
+    if not value > 0:
+        raise ValueError(f"{key} 需大于 0")
+    return value
+
 @app.route("/api/model/generate", methods=["POST"])
 def generate_geological_model():
-    """生成地质模型（暂时保留接口）"""
+    """生成地质模型：读取已上传的地层坐标文件，经内存流水线插值建模并导出 GLTF"""
     try:
-        data = request.get_json()
+        data = request.get_json() or {}
         filename = data.get('filename')
         
         if not filename:
@@ -451,17 +616,76 @@ def generate_geological_model():
                 "message": "指定的文件不存在"
             }, status=404)
         
-        # TODO: 调用实际的模型生成函数
-        # result = tkpm.generate_model(str(file_path))
-        
         print(f"🏗️ 开始生成地质模型，使用文件: {filename}")
-        
-        # 暂时返回模拟结果
+
+        layer_points = read_stratum_points(file_path)
+        if layer_points.empty:
+            return json_response({
+                "success": False,
+                "message": "地层坐标文件读取失败或格式不正确"
+            }, status=400)
+
+        save_file_name = secure_filename(data.get('save_file_name') or "output_model.gltf")
+        checkpoint_dir = None
+        if data.get('checkpoint'):
+            checkpoint_dir = str(UPLOADS_DIR / "checkpoints" / Path(filename).stem)
+        # 增量构建：同名模型再次生成时仅重算发生变化的地层
+        cache_dir = str(UPLOADS_DIR / "build_cache") if data.get('incremental') else None
+
+        # 采样剖析单次构建：{"profile": true} 时写出 uploads/profiles/<模型名>-<时间>.folded
+        profile_path = None
+        if data.get('profile'):
+            stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+            profile_path = str(UPLOADS_DIR / "profiles" / f"{Path(save_file_name).stem}-{stamp}.folded")
+
+        # 数值参数先统一转换，非法值返回 400 而不是进入建模
+        try:
+            numeric = dict(
+                grid_nx=int(data.get('grid_nx', 80)),
+                grid_ny=int(data.get('grid_ny', 80)),
+                z_scale=float(data.get('z_scale', 10.0)),
+                # 自适应网格预算
+                max_vertices=positive_param(data, 'max_vertices', int),
+                max_error=positive_param(data, 'max_error'),
+                # 层面简化目标
+                decimate_ratio=positive_param(data, 'decimate_ratio'),
+                decimate_error=positive_param(data, 'decimate_error'),
+            )
+            if numeric['decimate_ratio'] is not None and numeric['decimate_ratio'] > 1:
+                raise ValueError("decimate_ratio 需在 (0, 1] 范围内")
+        except (TypeError, ValueError) as e:
+            return json_response({
+                "success": False,
+                "message": f"建模参数错误: {e}"
+            }, status=400)
+
+        result = run_build_job(
+            workers.build_model,
+            layer_points=layer_points,
+            checkpoint_dir=checkpoint_dir,
+            cache_dir=cache_dir,
+            store_dir=str(HORIZON_STORE_DIR),
+            default_variogram=data.get('variogram', "spherical"),
+            grid_mode=data.get('grid_mode', "uniform"),
+            boundary=data.get('boundary'),
+            boundary_alpha=data.get('boundary_alpha'),
+            save_file_name=save_file_name,
+            output_dir=str(MODEL_GLTF_DIR),
+            catalog_path=CATALOG.db_path,
+            profile_path=profile_path,
+            **numeric,
+        )
+
         return json_response({
             "success": True,
-            "message": "地质模型生成请求已接收（功能开发中）",
+            "message": "地质模型生成完成",
             "filename": filename,
-            "status": "pending"
+            "status": "done",
+            "model": Path(result["output_path"]).name,
+            "layers": result["layer_names"],
+            "timings": result["timings"],
+            "report": result.get("report"),
+            "profile": Path(profile_path).name if profile_path else None,
         })
         
     except Exception as e:
@@ -471,7 +695,190 @@ def generate_geological_model():
             "message": f"生成模型失败: {str(e)}"
         }, status=500)
 
+def open_horizon_stack(model: str):
+    """按模型名（GLTF 文件名去掉扩展名）打开层面堆栈缓存，不存在时返回 None"""
+    store_path = HORIZON_STORE_DIR / secure_filename(Path(model).stem)
+    if not (store_path / "meta.json").exists():
+        return None
+    from src.model_build.horizon_store import HorizonStack
+
+    return HorizonStack.open(str(store_path))
+
+
+def compact_array(values, decimals=3):
+    """数组转为 JSON 列表，NaN 转为 null"""
+    values = np.round(np.asarray(values, dtype=float), decimals)
+    return np.where(np.isnan(values), None, values).tolist()
+
+
+@app.route("/api/model/<model>/section", methods=["POST"])
+def api_model_section(model: str):
+    """沿折线的竖直剖面：请求体 {line: [[x, y], ...], num?: 200, spacing?: 10}"""
+    from src.model_build.sections import cross_section
+
+    stack = open_horizon_stack(model)
+    if stack is None:
+        return json_response({"success": False, "message": f"模型 {model} 没有层面缓存，请重新生成"}, status=404)
+    data = request.get_json() or {}
+    try:
+        spacing = data.get('spacing')
+        section = cross_section(
+            stack, data.get('line'),
+            num=int(data.get('num', 200)),
+            spacing=float(spacing) if spacing else None,
+            max_points=10000,
+        )
+    except (TypeError, ValueError) as e:
+        return json_response({"success": False, "message": f"剖面参数错误: {e}"}, status=400)
+    return json_response({
+        "success": True,
+        "model": model,
+        "order": section["order"],
+        "layers": section["layer_names"],
+        "z_scale": section["z_scale"],
+        "distance": compact_array(section["distance"]),
+        "x": compact_array(section["x"]),
+        "y": compact_array(section["y"]),
+        "z": compact_array(section["z"]),
+    })
+
+
+@app.route("/api/model/<model>/profile", methods=["GET", "POST"])
+def api_model_profile(model: str):
+    """虚拟钻孔：GET ?x=&y= 查询单点，POST {points: [[x, y], ...]} 批量查询"""
+    from src.model_build.sections import borehole_profiles
+
+    stack = open_horizon_stack(model)
+    if stack is None:
+        return json_response({"success": False, "message": f"模型 {model} 没有层面缓存，请重新生成"}, status=404)
+    try:
+        if request.method == "POST":
+            points = (request.get_json() or {}).get('points') or []
+        else:
+            points = [[float(request.args['x']), float(request.args['y'])]]
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+    except (KeyError, TypeError, ValueError):
+        return json_response({"success": False, "message": "需要提供 x、y 坐标"}, status=400)
+    if len(points) > 1000:
+        return json_response({"success": False, "message": "单次最多查询 1000 个位置"}, status=400)
+    return json_response({
+        "success": True,
+        "model": model,
+        "profiles": borehole_profiles(stack, points),
+    })
+
+@app.route("/api/model/<model>/statistics", methods=["GET"])
+def api_model_statistics(model: str):
+    """各地层体积与厚度统计：?thresholds=1,5,10 统计厚度不小于各阈值的面积"""
+    from src.model_build.volume_stats import model_statistics
+
+    stack = open_horizon_stack(model)
+    if stack is None:
+        return json_response({"success": False, "message": f"模型 {model} 没有层面缓存，请重新生成"}, status=404)
+    try:
+        thresholds = [float(t) for t in request.args.get('thresholds', '').split(',') if t.strip()]
+    except ValueError:
+        return json_response({"success": False, "message": "thresholds 需为逗号分隔的数值"}, status=400)
+    stats = model_statistics(stack, thresholds[:20])
+    return json_response({"success": True, "model": model, **stats})
+
+@app.route("/api/model/<model>/subsidence", methods=["POST"])
+def api_model_subsidence(model: str):
+    """
+    开采沉陷变形：在层面缓存上计算沉陷，导出带 morph target 的 variants/<模型名>_subsidence.glb，
+    通过 /api/model/<模型名>_subsidence.glb 获取。
+    请求体 {center_x, center_y, Lx, Ly, mining_horizon? | mining_elevation?, q?, H?, beta_deg?, theta0_deg?,
+           alpha_deg?, loose_layers?}
+    mining_horizon 为采矿层面名称或序号（默认最底层面），mining_elevation 为采矿层高程，二者只给一个
+    """
+    stack = open_horizon_stack(model)
+    if stack is None:
+        return json_response({"success": False, "message": f"模型 {model} 没有层面缓存，请重新生成"}, status=404)
+    data = request.get_json() or {}
+    try:
+        horizon, elevation = data.get('mining_horizon'), data.get('mining_elevation')
+        if horizon is not None and elevation is not None:
+            raise ValueError("mining_horizon 与 mining_elevation 只能给出一个")
+        if elevation is not None:
+            if isinstance(elevation, bool):
+                raise ValueError("mining_elevation 需为数值")
+            mining_layer = float(elevation)
+        else:
+            mining_layer = stack.order[0] if horizon is None else horizon
+            if isinstance(mining_layer, bool) or not isinstance(mining_layer, (str, int)):
+                raise ValueError("mining_horizon 需为层面名称或序号")
+            if isinstance(mining_layer, int) and not 0 <= mining_layer < len(stack.order):
+                raise ValueError(f"层面序号超出范围: {mining_layer}")
+            if isinstance(mining_layer, str) and mining_layer not in stack.order:
+                raise ValueError(f"未知层面 {mining_layer}")
+        params = dict(
+            q_base=float(data.get('q', 0.9)),
+            H_base=float(data.get('H', 150.0)),
+            tan_beta_base=float(np.tan(np.deg2rad(float(data.get('beta_deg', 45.0))))),
+            theta0_base=float(np.deg2rad(float(data.get('theta0_deg', 70.0)))),
+            center_x=float(data['center_x']),
+            center_y=float(data['center_y']),
+            Lx=float(data['Lx']),
+            Ly=float(data['Ly']),
+            alpha=float(np.deg2rad(float(data.get('alpha_deg', 0.0)))),
+        )
+    except (KeyError, TypeError, ValueError) as e:
+        return json_response({"success": False, "message": f"沉陷参数错误: {e}"}, status=400)
+
+    output_name = f"{secure_filename(Path(model).stem)}_subsidence.glb"
+    MODEL_VARIANT_DIR.mkdir(exist_ok=True)
+    result = run_build_job(
+        workers.subsidence_model,
+        store_path=stack.path, output_path=str(MODEL_VARIANT_DIR / output_name), mining_layer=mining_layer,
+        layer_types={name: "loose" for name in data.get('loose_layers', [])},
+        **params,
+    )
+    CATALOG.record_model(result["output_path"], "variant", layer_names=stack.layer_names,
+                         params={"base_model": model, "mining_layer": mining_layer, **params})
+    return json_response({
+        "success": True,
+        "model": output_name,
+        "url": f"/api/model/{quote(output_name)}",
+        "target": result["target"],
+        "max_subsidence": result["max_subsidence"],
+        "layers": result["layers"],
+        "seconds": round(result["seconds"], 3),
+    })
+
+@app.route("/api/model/<model>/thumbnail", methods=["GET"])
+def api_model_thumbnail(model: str):
+    """模型预览缩略图：导出时已生成则直接返回，缺失或过期时由层面缓存离屏渲染一次"""
+    model_path = MODEL_GLTF_DIR / secure_filename(model)
+    if not model_path.suffix:
+        model_path = first_existing(model_path.with_suffix(".gltf"), model_path.with_suffix(".glb")) or model_path
+    thumb = Path(thumbnail_path(str(model_path)))
+    if not thumbnail_is_fresh(str(model_path)):
+        stack = open_horizon_stack(model)
+        if stack is None or run_build_job(workers.store_thumbnail, store_path=stack.path,
+                                          model_path=str(model_path)) is None:
+            if not thumb.exists():
+                return json_response({"success": False, "message": f"模型 {model} 没有可用的缩略图"}, status=404)
+    resp = send_from_directory(str(thumb.parent), thumb.name, max_age=300)
+    resp.headers["Access-Control-Allow-Origin"] = "*"
+    return resp
+
 # --------------- 中间件 ---------------
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(resp):
+    if metrics.enabled() and "request_start" in g:
+        # 按路由模板分组（/api/model/<model>），避免每个模型名各成一组
+        route = request.url_rule.rule if request.url_rule else "<unmatched>"
+        metrics.observe("modelshow_http_request_seconds", time.perf_counter() - g.request_start,
+                        route=route, method=request.method)
+        metrics.inc("modelshow_http_requests_total", route=route, method=request.method, status=resp.status_code)
+        if resp.content_length:
+            metrics.inc("modelshow_http_response_bytes_total", resp.content_length, route=route)
+    return resp
+
 @app.before_request
 def handle_request():
     # 日志记录
@@ -479,7 +886,10 @@ def handle_request():
     kind = "Browser" if "Mozilla" in agent else "Other"
     print(f"📥 {request.method} {request.path} - {kind}")
     
-    # 处理 .bin 文件请求
+    # 处理 .bin 文件请求（按文件名在各模型目录中查找的旧方式；
+    # /api/model/<模型>/assets/ 下的缓冲区带命名空间与内容哈希，交给对应路由）
+    if request.path.startswith("/api/model/"):
+        return None
     if request.path.endswith(".bin") or "gltf_buffer_" in request.path:
         fname = Path(request.path).name
         print(f"🔍 请求二进制文件: {request.path} -> {fname}")
@@ -544,18 +954,24 @@ def serve_spa(path):
 
 # --------------- 启动 ---------------
 if __name__ == "__main__":
+    # 端口可由环境变量 PORT 指定（如压测时在空闲端口上另起一个实例）
+    PORT = int(os.environ.get("PORT", "3000"))
 
     print("=" * 60)
     print("🚀 ModelShow Flask 服务器已启动")
-    print(f"🌐 本地访问:    http://localhost:3000")
-    print(f"🌐 局域网访问:  http://{get_local_ip()}:3000")
-    print(f"📊 模型API:     http://{get_local_ip()}:3000/api/model")
-    print(f"🏥 健康检查:    http://{get_local_ip()}:3000/api/health")
-    print(f"📁 模型列表:    http://{get_local_ip()}:3000/api/models")
-    print(f"📤 地层上传:    http://{get_local_ip()}:3000/api/stratum/upload")
-    print(f"📋 文件列表:    http://{get_local_ip()}:3000/api/stratum/files")
-    print(f"📄 数据读取:    http://{get_local_ip()}:3000/api/stratum/data/<filename>")
-    print(f"🏗️ 模型生成:    http://{get_local_ip()}:3000/api/model/generate")
+    print(f"🌐 本地访问:    http://localhost:{PORT}")
+    print(f"🌐 局域网访问:  http://{get_local_ip()}:{PORT}")
+    print(f"📊 模型API:     http://{get_local_ip()}:{PORT}/api/model")
+    print(f"🏥 健康检查:    http://{get_local_ip()}:{PORT}/api/health")
+    print(f"📁 模型列表:    http://{get_local_ip()}:{PORT}/api/models")
+    print(f"📈 运行指标:    http://{get_local_ip()}:{PORT}/api/metrics")
+    print(f"📤 地层上传:    http://{get_local_ip()}:{PORT}/api/stratum/upload")
+    print(f"📋 文件列表:    http://{get_local_ip()}:{PORT}/api/stratum/files")
+    print(f"📄 数据读取:    http://{get_local_ip()}:{PORT}/api/stratum/data/<filename>")
+    print(f"🏗️ 模型生成:    http://{get_local_ip()}:{PORT}/api/model/generate")
+    print(f"📐 剖面查询:    http://{get_local_ip()}:{PORT}/api/model/<模型名>/section")
+    print(f"📊 体积统计:    http://{get_local_ip()}:{PORT}/api/model/<模型名>/statistics")
+    print(f"🕳️ 虚拟钻孔:    http://{get_local_ip()}:{PORT}/api/model/<模型名>/profile?x=&y=")
     print("=" * 60)
 
     # 环境检查
@@ -574,4 +990,8 @@ if __name__ == "__main__":
     else:
         print("⚠️  警告: public/model_gltf 目录不存在")
 
-    app.run(host="0.0.0.0", port=3000, debug=False)
+    if BUILD_WORKERS > 0:
+        BUILD_POOL = workers.BuildWorkerPool(BUILD_WORKERS, BUILD_WORKER_MAX_JOBS, BUILD_WORKER_MAX_RSS_MB)
+        print(f"🧵 建模工作进程: {BUILD_WORKERS} 个（每 {BUILD_WORKER_MAX_JOBS} 个任务或超过 {BUILD_WORKER_MAX_RSS_MB:.0f}MB 后替换）")
+
+    app.run(host="0.0.0.0", port=PORT, debug=False)
@@ -0,0 +1,139 @@
+"""
+建模范围边界：凸包、alpha-shape 凹包或用户给定多边形。
+
+在克里金插值之前用边界裁剪网格点，只对边界内节点插值；
+Block 构建三棱柱时再剔除质心落在边界外的三角形（Delaunay 总是铺满点集凸包，
+凹形边界必须显式剔除），从而避免在无钻孔的空白角落外推、生成无意义网格。
+"""
+import numpy as np
+from matplotlib.path import Path
+from scipy.spatial import ConvexHull, Delaunay
+
+
+def convex_hull_polygon(xy: np.ndarray) -> np.ndarray:
+    """返回点集凸包多边形顶点 (N, 2)，按逆时针排列。"""
+    hull = ConvexHull(xy)
+    return xy[hull.vertices]
+
+
+def _polygon_area(poly: np.ndarray) -> float:
+    x, y = poly[:, 0], poly[:, 1]
+    return 0.5 * abs(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1)))
+
+
+def concave_hull_polygon(xy: np.ndarray, alpha: float = None) -> np.ndarray:
+    """
+    alpha-shape 凹包：剔除外接圆半径大于 alpha 的 Delaunay 三角形后取外边界。
+    参数:
+        xy: 平面点 (N, 2)
+        alpha: 外接圆半径阈值；默认取 Delaunay 边长中位数的 2 倍
+    返回:
+        面积最大的边界环 (M, 2)；无法形成闭合环时退化为凸包
+    """
+    tri = Delaunay(xy)
+    pts = xy[tri.simplices]                      # (T, 3, 2)
+    a = np.linalg.norm(pts[:, 1] - pts[:, 2], axis=1)
+    b = np.linalg.norm(pts[:, 0] - pts[:, 2], axis=1)
+    c = np.linalg.norm(pts[:, 0] - pts[:, 1], axis=1)
+    if alpha is None:
+        alpha = 2.0 * np.median(np.concatenate([a, b, c]))
+    s = (a + b + c) / 2.0
+    area = np.sqrt(np.clip(s * (s - a) * (s - b) * (s - c), 0, None))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        radius = a * b * c / (4.0 * area)
+    kept = tri.simplices[np.isfinite(radius) & (radius <= alpha)]
+    if len(kept) == 0:
+        return convex_hull_polygon(xy)
+
+    # 只出现一次的边即为外边界
+    edges = np.sort(np.concatenate([kept[:, [0, 1]], kept[:, [1, 2]], kept[:, [2, 0]]]), axis=1)
+    uniq, counts = np.unique(edges, axis=0, return_counts=True)
+    boundary = uniq[counts == 1]
+
+    neighbors = {}
+    for u, v in boundary:
+        neighbors.setdefault(u, []).append(v)
+        neighbors.setdefault(v, []).append(u)
+
+    # 串联为闭合环，取面积最大者
+    visited = set()
+    best, best_area = None, 0.0
+    for start in neighbors:
+        if start in visited:
+            continue
+        ring, prev, cur = [start], None, start
+        visited.add(start)
+        while True:
+            nxt = [n for n in neighbors[cur] if n != prev and (n not in visited or n == start)]
+            if not nxt or nxt[0] == start:
+                break
+            prev, cur = cur, nxt[0]
+            ring.append(cur)
+            visited.add(cur)
+        if len(ring) >= 3:
+            poly = xy[ring]
+            ring_area = _polygon_area(poly)
+            if ring_area > best_area:
+                best, best_area = poly, ring_area
+    return best if best is not None else convex_hull_polygon(xy)
+
+
+def resolve_boundary(boundary, layers: dict, alpha: float = None):
+    """
+    将边界参数解析为多边形顶点。
+    参数:
+        boundary: None、"convex"、"concave" 或多边形顶点序列 [(x, y), ...]
+        layers: 地层点字典，凸包/凹包由各层输入点的平面位置计算
+        alpha: 凹包参数，见 concave_hull_polygon
+    返回:
+        多边形顶点 (N, 2)，boundary 为 None 时返回 None
+    """
+    if boundary is None:
+        return None
+    if isinstance(boundary, str):
+        xy = np.unique(np.vstack([df[["x", "y"]].to_numpy() for df in layers.values()]), axis=0)
+        if boundary == "convex":
+            return convex_hull_polygon(xy)
+        if boundary == "concave":
+            return concave_hull_polygon(xy, alpha)
+        raise ValueError(f"未知的边界类型: {boundary}")
+    polygon = np.asarray(boundary, dtype=float)
+    if polygon.ndim != 2 or polygon.shape[1] != 2 or len(polygon) < 3:
+        raise ValueError("边界多边形需为至少 3 个 (x, y) 顶点")
+    return polygon
+
+
+def densify_polygon(polygon: np.ndarray, spacing: float) -> np.ndarray:
+    """沿多边形各边按 spacing 插入顶点，使网格贴合边界。"""
+    out = []
+    for p, q in zip(polygon, np.roll(polygon, -1, axis=0)):
+        n = max(int(np.ceil(np.linalg.norm(q - p) / spacing)), 1)
+        t = np.arange(n)[:, None] / n
+        out.append(p + t * (q - p))
+    return np.vstack(out)
+
+
+def mask_grid(grid_points: np.ndarray, polygon: np.ndarray, spacing: float = None) -> np.ndarray:
+    """
+    保留边界内的网格点，并加入加密后的边界顶点。
+    参数:
+        grid_points: 原始网格点 (N, 2)
+        polygon: 边界多边形 (M, 2)
+        spacing: 边界加密间距，默认按网格点平均间距估算
+    返回:
+        裁剪后的网格点 (K, 2)
+    """
+    inside = Path(polygon).contains_points(grid_points)
+    if spacing is None:
+        extent = np.ptp(grid_points, axis=0)
+        spacing = np.sqrt(extent[0] * extent[1] / max(len(grid_points), 1))
+    edge = densify_polygon(polygon, spacing)
+    masked = np.unique(np.round(np.vstack([grid_points[inside], edge]), 6), axis=0)
+    print(f"边界裁剪：网格点 {len(grid_points)} → {len(masked)}")
+    return masked
+
+
+def triangles_inside(xy: np.ndarray, simplices: np.ndarray, polygon: np.ndarray) -> np.ndarray:
+    """返回质心位于边界内的三角形掩码。"""
+    centroids = xy[simplices].mean(axis=1)
+    return Path(polygon).contains_points(centroids)
@@ -1,41 +1,147 @@
+import json
+import os
 import numpy as np
 import pyvista as pv
 from scipy.spatial import Delaunay
+from .boundary import triangles_inside
+from . import metrics
 import trimesh
-import py3dtiles
-import matplotlib.font_manager as fm
-#设置字体文件路径
-font_path = 'SimHei.ttf'
-#注册字体文件
-prop = fm.FontProperties(fname=font_path)
+
+# 导出用地层颜色 (RGBA格式)
+GLTF_COLORS = [
+    [144, 238, 144, 255],  # lightgreen
+    [135, 206, 250, 255],  # lightskyblue
+    [240, 128, 128, 255],  # lightcoral
+    [240, 230, 140, 255],  # khaki
+    [221, 160, 221, 255],  # plum
+    [255, 215, 0, 255],    # gold
+    [255, 140, 0, 255],    # darkorange
+    [0, 255, 255, 255],    # cyan
+    [255, 0, 255, 255],    # magenta
+    [0, 255, 0, 255],      # lime
+    [255, 192, 203, 255],  # pink
+]
+
+# PyVista 绘图用地层颜色（与 GLTF_COLORS 顺序一致）
+PLOT_COLORS = [
+    'lightgreen', 'lightskyblue', 'lightcoral', 'khaki', 'plum',
+    'gold', 'darkorange', 'cyan', 'magenta', 'lime', 'pink'
+]
+
+
+def shell_mesh(mesh):
+    """
+    提取地层块体的外壳（顶面、底面与外侧面）三角网格。
+    相邻三棱柱共享的内部侧面会成对重复出现，只出现一次的三角形即为外壳。
+    """
+    tri = mesh.triangulate()
+    faces = tri.faces.reshape(-1, 4)[:, 1:]
+    _, inverse, counts = np.unique(np.sort(faces, axis=1), axis=0, return_inverse=True, return_counts=True)
+    faces = faces[counts[inverse.ravel()] == 1]
+    return pv.PolyData(tri.points, np.c_[np.full(len(faces), 3), faces].ravel()).clean()
+
+
+class PrismBlocks:
+    """
+    相邻两个层面之间三棱柱块体的惰性视图。
+    只持有两个层面的 (N, 3) 顶点数组与共享的三角形索引，按需取出单个块体，
+    不再为每个三角形生成由行视图组成的 Python 列表。
+    """
+
+    def __init__(self, upper, lower, simplices):
+        self.upper = upper
+        self.lower = lower
+        self.simplices = simplices
+
+    def __len__(self):
+        return len(self.simplices)
+
+    def __getitem__(self, i):
+        """第 i 个块体的 6 个顶点 (6, 3)：A, B, C, A′, B′, C′。"""
+        ids = self.simplices[i]
+        return np.concatenate((self.upper[ids], self.lower[ids]))
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def as_array(self):
+        """一次性取出全部块体 (T, 6, 3)。"""
+        return np.concatenate((self.upper[self.simplices], self.lower[self.simplices]), axis=1)
+
+
 class Block:
-    def __init__(self, xy=None, z_list=None, layer_names=None):
-        self.xy = xy
+    def __init__(self, xy=None, z_list=None, layer_names=None, boundary=None, dtype=np.float64):
+        self.dtype = dtype  # z 堆栈的数据类型，float32 可再减半内存
+        self.xy = None if xy is None else np.ascontiguousarray(xy, dtype=np.float64)
         self.z_list = z_list
         self.layer_names = layer_names  # 添加地层名称
+        self.boundary = boundary  # 可选边界多边形 (N, 2)，边界外的三角形不生成块体
         self.mesh_list = []
+        self._simplices = None
+
+    @property
+    def z_list(self):
+        """各层面 z 值（z_stack 的行视图，不复制数据）。"""
+        return None if self.z_stack is None else list(self.z_stack)
+
+    @z_list.setter
+    def z_list(self, z_list):
+        # 连续存放的 (n_layers, n_points) 层面高程
+        self.z_stack = None if z_list is None else np.ascontiguousarray(np.vstack(z_list), dtype=self.dtype)
+
+    @property
+    def simplices(self):
+        """平面三角网索引 (T, 3) int32，首次使用时计算并缓存。"""
+        if self._simplices is None:
+            with metrics.timer("delaunay"):
+                tri = Delaunay(self.xy)
+            simplices = tri.simplices
+            if self.boundary is not None:
+                simplices = simplices[triangles_inside(self.xy, simplices, self.boundary)]
+            self._simplices = np.ascontiguousarray(simplices, dtype=np.int32)
+        return self._simplices
+
+    def layer_points(self, idx):
+        """第 idx 个层面的顶点 (N, 3)。"""
+        return np.column_stack((self.xy, self.z_stack[idx]))
 
     # 实际数据
     def generate_layers_from_xyz(self):#z_list 中的数据是每层相交点的坐标
-        x, y = self.xy[:, 0], self.xy[:, 1]
-        layer_list = []
-        for z in self.z_list:
-            layer = np.column_stack((x, y, z))
-            layer_list.append(layer)
-        
-        return layer_list
-
-    def build_prism_blocks(self,upper, lower):
-        tri = Delaunay(upper[:, :2])
-        simplices = tri.simplices
-        blocks = []
-        for tri_ids in simplices:
-            A, B, C = upper[tri_ids]
-            A_, B_, C_ = lower[tri_ids]
-            blocks.append([A, B, C, A_, B_, C_])
-        return blocks
-
-    def create_pyvista_mesh_from_blocks(self,blocks):
+        return [self.layer_points(i) for i in range(len(self.z_stack))]
+
+    def build_prism_blocks(self, upper, lower):
+        if self.xy is not None and len(upper) == len(self.xy):
+            simplices = self.simplices
+        else:
+            with metrics.timer("delaunay"):
+                simplices = Delaunay(upper[:, :2]).simplices
+            if self.boundary is not None:
+                simplices = simplices[triangles_inside(upper[:, :2], simplices, self.boundary)]
+            simplices = simplices.astype(np.int32)
+        return PrismBlocks(upper, lower, simplices)
+
+    @metrics.timed("mesh_assembly")
+    def create_pyvista_mesh_from_blocks(self, blocks):
+        if isinstance(blocks, PrismBlocks):
+            # 向量化构建：上下两个层面的顶点直接拼接，面索引由三角网索引计算
+            n = len(blocks.upper)
+            points = np.vstack((blocks.upper, blocks.lower))
+            a, b, c = (blocks.simplices[:, k].astype(np.int64) for k in range(3))
+            a_, b_, c_ = a + n, b + n, c + n
+            t = len(a)
+            tris = np.column_stack((np.full(t, 3), a, b, c, np.full(t, 3), a_, b_, c_))
+            quads = np.column_stack((
+                np.full(t, 4), a, b, b_, a_,  # side 1
+                np.full(t, 4), b, c, c_, b_,  # side 2
+                np.full(t, 4), c, a, a_, c_,  # side 3
+            ))
+            faces = np.concatenate((tris, quads), axis=1).ravel()
+            mesh = pv.PolyData(points, faces)
+            # 合并重合点（尖灭处上下层面重合），与原先按坐标去重一致
+            mesh.clean(inplace=True)
+            return mesh
+
         all_faces = []
         all_points = []
         point_id_map = {}
@@ -60,12 +166,6 @@ class Block:
             faces = [
                 [3, ids[0], ids[1], ids[2]],  # top
                 [3, ids[3], ids[4], ids[5]],  # bottom
-                # [3, ids[0], ids[1], ids[4]],
-                # [3, ids[0], ids[4], ids[3]],
-                # [3, ids[1], ids[2], ids[5]],
-                # [3, ids[1], ids[5], ids[4]],
-                # [3, ids[2], ids[0], ids[3]],
-                # [3, ids[2], ids[3], ids[5]],
                 [4, ids[0], ids[1], ids[4], ids[3]],  # side 1
                 [4, ids[1], ids[2], ids[5], ids[4]],  # side 2
                 [4, ids[2], ids[0], ids[3], ids[5]],  # side 3
@@ -79,6 +179,76 @@ class Block:
         mesh.clean(inplace=True)
         return mesh
 
+    def build_layer_mesh(self, idx, layer_list=None):
+        """构建第 idx 个地层（第 idx 与 idx+1 个层面之间）的块体网格。"""
+        if layer_list is None:
+            blocks = self.build_prism_blocks(self.layer_points(idx), self.layer_points(idx + 1))
+        else:
+            blocks = self.build_prism_blocks(layer_list[idx], layer_list[idx + 1])
+        return self.create_pyvista_mesh_from_blocks(blocks)
+
+    def layer_label(self, idx):
+        """第 idx 个地层的 ASCII 名称（用于导出节点名和文件名）。"""
+        layer_name = self.layer_names[idx] if self.layer_names and idx < len(self.layer_names) else f'layer_{idx}'
+        return layer_name.encode('ascii', 'ignore').decode('ascii')
+
+    def mesh_to_trimesh(self, mesh, idx, rotate_axes=True):
+        """
+        将 PyVista 网格转换为带颜色的 trimesh.Trimesh；没有有效面时返回 None。
+        参数:
+            mesh: PyVista PolyData
+            idx: 地层序号（决定颜色）
+            rotate_axes: 是否调整坐标轴 (X, Y, Z) -> (X, Z, Y)
+        """
+        vertices_original = mesh.points
+        if rotate_axes:
+            # 修复坐标轴方向：确保Z轴垂直向上，地层垂直排列
+            # 原始: (X, Y, Z) -> 调整: (X, Z, Y)
+            vertices = np.column_stack((
+                vertices_original[:, 0],  # X保持不变
+                vertices_original[:, 2],  # Z作为新的Y (垂直方向)
+                vertices_original[:, 1]   # Y作为新的Z (深度方向)
+            ))
+        else:
+            vertices = vertices_original
+        faces_data = mesh.faces
+
+        # 处理面数据：PyVista的面数据格式为 [n, v1, v2, v3, ...]
+        # 需要转换为trimesh的三角形面格式
+        faces = []
+        with metrics.timer("face_triangulation"):
+            i = 0
+            while i < len(faces_data):
+                n_vertices = faces_data[i]
+                if n_vertices == 3:  # 三角形面
+                    faces.append(faces_data[i+1:i+4])
+                elif n_vertices == 4:  # 四边形面，分解为两个三角形
+                    quad = faces_data[i+1:i+5]
+                    faces.append([quad[0], quad[1], quad[2]])
+                    faces.append([quad[0], quad[2], quad[3]])
+                i += n_vertices + 1
+
+        if not faces:
+            return None
+
+        tri_mesh = trimesh.Trimesh(vertices=vertices, faces=np.array(faces))
+        tri_mesh.visual.face_colors = GLTF_COLORS[idx % len(GLTF_COLORS)]
+        return tri_mesh
+
+    def export_layer(self, idx, output_path, mesh=None, rotate_axes=True):
+        """
+        单独导出第 idx 个地层；建议使用 .glb 以免多个文件的 gltf_buffer_N.bin 互相覆盖。
+        返回是否成功导出。
+        """
+        if mesh is None:
+            mesh = self.mesh_list[idx]
+        tri_mesh = self.mesh_to_trimesh(mesh, idx, rotate_axes)
+        if tri_mesh is None:
+            print(f"警告：第{idx}层网格没有有效的面数据，跳过")
+            return False
+        tri_mesh.export(output_path)
+        return True
+
     def execute(self):
         self.visualization_block()
 
@@ -95,29 +265,11 @@ class Block:
         # 构建相邻层之间的三棱柱块集合
         # block_list = [self.build_prism_blocks(layer_list[i], layer_list[i+1])
         #               for i in range(len(layer_list)-1)]
-        block_list = []
-        cnt = 0
-        interval = 0
-        for i in range(len(layer_list)-1):
-        
-            blocks1 = self.build_prism_blocks(layer_list[i]+np.array([0,0,cnt]), layer_list[i+1]+np.array([0,0,cnt]))
-            block_list.append(blocks1)
-            cnt += interval
-
-        mesh_list = [self.create_pyvista_mesh_from_blocks(blks) for blks in block_list]
+        mesh_list = [self.build_layer_mesh(i, layer_list) for i in range(len(layer_list)-1)]
         self.mesh_list = mesh_list  # 保存以便后续导出使用
-        # 扩展颜色列表
-        extended_colors = [
-            'lightgreen', 'lightskyblue', 'lightcoral', 'khaki', 'plum',
-            'gold', 'darkorange', 'cyan', 'magenta', 'lime', 'pink'
-        ]
 
         plotter = pv.Plotter(off_screen=off_screen)
-        for idx, mesh in enumerate(mesh_list[::-1]):  # 反向绘制保证上层不被完全遮挡
-            color = extended_colors[idx % len(extended_colors)]
-            layer_label = self.layer_names[len(mesh_list) - idx - 1] if self.layer_names else f'layer{len(mesh_list)-idx}'
-            plotter.add_mesh(mesh, color=color, opacity=1, show_edges=True, label=layer_label)
-        
+        self.add_layers_to_plotter(plotter, mesh_list)
         # plotter.set_scale(zscale=10)
         plotter.add_legend()
         plotter.add_axes()
@@ -125,12 +277,56 @@ class Block:
 
         # 后端环境不需要展示只保存
         # window_title = title or f'{len(mesh_list)+1}层地层体块模型(PyVista)'
-        # if screenshot_path:
-        #     plotter.show(title=window_title, screenshot=screenshot_path, auto_close=True)
-        # else:
-        #     plotter.show(title=window_title)
-        
+        # plotter.show(title=window_title)
+        if screenshot_path:
+            plotter.screenshot(screenshot_path)
+        plotter.close()
+
+    def add_layers_to_plotter(self, plotter, mesh_list, show_edges=True):
+        """按地层颜色把各地层网格加入 plotter，反向绘制保证上层不被完全遮挡。"""
+        for idx, mesh in enumerate(mesh_list[::-1]):
+            color = PLOT_COLORS[idx % len(PLOT_COLORS)]
+            layer_label = self.layer_names[len(mesh_list) - idx - 1] if self.layer_names else f'layer{len(mesh_list)-idx}'
+            plotter.add_mesh(mesh, color=color, opacity=1, show_edges=show_edges, label=layer_label)
+
+    def shell_meshes(self):
+        """
+        各地层外壳网格（顶面、底面与外边界侧面），与共享界面 GLTF 的拓扑相同。
+        不构建三棱柱块体，用于缩略图等只需外观的场合。
+        """
+        from .gltf_shared import outline_edges, stratum_indices
+
+        n = len(self.xy)
+        simplices = self.simplices
+        indices = stratum_indices(simplices, outline_edges(simplices), n)
+        faces = np.column_stack((np.full(len(indices), 3), indices)).ravel()
+        return [
+            pv.PolyData(np.vstack((self.layer_points(i), self.layer_points(i + 1))), faces)
+            for i in range(len(self.z_stack) - 1)
+        ]
 
+    @metrics.timed("render_thumbnail")
+    def render_thumbnail(self, output_path, window_size=(320, 240), show_edges=False):
+        """
+        离屏渲染模型缩略图（PNG）。
+        参数:
+            output_path: 输出图片路径
+            window_size: 图片尺寸 (宽, 高)
+            show_edges: 是否绘制网格线（小图上通常只会显得杂乱）
+        """
+        if self.z_stack is None or len(self.z_stack) < 2:
+            raise ValueError("需要至少两层数据才能构建块体")
+        plotter = pv.Plotter(off_screen=True, window_size=list(window_size))
+        try:
+            self.add_layers_to_plotter(plotter, self.shell_meshes(), show_edges=show_edges)
+            plotter.set_background('white')
+            plotter.view_isometric()
+            plotter.screenshot(output_path)
+        finally:
+            plotter.close()
+        return output_path
+
+    @metrics.timed("export_vtm")
     def export_model(self, output_path="model.vtm"):
         """
         导出模型为 .vtm 文件，支持不同地层显示不同颜色。
@@ -138,15 +334,9 @@ class Block:
             output_path: 导出的文件路径
         """
 
-        # 为每个地层分配颜色
-        extended_colors = [
-            'lightgreen', 'lightskyblue', 'lightcoral', 'khaki', 'plum',
-            'gold', 'darkorange', 'cyan', 'magenta', 'lime', 'pink'
-        ]
-
         combined_mesh = pv.MultiBlock()
         for idx, mesh in enumerate(self.mesh_list[::-1]):
-            color = extended_colors[idx % len(extended_colors)]
+            color = PLOT_COLORS[idx % len(PLOT_COLORS)]
             layer_label = self.layer_names[len(self.mesh_list) - idx - 1] if self.layer_names else f'layer{len(self.mesh_list)-idx}'
             mesh["layer"] = layer_label.encode('ascii', 'ignore').decode('ascii')  # 确保地层名称为 ASCII 编码
             mesh["color"] = color  # 添加颜色属性
@@ -156,6 +346,7 @@ class Block:
         combined_mesh.save(output_path)
         print(f"模型已导出到 {output_path}")
 
+    @metrics.timed("export_gltf_trimesh")
     def export_to_gltf_trimesh(self, output_path="model.gltf", rotate_axes=True):
         """
         使用Trimesh导出为GLTF格式，支持材质和颜色
@@ -171,233 +362,102 @@ class Block:
             raise ValueError("没有可导出的网格数据，请先执行 visualization_block 方法")
             
         try:
-            # 扩展颜色列表 (RGBA格式)
-            extended_colors = [
-                [144, 238, 144, 255],  # lightgreen
-                [135, 206, 250, 255],  # lightskyblue  
-                [240, 128, 128, 255],  # lightcoral
-                [240, 230, 140, 255],  # khaki
-                [221, 160, 221, 255],  # plum
-                [255, 215, 0, 255],    # gold
-                [255, 140, 0, 255],    # darkorange
-                [0, 255, 255, 255],    # cyan
-                [255, 0, 255, 255],    # magenta
-                [0, 255, 0, 255],      # lime
-                [255, 192, 203, 255],  # pink
-            ]
-            
             scene = trimesh.Scene()
             
             for idx, mesh in enumerate(self.mesh_list):
-                # 获取顶点和面数据
-                vertices_original = mesh.points
-                if rotate_axes:
-                    # 修复坐标轴方向：确保Z轴垂直向上，地层垂直排列
-                    # 原始: (X, Y, Z) -> 调整: (X, Z, Y) 
-                    vertices = np.column_stack((
-                        vertices_original[:, 0],  # X保持不变
-                        vertices_original[:, 2],  # Z作为新的Y (垂直方向)
-                        vertices_original[:, 1]   # Y作为新的Z (深度方向)
-                    ))
-                else:
-                    vertices = vertices_original
-                faces_data = mesh.faces
-                
-                # 处理面数据：PyVista的面数据格式为 [n, v1, v2, v3, ...] 
-                # 需要转换为trimesh的三角形面格式
-                faces = []
-                i = 0
-                while i < len(faces_data):
-                    n_vertices = faces_data[i]
-                    if n_vertices == 3:  # 三角形面
-                        faces.append(faces_data[i+1:i+4])
-                    elif n_vertices == 4:  # 四边形面，分解为两个三角形
-                        quad = faces_data[i+1:i+5]
-                        faces.append([quad[0], quad[1], quad[2]])
-                        faces.append([quad[0], quad[2], quad[3]])
-                    i += n_vertices + 1
-                
-                if not faces:
+                tri_mesh = self.mesh_to_trimesh(mesh, idx, rotate_axes)
+                if tri_mesh is None:
                     print(f"警告：第{idx}层网格没有有效的面数据，跳过")
                     continue
                 
-                faces = np.array(faces)
-                
-                # 创建trimesh对象
-                tri_mesh = trimesh.Trimesh(vertices=vertices, faces=faces)
-                
-                # 设置颜色
-                color = extended_colors[idx % len(extended_colors)]
-                tri_mesh.visual.face_colors = color
-                
-                # 添加到场景
-                layer_name = self.layer_names[idx] if self.layer_names and idx < len(self.layer_names) else f'layer_{idx}'
-                # 确保层名称为ASCII编码
-                layer_name_ascii = layer_name.encode('ascii', 'ignore').decode('ascii')
-                scene.add_geometry(tri_mesh, node_name=layer_name_ascii)
+                # 添加到场景（层名称为ASCII编码）
+                scene.add_geometry(tri_mesh, node_name=self.layer_label(idx))
             
-            # 导出为GLTF
-            scene.export(output_path)
+            # 导出为GLTF；trimesh 默认缓冲区名为 gltf_buffer_N.bin，同一目录下的多个模型会互相覆盖，
+            # 这里改为以模型名为前缀
+            if output_path.lower().endswith(".gltf"):
+                self._write_gltf_files(scene, output_path)
+            else:
+                scene.export(output_path)
             print(f"GLTF模型已导出到 {output_path}")
             
         except Exception as e:
             print(f"导出GLTF时出错: {e}")
             print("请确保已安装完整的trimesh库：pip install trimesh[easy]")
 
-    def export_to_3dtiles(self, output_dir="3dtiles_model", center_coords=None, rotate_axes=True):
+    @staticmethod
+    def _write_gltf_files(scene, output_path):
+        """写出 .gltf 及以模型名为前缀的缓冲区文件 <模型名>_buffer_N.bin。"""
+        files = trimesh.exchange.gltf.export_gltf(scene)
+        out_dir = os.path.dirname(output_path)
+        stem = os.path.splitext(os.path.basename(output_path))[0]
+        renamed = {name: f"{stem}_buffer_{i}.bin" for i, name in enumerate(sorted(n for n in files if n.endswith(".bin")))}
+        gltf = json.loads(files["model.gltf"])
+        for buf in gltf.get("buffers", []):
+            if buf.get("uri") in renamed:
+                buf["uri"] = renamed[buf["uri"]]
+        for name, new_name in renamed.items():
+            with open(os.path.join(out_dir, new_name), "wb") as f:
+                f.write(files[name])
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(gltf, f)
+
+    @metrics.timed("export_gltf_shared")
+    def export_to_gltf_shared(self, output_path="model.gltf", rotate_axes=True, strata=None, targets=None):
         """
-        导出模型为3DTiles格式，适用于Cesium等Web 3D应用
+        直接由层面堆栈导出 GLTF/GLB，相邻地层共享界面顶点，无需先构建三棱柱网格。
+        参数:
+            output_path: 导出的文件路径（.gltf 或 .glb）
+            rotate_axes: 是否调整坐标轴 (X, Y, Z) -> (X, Z, Y)
+            strata: 只导出这些地层序号（连续），默认全部
+            targets: 变形目标 {名称: (n_layers, N) 变形后层面 z 值}，写为 morph target
+        返回:
+            统计信息 {vertices, triangles, bytes}
+        """
+        from .gltf_shared import export_shared_gltf
+
+        if self.z_stack is None or len(self.z_stack) < 2:
+            raise ValueError("需要至少两层数据才能构建块体")
+        labels = [self.layer_label(i) for i in range(len(self.z_stack) - 1)]
+        stats = export_shared_gltf(
+            self.xy, self.z_stack, labels, output_path, GLTF_COLORS,
+            boundary=self.boundary, rotate_axes=rotate_axes, strata=strata, targets=targets
+        )
+        print(f"GLTF模型已导出到 {output_path}（共享界面：{stats['vertices']} 顶点，{stats['triangles']} 三角形）")
+        return stats
+
+    @metrics.timed("export_3dtiles")
+    def export_to_3dtiles(self, output_dir="3dtiles_model", center_coords=None, rotate_axes=True,
+                          max_faces_per_tile=20000, max_depth=4):
+        """
+        导出模型为带多级细节（LOD）的3DTiles格式，适用于Cesium等Web 3D应用
         参数:
             output_dir: 导出的目录路径
-            center_coords: 模型中心坐标 [longitude, latitude, height]，默认为 [0, 0, 0]
-            rotate_axes: 是否调整坐标轴以修复旋转问题 (默认True)
+            center_coords: 模型中心坐标 [longitude, latitude, height]，默认为 [116.0, 39.0, 0]
+            rotate_axes: 保留兼容；3DTiles 的 glTF Y 轴向上约定由分块器统一处理
+            max_faces_per_tile: 单个瓦片的三角形上限
+            max_depth: 四叉树最大深度
         """
-        if py3dtiles is None:
-            print("需要安装py3dtiles库：pip install py3dtiles")
-            return
-            
+        from .tiling import export_tileset
+
         if not self.mesh_list:
             raise ValueError("没有可导出的网格数据，请先执行 visualization_block 方法")
-            
+
         try:
-            import os
-            import json
-            
-            # 创建输出目录
-            os.makedirs(output_dir, exist_ok=True)
-            
-            # 设置默认中心坐标
-            if center_coords is None:
-                center_coords = [116.0, 39.0, 0]  # 北京坐标作为默认值
-                
-            lon, lat, height = center_coords
-            
-            # 创建tileset.json文件
-            tileset = {
-                "asset": {"version": "1.0"},
-                "geometricError": 500,
-                "root": {
-                    "boundingVolume": {
-                        "region": [
-                            np.radians(lon - 0.01),  # west
-                            np.radians(lat - 0.01),  # south  
-                            np.radians(lon + 0.01),  # east
-                            np.radians(lat + 0.01),  # north
-                            height - 100,            # minimum height
-                            height + 100             # maximum height
-                        ]
-                    },
-                    "geometricError": 100,
-                    "children": []
-                }
-            }
-            
-            # 扩展颜色列表 (RGB格式，0-1范围)
-            extended_colors = [
-                [0.565, 0.933, 0.565],  # lightgreen
-                [0.529, 0.808, 0.980],  # lightskyblue
-                [0.941, 0.502, 0.502],  # lightcoral
-                [0.941, 0.902, 0.549],  # khaki
-                [0.867, 0.627, 0.867],  # plum
-                [1.0, 0.843, 0.0],      # gold
-                [1.0, 0.549, 0.0],      # darkorange
-                [0.0, 1.0, 1.0],        # cyan
-                [1.0, 0.0, 1.0],        # magenta
-                [0.0, 1.0, 0.0],        # lime
-                [1.0, 0.753, 0.796],    # pink
-            ]
-            
-            # 为每个地层创建一个tile
-            for idx, mesh in enumerate(self.mesh_list):
-                layer_name = self.layer_names[idx] if self.layer_names and idx < len(self.layer_names) else f'layer_{idx}'
-                layer_name_ascii = layer_name.encode('ascii', 'ignore').decode('ascii')
-                
-                # 先导出为GLTF格式
-                gltf_filename = f"{layer_name_ascii}_{idx}.gltf"
-                gltf_path = os.path.join(output_dir, gltf_filename)
-                
-                # 使用trimesh导出单个地层为GLTF
-                if trimesh is not None:
-                    vertices_original = mesh.points
-                    if rotate_axes:
-                        # 修复坐标轴方向：确保Z轴垂直向上，地层垂直排列
-                        vertices = np.column_stack((
-                            vertices_original[:, 0],  # X保持不变
-                            vertices_original[:, 2],  # Z作为新的Y (垂直方向)
-                            vertices_original[:, 1]   # Y作为新的Z (深度方向)
-                        ))
-                    else:
-                        vertices = vertices_original
-                    faces_data = mesh.faces
-                    
-                    # 处理面数据
-                    faces = []
-                    i = 0
-                    while i < len(faces_data):
-                        n_vertices = faces_data[i]
-                        if n_vertices == 3:
-                            faces.append(faces_data[i+1:i+4])
-                        elif n_vertices == 4:
-                            quad = faces_data[i+1:i+5]
-                            faces.append([quad[0], quad[1], quad[2]])
-                            faces.append([quad[0], quad[2], quad[3]])
-                        i += n_vertices + 1
-                    
-                    if faces:
-                        faces = np.array(faces)
-                        tri_mesh = trimesh.Trimesh(vertices=vertices, faces=faces)
-                        
-                        # 设置颜色
-                        color_rgb = extended_colors[idx % len(extended_colors)]
-                        color_rgba = color_rgb + [1.0]  # 添加alpha通道
-                        tri_mesh.visual.face_colors = [int(c * 255) for c in color_rgba]
-                        
-                        # 导出为GLTF
-                        tri_mesh.export(gltf_path)
-                        
-                        # 添加到tileset
-                        child_tile = {
-                            "boundingVolume": {
-                                "region": [
-                                    np.radians(lon - 0.005),
-                                    np.radians(lat - 0.005),
-                                    np.radians(lon + 0.005),
-                                    np.radians(lat + 0.005),
-                                    height + idx * 10 - 50,
-                                    height + idx * 10 + 50
-                                ]
-                            },
-                            "geometricError": 50,
-                            "content": {
-                                "uri": gltf_filename
-                            }
-                        }
-                        tileset["root"]["children"].append(child_tile)
-                        
-                        print(f"已导出地层 {layer_name} 到 {gltf_filename}")
-                else:
-                    print(f"警告：trimesh未安装，无法导出地层 {layer_name}")
-            
-            # 保存tileset.json
-            tileset_path = os.path.join(output_dir, "tileset.json")
-            with open(tileset_path, 'w', encoding='utf-8') as f:
-                json.dump(tileset, f, indent=2, ensure_ascii=False)
-            
+            tileset_path = export_tileset(self, output_dir, center_coords, max_faces_per_tile, max_depth)
             print(f"3DTiles模型已导出到 {output_dir}")
             print(f"主文件: {tileset_path}")
-            print(f"模型中心坐标: 经度 {lon}, 纬度 {lat}, 高度 {height}")
             print("可以在Cesium等支持3DTiles的应用中加载此模型")
-            
         except Exception as e:
             print(f"导出3DTiles时出错: {e}")
-            print("请确保已安装py3dtiles库：pip install py3dtiles")
 
 if __name__ == "__main__":
 
     print("请使用实际的 xy 坐标和 z_list 数据来创建 Block 实例")
     print("支持的导出格式:")
     print("1. VTM格式: builder.export_model('model.vtm')")
-    print("2. GLTF格式: builder.export_to_gltf_trimesh('model.gltf', rotate_axes=True)")  
+    print("2. GLTF格式: builder.export_to_gltf_trimesh('model.gltf', rotate_axes=True)")
+    print("   共享界面GLTF: builder.export_to_gltf_shared('model.glb')  # 无需先执行 visualization_block")
     print("3. 3DTiles格式: builder.export_to_3dtiles('output_dir', center_coords=[lon, lat, height], rotate_axes=True)")
     print()
     print("关于旋转修正:")
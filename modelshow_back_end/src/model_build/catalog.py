@@ -0,0 +1,300 @@
+"""
+模型目录索引（SQLite）：记录模型元数据，与模型目录增量同步，供 /api/models 筛选、排序与分页。
+"""
+import json
+import os
+import sqlite3
+import struct
+import threading
+import time
+from contextlib import closing
+
+MODEL_SUFFIXES = (".gltf", ".glb")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS models (
+    path TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    layers TEXT,
+    n_layers INTEGER,
+    vertices INTEGER,
+    triangles INTEGER,
+    bbox TEXT,
+    source_hash TEXT,
+    params TEXT,
+    assets TEXT,
+    indexed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_models_type_mtime ON models (type, mtime);
+CREATE INDEX IF NOT EXISTS idx_models_mtime ON models (mtime);
+CREATE INDEX IF NOT EXISTS idx_models_name ON models (name);
+CREATE INDEX IF NOT EXISTS idx_models_source ON models (source_hash);
+"""
+
+JSON_COLUMNS = ("layers", "bbox", "params", "assets")
+SORT_COLUMNS = {"name", "size", "mtime", "vertices", "triangles", "n_layers"}
+
+
+def _read_gltf_json(path: str) -> dict:
+    """只读取 glTF 的 JSON 部分（.glb 读取第一个 chunk）。"""
+    with open(path, "rb") as f:
+        if path.lower().endswith(".glb"):
+            magic, _, _ = struct.unpack("<4sII", f.read(12))
+            if magic != b"glTF":
+                raise ValueError("不是有效的 GLB 文件")
+            length, chunk_type = struct.unpack("<I4s", f.read(8))
+            if chunk_type != b"JSON":
+                raise ValueError("GLB 缺少 JSON chunk")
+            return json.loads(f.read(length))
+        return json.load(f)
+
+
+def gltf_summary(path: str) -> dict:
+    """
+    由 glTF 头部统计模型信息。
+    返回:
+        {layers: 网格名列表, vertices, triangles, bbox: [min, max]（glTF 坐标）, assets: 外部缓冲区}
+        共享界面导出中多个 accessor 引用同一 bufferView，顶点数按被引用的 bufferView 去重计算
+    """
+    gltf = _read_gltf_json(path)
+    accessors = gltf.get("accessors", [])
+    views = gltf.get("bufferViews", [])
+    layers, seen_views, seen_accessors = [], set(), set()
+    vertices = triangles = 0
+    lo, hi = None, None
+    for mesh in gltf.get("meshes", []):
+        layers.append(mesh.get("name"))
+        for prim in mesh.get("primitives", []):
+            acc_id = prim.get("attributes", {}).get("POSITION")
+            if acc_id is None:
+                continue
+            acc = accessors[acc_id]
+            view = acc.get("bufferView")
+            if view is not None and view < len(views):
+                if view not in seen_views:
+                    seen_views.add(view)
+                    v = views[view]
+                    vertices += v["byteLength"] // v.get("byteStride", 12)
+            elif acc_id not in seen_accessors:
+                # Draco 等压缩几何没有 bufferView，按 accessor 计数
+                vertices += acc.get("count", 0)
+            seen_accessors.add(acc_id)
+            if "min" in acc and "max" in acc:
+                lo = acc["min"] if lo is None else [min(a, b) for a, b in zip(lo, acc["min"])]
+                hi = acc["max"] if hi is None else [max(a, b) for a, b in zip(hi, acc["max"])]
+            if prim.get("mode", 4) == 4:
+                if "indices" in prim:
+                    triangles += accessors[prim["indices"]].get("count", 0) // 3
+                else:
+                    triangles += acc.get("count", 0) // 3
+    assets = [b["uri"] for b in gltf.get("buffers", []) if isinstance(b.get("uri"), str)
+              and not b["uri"].startswith("data:")]
+    return {
+        "layers": layers,
+        "vertices": int(vertices),
+        "triangles": int(triangles),
+        "bbox": None if lo is None else [lo, hi],
+        "assets": assets,
+    }
+
+
+def source_hash(layer_points) -> str:
+    """输入地层坐标的内容哈希（与行顺序无关的列值哈希之和）。"""
+    import pandas as pd  # 只在建模流程中用到，服务进程启动时不加载
+
+    if isinstance(layer_points, dict):
+        layer_points = pd.concat(
+            [pd.DataFrame(v, columns=["x", "y", "z"]).assign(layer=k) for k, v in layer_points.items()],
+            ignore_index=True,
+        )
+    digest = int(pd.util.hash_pandas_object(layer_points, index=False).sum()) & (2 ** 64 - 1)
+    return f"{digest:016x}"
+
+
+class ModelCatalog:
+    """
+    模型目录。
+    用法:
+        catalog = ModelCatalog("uploads/catalog.sqlite")
+        catalog.sync({"public/model_gltf": "gltf"})
+        rows, total = catalog.query(type="gltf", limit=50)
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = str(db_path)
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+        self._sync_lock = threading.Lock()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _upsert(self, conn, row: dict):
+        row = dict(row)
+        for key in JSON_COLUMNS:
+            if key in row and row[key] is not None:
+                row[key] = json.dumps(row[key], ensure_ascii=False)
+        row["indexed_at"] = time.time()
+        columns = ", ".join(row)
+        placeholders = ", ".join(f":{k}" for k in row)
+        updates = ", ".join(f"{k} = excluded.{k}" for k in row if k != "path")
+        conn.execute(
+            f"INSERT INTO models ({columns}) VALUES ({placeholders}) "
+            f"ON CONFLICT(path) DO UPDATE SET {updates}",
+            row,
+        )
+
+    def _file_row(self, path: str, model_type: str) -> dict:
+        st = os.stat(path)
+        row = {"path": os.path.abspath(path), "name": os.path.basename(path), "type": model_type,
+               "size": st.st_size, "mtime": st.st_mtime}
+        try:
+            summary = gltf_summary(path)
+        except (OSError, ValueError, KeyError, IndexError, struct.error) as e:
+            print(f"[catalog] 无法解析 {path}: {e}")
+            return row
+        row.update(
+            layers=summary["layers"], n_layers=len(summary["layers"]),
+            vertices=summary["vertices"], triangles=summary["triangles"], bbox=summary["bbox"],
+            assets=summary["assets"],
+        )
+        return row
+
+    def record_model(self, model_path: str, model_type: str = "gltf", layer_names=None,
+                     source_hash: str = None, params: dict = None, assets=None):
+        """
+        导出完成后登记模型（覆盖同一路径的旧记录）。
+        参数:
+            model_path: 模型文件路径
+            layer_names: 地层名（原始名称；glTF 节点名为 ASCII 化后的名称）
+            source_hash: 输入数据哈希，见 source_hash()
+            params: 建模参数（须可 JSON 序列化）
+            assets: 关联文件（缓冲区、缩略图、分层文件、层面缓存等）
+        """
+        row = self._file_row(model_path, model_type)
+        if layer_names is not None:
+            row.update(layers=list(layer_names), n_layers=len(layer_names))
+        if source_hash is not None:
+            row["source_hash"] = source_hash
+        if params is not None:
+            row["params"] = params
+        if assets is not None:
+            row["assets"] = sorted(set(row.get("assets") or []) | set(assets))
+        with closing(self._connect()) as conn, conn:
+            self._upsert(conn, row)
+        return row
+
+    def sync(self, directories: dict) -> dict:
+        """
+        与模型目录同步：新增或大小/修改时间变化的文件重新解析，消失的文件删除记录。
+        参数:
+            directories: {目录: 模型类型}
+        返回:
+            {added, updated, removed}
+        """
+        counts = {"added": 0, "updated": 0, "removed": 0}
+        with self._sync_lock, closing(self._connect()) as conn, conn:
+            for directory, model_type in directories.items():
+                directory = os.path.abspath(str(directory))
+                known = {
+                    r["path"]: (r["size"], r["mtime"])
+                    for r in conn.execute(
+                        "SELECT path, size, mtime FROM models WHERE type = ? AND path LIKE ?",
+                        (model_type, os.path.join(directory, "%")),
+                    )
+                }
+                present = set()
+                if os.path.isdir(directory):
+                    for entry in os.scandir(directory):
+                        if not entry.is_file() or not entry.name.lower().endswith(MODEL_SUFFIXES):
+                            continue
+                        present.add(entry.path)
+                        st = entry.stat()
+                        old = known.get(entry.path)
+                        if old == (st.st_size, st.st_mtime):
+                            continue
+                        # 未出现在 row 中的列（导出时登记的源数据哈希、参数）保持不变
+                        self._upsert(conn, self._file_row(entry.path, model_type))
+                        counts["updated" if old else "added"] += 1
+                gone = [p for p in known if p not in present and os.path.dirname(p) == directory]
+                conn.executemany("DELETE FROM models WHERE path = ?", [(p,) for p in gone])
+                counts["removed"] += len(gone)
+        if any(counts.values()):
+            print(f"[catalog] 同步完成: {counts}")
+        return counts
+
+    def query(self, type: str = None, name: str = None, layer: str = None, source_hash: str = None,
+              sort: str = "mtime", descending: bool = True, limit: int = 100, offset: int = 0):
+        """
+        筛选与分页查询。
+        参数:
+            type: 模型类型（gltf / 3dtiles / test）
+            name: 文件名包含的子串
+            layer: 包含该地层名
+            source_hash: 源数据哈希
+            sort: 排序字段，见 SORT_COLUMNS
+        返回:
+            (记录列表, 满足条件的总数)
+        """
+        where, args = [], []
+        if type:
+            where.append("type = ?")
+            args.append(type)
+        if name:
+            where.append("name LIKE ? ESCAPE '\\'")
+            args.append("%" + name.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%")
+        if layer:
+            where.append("EXISTS (SELECT 1 FROM json_each(models.layers) WHERE json_each.value = ?)")
+            args.append(layer)
+        if source_hash:
+            where.append("source_hash = ?")
+            args.append(source_hash)
+        clause = f"WHERE {' AND '.join(where)}" if where else ""
+        if sort not in SORT_COLUMNS:
+            raise ValueError(f"不支持的排序字段: {sort}")
+        order = f"ORDER BY {sort} {'DESC' if descending else 'ASC'}, path"
+        with closing(self._connect()) as conn:
+            total = conn.execute(f"SELECT COUNT(*) FROM models {clause}", args).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT * FROM models {clause} {order} LIMIT ? OFFSET ?", args + [int(limit), int(offset)]
+            ).fetchall()
+        records = []
+        for r in rows:
+            record = dict(r)
+            for key in JSON_COLUMNS:
+                if record.get(key) is not None:
+                    record[key] = json.loads(record[key])
+            records.append(record)
+        return records, total
+
+    def remove(self, model_path: str):
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM models WHERE path = ?", (os.path.abspath(model_path),))
+
+
+class CatalogWatcher(threading.Thread):
+    """后台线程，每隔 interval 秒对模型目录执行一次 sync（轮询，不依赖文件系统事件库）。"""
+
+    def __init__(self, catalog: ModelCatalog, directories: dict, interval: float = 10.0):
+        super().__init__(daemon=True, name="catalog-watcher")
+        self.catalog = catalog
+        self.directories = directories
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.catalog.sync(self.directories)
+            except sqlite3.Error as e:
+                print(f"[catalog] 同步失败: {e}")
+
+    def stop(self):
+        self._stop_event.set()
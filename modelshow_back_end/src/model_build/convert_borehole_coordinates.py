@@ -1,4 +1,3 @@
-
 import pandas as pd
 import numpy as np
 
@@ -27,7 +26,43 @@ def convert_to_local_coordinates(input_file, output_file=None):
     except Exception as e:
         print(f"读取文件失败: {e}")
         return None, None
+
+    df_local, origin_info = to_local_coordinates(df)
+    if df_local is None:
+        return None, None
+
+    # 设置默认输出文件名
+    if output_file is None:
+        if input_file.endswith('.xlsx'):
+            output_file = input_file.replace('.xlsx', '_局部坐标系.xlsx')
+        elif input_file.endswith('.xls'):
+            output_file = input_file.replace('.xls', '_局部坐标系.xls')
+        else:
+            output_file = input_file + '_局部坐标系.xlsx'
+    
+    # 保存结果
+    try:
+        df_local.to_excel(output_file, index=False)
+        print(f"\n转换完成！")
+        print(f"输出文件: {output_file}")
+    except Exception as e:
+        print(f"保存文件失败: {e}")
+        return df_local, None
+    
+    return df_local, origin_info
+
+def to_local_coordinates(df):
+    """
+    将钻孔位置 DataFrame 转换为自建坐标系（纯内存计算，不读写文件）
+    
+    参数:
+        df: 钻孔位置数据，需包含 x, y 列（z 列可选）
     
+    返回
+        转换后的DataFrame和原点信息；数据无效时返回 (None, None)
+    """
+    df = df.copy()
+
     # 检查并标准化列名
     if 'x' not in df.columns or 'y' not in df.columns:
         print("错误: 文件中找不到x, y列")
@@ -86,24 +121,6 @@ def convert_to_local_coordinates(input_file, output_file=None):
     print(f"  Y坐标范围: {df_local['y'].min():.2f} 至 {df_local['y'].max():.2f} (跨度: {y_range:.2f})")
     print(f"  Z坐标范围: {df_local['z'].min():.2f} 至 {df_local['z'].max():.2f} (跨度: {z_range:.2f})")
     
-    # 设置默认输出文件名
-    if output_file is None:
-        if input_file.endswith('.xlsx'):
-            output_file = input_file.replace('.xlsx', '_局部坐标系.xlsx')
-        elif input_file.endswith('.xls'):
-            output_file = input_file.replace('.xls', '_局部坐标系.xls')
-        else:
-            output_file = input_file + '_局部坐标系.xlsx'
-    
-    # 保存结果
-    try:
-        df_local.to_excel(output_file, index=False)
-        print(f"\n转换完成！")
-        print(f"输出文件: {output_file}")
-    except Exception as e:
-        print(f"保存文件失败: {e}")
-        return df_local, None
-    
     # 返回原点信息
     origin_info = {
         'origin_x': origin_x,
@@ -0,0 +1,106 @@
+"""
+层面网格简化（二次误差 quadric decimation），在构建三棱柱与导出之前执行。
+
+若分别简化各地层网格，相邻地层共享的层面会被简化成不同形状而产生裂缝或重叠。
+这里改为对层面堆栈整体简化：
+1) 以平面三角网为几何、各层面 z 值为多分量属性，做一次带属性误差的二次误差简化，
+   使误差度量同时考虑所有层面；
+2) 保留的顶点吸附回最近的原始网格节点，并保留原网格外边界上的全部顶点；
+3) 各层面在该顶点集上取原始插值值，由 Block 重新三角化构建三棱柱。
+这样所有地层共用同一套平面三角网，共享层面与地层外边界完全保持一致。
+误差以原始网格节点处的线性插值偏差衡量（模型坐标单位，即已乘 z_scale）。
+"""
+import numpy as np
+import pyvista as pv
+from scipy.spatial import Delaunay, cKDTree
+
+from .boundary import triangles_inside
+
+
+def _triangulate(xy: np.ndarray, boundary=None) -> np.ndarray:
+    simplices = Delaunay(xy).simplices
+    if boundary is not None:
+        simplices = simplices[triangles_inside(xy, simplices, boundary)]
+    return simplices
+
+
+def _boundary_vertices(simplices: np.ndarray) -> np.ndarray:
+    """三角网外边界上的顶点（只被一个三角形使用的边的端点）。"""
+    edges = np.sort(np.concatenate([simplices[:, [0, 1]], simplices[:, [1, 2]], simplices[:, [2, 0]]]), axis=1)
+    uniq, counts = np.unique(edges, axis=0, return_counts=True)
+    return np.unique(uniq[counts == 1])
+
+
+def tin_error(xy: np.ndarray, z_stack: np.ndarray, keep: np.ndarray) -> float:
+    """以保留顶点重新三角化后，在全部原始节点处的最大线性插值偏差（所有层面取最大）。"""
+    tri = Delaunay(xy[keep])
+    simplex = tri.find_simplex(xy)
+    inside = simplex >= 0
+    pts, simplex = xy[inside], simplex[inside]
+    transform = tri.transform[simplex]
+    bary = np.einsum("ijk,ik->ij", transform[:, :2], pts - transform[:, 2])
+    weights = np.c_[bary, 1 - bary.sum(axis=1)]
+    verts = keep[tri.simplices[simplex]]
+    z_interp = (z_stack[:, verts] * weights[None]).sum(axis=-1)
+    return float(np.abs(z_interp - z_stack[:, inside]).max())
+
+
+def _select_vertices(plane, reduction, tree, outline):
+    reduced = plane.decimate(reduction, scalars=True, scalars_weight=1.0, boundary_constraints=True)
+    _, ids = tree.query(np.asarray(reduced.points)[:, :2])
+    return np.union1d(outline, ids)
+
+
+def decimate_horizons(
+    grid_points: np.ndarray,
+    z_list: list,
+    target_ratio: float = None,
+    max_error: float = None,
+    boundary: np.ndarray = None,
+):
+    """
+    简化层面堆栈，返回可直接交给 Block 的 (grid_points, z_list)。
+    参数:
+        grid_points: 网格点 (N, 2)
+        z_list: 各层面 z 值列表
+        target_ratio: 简化后保留的三角形比例 (0, 1]
+        max_error: 允许的最大偏差；给出时自动寻找满足该误差的最大简化程度
+        boundary: 边界多边形（与 Block.boundary 一致），外边界顶点全部保留
+    返回:
+        (grid_points, z_list, info)，info 含顶点数与实测最大误差
+    """
+    if target_ratio is None and max_error is None:
+        raise ValueError("需要指定 target_ratio 或 max_error")
+    xy = np.asarray(grid_points, dtype=float)
+    z_stack = np.vstack([np.asarray(z, dtype=float) for z in z_list])
+    simplices = _triangulate(xy, boundary)
+    outline = _boundary_vertices(simplices)
+    tree = cKDTree(xy)
+    # 平面网格（z=0），各层面高程作为多分量标量参与误差计算
+    plane = pv.PolyData(np.c_[xy, np.zeros(len(xy))], np.c_[np.full(len(simplices), 3), simplices].ravel())
+    plane.point_data["z"] = z_stack.T
+    plane.set_active_scalars("z")
+
+    if target_ratio is not None:
+        keep = _select_vertices(plane, 1.0 - target_ratio, tree, outline)
+        error = tin_error(xy, z_stack, keep)
+    else:
+        # 二分搜索满足误差上限的最大简化程度
+        keep, error = np.arange(len(xy)), 0.0
+        lo, hi = 0.0, 0.99
+        for _ in range(7):
+            mid = (lo + hi) / 2
+            candidate = _select_vertices(plane, mid, tree, outline)
+            candidate_error = tin_error(xy, z_stack, candidate)
+            if candidate_error <= max_error:
+                keep, error, lo = candidate, candidate_error, mid
+            else:
+                hi = mid
+
+    info = {
+        "vertices_before": len(xy),
+        "vertices_after": len(keep),
+        "max_error": error,
+    }
+    print(f"层面简化：顶点 {len(xy)} → {len(keep)}，最大偏差 {error:.4f}")
+    return xy[keep], [z_stack[i, keep] for i in range(len(z_stack))], info
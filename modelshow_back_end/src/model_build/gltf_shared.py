@@ -0,0 +1,241 @@
+"""
+共享层面拓扑的 GLTF 导出。
+
+逐层构建三棱柱网格时，第 i 层的顶面与第 i+1 层的底面是同一个插值层面，
+却在两个网格、两个缓冲区中各存一份；相邻三棱柱之间的内部侧面也成对重复。
+这里直接由层面堆栈写出 glTF：
+- 所有层面的顶点按层面顺序连续存放在同一个 bufferView 中，每个层面只存一次；
+- 第 i 个地层的 POSITION accessor 以偏移 i*N 指向该 bufferView，长度 2N，
+  恰好覆盖其下、上两个层面（相邻地层的 accessor 互相重叠，即共享界面顶点）；
+- 各地层拓扑相同（顶面、底面与外边界侧面），局部索引完全一致，
+  因此所有地层共用同一个索引 accessor。
+每个地层仍是独立的 node/mesh（名称为地层名），前端可按层选择、隐藏和着色。
+可选的变形目标（如开采沉陷后的层面）以 glTF morph target 写入同一文件：
+只存各层面顶点的位移，同样按层面存一次、由各地层的 accessor 重叠引用，拓扑与索引不变，
+前端通过 morphTargetInfluences 在变形前后之间插值。
+地层外壳封闭且朝外，相邻地层在界面处顶点完全一致，不存在裂缝。
+"""
+import json
+import os
+import struct
+
+import numpy as np
+from scipy.spatial import Delaunay
+
+from .boundary import triangles_inside
+from . import metrics
+
+ARRAY_BUFFER = 34962
+ELEMENT_ARRAY_BUFFER = 34963
+FLOAT = 5126
+UNSIGNED_SHORT = 5123
+UNSIGNED_INT = 5125
+
+
+def surface_triangles(xy: np.ndarray, boundary: np.ndarray = None) -> np.ndarray:
+    """层面平面三角网（与 Block.build_prism_blocks 一致），统一为逆时针顺序。"""
+    with metrics.timer("delaunay"):
+        simplices = Delaunay(xy).simplices
+    if boundary is not None:
+        simplices = simplices[triangles_inside(xy, simplices, boundary)]
+    p = xy[simplices]
+    cross = (p[:, 1, 0] - p[:, 0, 0]) * (p[:, 2, 1] - p[:, 0, 1]) - (p[:, 1, 1] - p[:, 0, 1]) * (p[:, 2, 0] - p[:, 0, 0])
+    simplices = simplices.copy()
+    simplices[cross < 0] = simplices[cross < 0][:, ::-1]
+    return simplices
+
+
+def outline_edges(simplices: np.ndarray) -> np.ndarray:
+    """三角网外边界的有向边 (a, b)，沿逆时针方向，外侧在边的右手侧。"""
+    directed = np.concatenate([simplices[:, [0, 1]], simplices[:, [1, 2]], simplices[:, [2, 0]]])
+    _, inverse, counts = np.unique(np.sort(directed, axis=1), axis=0, return_inverse=True, return_counts=True)
+    return directed[counts[inverse.ravel()] == 1]
+
+
+def stratum_indices(simplices: np.ndarray, edges: np.ndarray, n: int) -> np.ndarray:
+    """
+    单个地层外壳的局部三角形索引：0..n-1 为底部层面，n..2n-1 为顶部层面。
+    顶面法向朝上、底面朝下、侧面朝外。
+    """
+    a, b = edges[:, 0], edges[:, 1]
+    walls = np.concatenate([np.c_[a, b, b + n], np.c_[a, b + n, a + n]])
+    return np.concatenate([simplices + n, simplices[:, ::-1], walls])
+
+
+def _pad(data: bytes, fill: bytes = b"\x00") -> bytes:
+    return data + fill * (-len(data) % 4)
+
+
+def export_shared_gltf(
+    xy: np.ndarray,
+    z_list: list,
+    labels: list,
+    output_path: str,
+    colors: list,
+    boundary: np.ndarray = None,
+    rotate_axes: bool = True,
+    strata: list = None,
+    targets: dict = None,
+) -> dict:
+    """
+    将层面堆栈导出为共享界面顶点的 GLTF/GLB（按扩展名决定）。
+    参数:
+        xy: 平面网格点 (N, 2)
+        z_list: 各层面 z 值，自下而上
+        labels: 各地层节点名（长度为层面数 - 1）
+        output_path: 输出路径，.glb 为单文件；.gltf 时缓冲区写入同名 .bin
+        colors: 地层颜色 RGBA(0-255) 列表
+        boundary: 边界多边形，边界外的三角形不导出
+        rotate_axes: 坐标轴 (X, Y, Z) -> (X, Z, Y)，与 Block.mesh_to_trimesh 一致
+        strata: 只导出这些地层序号（连续），默认全部
+        targets: 变形目标 {名称: 变形后的各层面 z 值}，形状与 z_list 相同；
+                 写为 morph target，mesh.extras.targetNames 为名称列表
+    返回:
+        统计信息 {vertices, triangles, bytes, targets}
+    """
+    targets = targets or {}
+    if strata is None:
+        strata = list(range(len(z_list) - 1))
+    if not strata:
+        raise ValueError("没有可导出的地层")
+    first = strata[0]
+    horizons = range(first, strata[-1] + 2)
+
+    xy = np.asarray(xy, dtype=float)
+    n = len(xy)
+    simplices = surface_triangles(xy, boundary)
+    if len(simplices) == 0:
+        raise ValueError("边界内没有有效的三角形")
+    indices = stratum_indices(simplices, outline_edges(simplices), n)
+
+    # (H, N, 3) 层面顶点
+    positions = np.stack([np.column_stack((xy, np.asarray(z_list[h], dtype=float))) for h in horizons])
+    # (T, H, N, 3) 变形目标的顶点位移，只有 z 分量非零
+    target_names = list(targets)
+    displacements = np.zeros((len(target_names), len(horizons), n, 3))
+    for t, name in enumerate(target_names):
+        for k, h in enumerate(horizons):
+            displacements[t, k, :, 2] = np.asarray(targets[name][h], dtype=float) - positions[k, :, 2]
+    if rotate_axes:
+        # (X, Z, Y) 为镜像变换，需同时翻转三角形绕序以保持外法向
+        positions = positions[:, :, [0, 2, 1]]
+        displacements = displacements[..., [0, 2, 1]]
+        indices = indices[:, ::-1]
+    positions = np.ascontiguousarray(positions, dtype=np.float32)
+    displacements = np.ascontiguousarray(displacements, dtype=np.float32)
+
+    index_type, index_dtype = (UNSIGNED_SHORT, np.uint16) if 2 * n <= 65535 else (UNSIGNED_INT, np.uint32)
+    position_bytes = positions.tobytes()
+    index_bytes = np.ascontiguousarray(indices, dtype=index_dtype).tobytes()
+    target_bytes = displacements.tobytes()
+    binary = _pad(position_bytes) + _pad(index_bytes) + target_bytes
+
+    stride = 3 * 4
+    accessors, materials, meshes, nodes = [], [], [], []
+    index_accessor = len(strata)
+
+    def vec3_accessor(view, offset, values):
+        return {
+            "bufferView": view,
+            "byteOffset": offset,
+            "componentType": FLOAT,
+            "count": len(values),
+            "type": "VEC3",
+            "min": values.min(axis=0).tolist(),
+            "max": values.max(axis=0).tolist(),
+        }
+
+    for idx in strata:
+        pair = positions[idx - first: idx - first + 2].reshape(-1, 3)
+        accessors.append(vec3_accessor(0, (idx - first) * n * stride, pair))
+    accessors.append({
+        "bufferView": 1,
+        "componentType": index_type,
+        "count": int(indices.size),
+        "type": "SCALAR",
+    })
+    # 变形目标 accessor：第 t 个目标、第 idx 个地层，同样以重叠区间共享界面位移
+    target_accessors = []
+    for t in range(len(target_names)):
+        row = []
+        for idx in strata:
+            pair = displacements[t, idx - first: idx - first + 2].reshape(-1, 3)
+            row.append(len(accessors))
+            accessors.append(vec3_accessor(2, (t * len(horizons) + idx - first) * n * stride, pair))
+        target_accessors.append(row)
+
+    for k, idx in enumerate(strata):
+        color = colors[idx % len(colors)]
+        materials.append({
+            "pbrMetallicRoughness": {
+                "baseColorFactor": [c / 255.0 for c in color],
+                "metallicFactor": 0.0,
+                "roughnessFactor": 1.0,
+            },
+        })
+        primitive = {"attributes": {"POSITION": k}, "indices": index_accessor, "material": k, "mode": 4}
+        mesh = {"name": labels[idx], "primitives": [primitive]}
+        if target_names:
+            primitive["targets"] = [{"POSITION": row[k]} for row in target_accessors]
+            mesh["weights"] = [0.0] * len(target_names)
+            mesh["extras"] = {"targetNames": target_names}
+        meshes.append(mesh)
+        nodes.append({"name": labels[idx], "mesh": k})
+
+    is_glb = output_path.lower().endswith(".glb")
+    buffer = {"byteLength": len(binary)}
+    bin_path = None
+    if not is_glb:
+        bin_path = os.path.splitext(output_path)[0] + ".bin"
+        buffer["uri"] = os.path.basename(bin_path)
+
+    gltf = {
+        "asset": {"version": "2.0", "generator": "modelshow"},
+        "scene": 0,
+        "scenes": [{"nodes": list(range(len(nodes)))}],
+        "nodes": nodes,
+        "meshes": meshes,
+        "materials": materials,
+        "accessors": accessors,
+        "bufferViews": [
+            # 多个 accessor 共用同一 bufferView 时必须给出 byteStride
+            {"buffer": 0, "byteOffset": 0, "byteLength": len(position_bytes), "byteStride": stride,
+             "target": ARRAY_BUFFER},
+            {"buffer": 0, "byteOffset": len(_pad(position_bytes)), "byteLength": len(index_bytes),
+             "target": ELEMENT_ARRAY_BUFFER},
+        ],
+        "buffers": [buffer],
+    }
+    if target_names:
+        gltf["bufferViews"].append(
+            {"buffer": 0, "byteOffset": len(_pad(position_bytes)) + len(_pad(index_bytes)),
+             "byteLength": len(target_bytes), "byteStride": stride, "target": ARRAY_BUFFER}
+        )
+
+    out_dir = os.path.dirname(output_path)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    json_bytes = json.dumps(gltf, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    if is_glb:
+        json_chunk = _pad(json_bytes, b" ")
+        total = 12 + 8 + len(json_chunk) + 8 + len(binary)
+        with open(output_path, "wb") as f:
+            f.write(struct.pack("<4sII", b"glTF", 2, total))
+            f.write(struct.pack("<I4s", len(json_chunk), b"JSON"))
+            f.write(json_chunk)
+            f.write(struct.pack("<I4s", len(binary), b"BIN\x00"))
+            f.write(binary)
+        size = total
+    else:
+        with open(bin_path, "wb") as f:
+            f.write(binary)
+        with open(output_path, "wb") as f:
+            f.write(json_bytes)
+        size = len(binary) + len(json_bytes)
+
+    return {
+        "vertices": int(positions.shape[0] * n),
+        "triangles": int(len(indices) * len(strata)),
+        "bytes": size,
+        "targets": target_names,
+    }
@@ -0,0 +1,213 @@
+"""
+层面堆栈的内存映射磁盘缓存：<store_dir>/<模型名>/ 下的
+horizons-<build_id>.npy（层面高程）、grid-<build_id>.npy（网格坐标）与 meta.json（指向当前一版数据）。
+"""
+import json
+import os
+import time
+import uuid
+from functools import lru_cache
+
+import numpy as np
+from scipy.spatial import Delaunay
+
+from .boundary import triangles_inside
+
+META_NAME = "meta.json"
+
+
+def regular_shape(xy: np.ndarray):
+    """若网格点为 meshgrid 行优先排列的规则网格，返回 (ny, nx)，否则返回 None。"""
+    ux = np.unique(xy[:, 0])
+    uy = np.unique(xy[:, 1])
+    nx, ny = len(ux), len(uy)
+    if nx * ny != len(xy):
+        return None
+    if np.array_equal(xy[:, 0], np.tile(ux, ny)) and np.array_equal(xy[:, 1], np.repeat(uy, nx)):
+        return ny, nx
+    return None
+
+
+def _write_npy(path: str, array: np.ndarray, dtype):
+    """按行写入 .npy（open_memmap），避免为类型转换再复制整个数组。"""
+    tmp = f"{path}.tmp"
+    out = np.lib.format.open_memmap(tmp, mode="w+", dtype=dtype, shape=array.shape)
+    for i in range(len(array)):
+        out[i] = array[i]
+    out.flush()
+    del out
+    os.replace(tmp, path)
+
+
+def save_horizon_stack(path: str, grid_points: np.ndarray, z_list, order: list,
+                       layer_names: list = None, z_scale: float = 1.0, boundary=None,
+                       dtype=np.float32) -> str:
+    """
+    保存层面堆栈到目录 path。
+    参数:
+        path: 目标目录（如 uploads/horizons/<模型名>）
+        grid_points: 网格点 (N, 2)
+        z_list: 各层面 z 值列表或 (n_layers, N) 数组，自下而上
+        order: 与 z_list 对应的层面名称
+        layer_names: 地层名称（不含地表层）
+        z_scale: 插值时使用的 Z 缩放因子
+        boundary: 边界多边形 (M, 2) 或 None
+        dtype: 高程存储类型，默认 float32
+    返回:
+        目录路径
+    """
+    os.makedirs(path, exist_ok=True)
+    grid_points = np.asarray(grid_points, dtype=np.float64)
+    if isinstance(z_list, np.ndarray):
+        z_stack = z_list
+    else:
+        z_stack = np.vstack([np.asarray(z) for z in z_list])
+    if z_stack.shape[1] != len(grid_points):
+        raise ValueError("层面点数与网格点数不一致")
+
+    # 每次写入唯一，数据文件名与派生缓存（三角网、统计结果）都以此区分版本
+    build_id = uuid.uuid4().hex
+    files = {"horizons": f"horizons-{build_id}.npy", "grid": f"grid-{build_id}.npy"}
+    _write_npy(os.path.join(path, files["horizons"]), z_stack, dtype)
+    _write_npy(os.path.join(path, files["grid"]), grid_points, np.float64)
+
+    previous = None
+    try:
+        with open(os.path.join(path, META_NAME), "r", encoding="utf-8") as f:
+            previous = json.load(f).get("files")
+    except (OSError, ValueError):
+        pass
+
+    shape = regular_shape(grid_points)
+    meta = {
+        "order": list(order),
+        "layer_names": list(layer_names) if layer_names is not None else [n for n in order if n != "地表层"],
+        "n_layers": int(z_stack.shape[0]),
+        "n_points": int(z_stack.shape[1]),
+        "dtype": np.dtype(dtype).name,
+        "z_scale": float(z_scale),
+        "grid_shape": list(shape) if shape else None,
+        "bounds": [float(v) for v in (*grid_points.min(axis=0), *grid_points.max(axis=0))],
+        "boundary": None if boundary is None else np.asarray(boundary, dtype=float).tolist(),
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "build_id": build_id,
+        "files": files,
+    }
+    # 替换 meta.json 即切换到新版本：读者读到的元数据总与其指向的数据文件一致
+    tmp = os.path.join(path, f"{META_NAME}.{build_id}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, os.path.join(path, META_NAME))
+    _remove_stale_files(path, keep=set(files.values()) | set((previous or {}).values()))
+    return path
+
+
+def _remove_stale_files(path: str, keep: set):
+    """删除早于上一版本的数据文件；上一版本保留，刚读到旧 meta.json 的读者仍可打开。"""
+    for name in os.listdir(path):
+        if name.endswith(".npy") and name not in keep:
+            try:
+                os.remove(os.path.join(path, name))
+            except OSError:
+                pass
+
+
+@lru_cache(maxsize=8)
+def _triangulation(grid_path: str, build_id: str, boundary):
+    """平面三角网与边界内三角形掩码，按网格文件与 build_id 缓存（boundary 为元组）。"""
+    xy = np.asarray(np.load(grid_path, mmap_mode="r"))
+    tri = Delaunay(xy)
+    valid = np.ones(len(tri.simplices), dtype=bool)
+    if boundary is not None:
+        valid = triangles_inside(xy, tri.simplices, np.asarray(boundary))
+    return tri, valid
+
+
+class HorizonStack:
+    """
+    以只读内存映射打开的层面堆栈。
+    用法:
+        stack = HorizonStack.open("uploads/horizons/output_model")
+        z = stack.layer("地表层")          # 只读取该层
+        grid = stack.as_grid()             # 规则网格时为 (n_layers, ny, nx) 视图
+    """
+
+    def __init__(self, path: str, z: np.ndarray, xy: np.ndarray, meta: dict):
+        self.path = path
+        self.z = z
+        self.xy = xy
+        self.meta = meta
+
+    @classmethod
+    def open(cls, path: str):
+        meta_path = os.path.join(path, META_NAME)
+        if not os.path.exists(meta_path):
+            raise FileNotFoundError(f"层面缓存不存在: {path}")
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if "files" not in meta:
+            raise ValueError(f"层面缓存元数据缺少 files: {meta_path}")
+        files = meta["files"]
+        z = np.load(os.path.join(path, files["horizons"]), mmap_mode="r")
+        xy = np.load(os.path.join(path, files["grid"]), mmap_mode="r")
+        return cls(path, z, xy, meta)
+
+    @property
+    def order(self) -> list:
+        return self.meta["order"]
+
+    @property
+    def layer_names(self) -> list:
+        return self.meta["layer_names"]
+
+    @property
+    def z_scale(self) -> float:
+        return self.meta["z_scale"]
+
+    @property
+    def build_id(self) -> str:
+        return self.meta.get("build_id") or self.meta.get("created", "")
+
+    @property
+    def grid_shape(self):
+        shape = self.meta.get("grid_shape")
+        return tuple(shape) if shape else None
+
+    @property
+    def boundary(self):
+        boundary = self.meta.get("boundary")
+        return None if boundary is None else np.asarray(boundary)
+
+    def index(self, name_or_idx) -> int:
+        """层面名称或序号 → 序号。"""
+        if isinstance(name_or_idx, str):
+            return self.order.index(name_or_idx)
+        return int(name_or_idx)
+
+    def layer(self, name_or_idx) -> np.ndarray:
+        """单个层面的 z 值 (N,)（内存映射切片）。"""
+        return self.z[self.index(name_or_idx)]
+
+    def as_grid(self) -> np.ndarray:
+        """规则网格时返回 (n_layers, ny, nx) 零拷贝视图。"""
+        if self.grid_shape is None:
+            raise ValueError("该模型网格不是规则网格（自适应或已按边界裁剪）")
+        return self.z.reshape((self.z.shape[0], *self.grid_shape))
+
+    def axes(self):
+        """规则网格的坐标轴 (xi, yi)。"""
+        ny, nx = self.grid_shape
+        return np.asarray(self.xy[:nx, 0]), np.asarray(self.xy[::nx, 1])
+
+    def triangulation(self):
+        """与 Block 一致的平面三角网 (scipy Delaunay, 边界内掩码)，进程内缓存。"""
+        boundary = self.meta.get("boundary")
+        return _triangulation(os.path.join(self.path, self.meta["files"]["grid"]), self.build_id,
+                              None if boundary is None else tuple(map(tuple, boundary)))
+
+    def to_block(self, dtype=np.float64):
+        """构建 Block（读入全部层面）。"""
+        from .build_block_pyvista import Block
+
+        return Block(xy=np.asarray(self.xy), z_list=np.asarray(self.z, dtype=dtype),
+                     layer_names=self.layer_names, boundary=self.boundary, dtype=dtype)
@@ -0,0 +1,264 @@
+"""
+增量建模：仅对输入点发生变化的地层重新克里金插值，仅重建/重导出受影响的地层块体。
+
+- 每个层面的指纹由其输入点（与点顺序无关）、统一网格、变差函数模型和 Z 缩放共同决定；
+  指纹相同的层面直接复用 cache_dir/surfaces 下缓存的插值结果。
+- 第 i 个地层由第 i、i+1 个层面围成，其指纹由两个层面指纹组合而成；
+  指纹未变且文件仍存在的地层不再重新导出其 .glb。
+- 每次构建在 cache_dir/build_report.json 中记录复用与重算的明细；
+  manifest 中各模型均未引用的层面缓存在构建结束时删除。
+
+局限：自适应网格（grid_mode="adaptive"）与边界裁剪的网格由全部地层的输入点决定，
+修改任一钻孔都可能改变网格，此时所有层面都需重新插值，报告中记为 grid_changed。
+"""
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from .build_block_pyvista import Block
+from . import tin_kriging_prism_model as tkpm
+from .boundary import resolve_boundary, mask_grid
+from .decimation import decimate_horizons
+from . import metrics
+from .thumbnails import thumbnail_is_fresh, write_thumbnail
+
+MANIFEST_NAME = "manifest.json"
+REPORT_NAME = "build_report.json"
+
+
+def fingerprint_points(df_layer: pd.DataFrame) -> str:
+    """计算单层输入点的指纹（按 x, y, z 排序后哈希，与行顺序无关）。"""
+    pts = df_layer[["x", "y", "z"]].to_numpy(dtype=np.float64)
+    pts = pts[np.lexsort((pts[:, 2], pts[:, 1], pts[:, 0]))]
+    return hashlib.sha1(np.ascontiguousarray(pts).tobytes()).hexdigest()
+
+
+def surface_key(point_fp: str, grid_points: np.ndarray, variogram: str, z_scale: float) -> str:
+    """层面插值结果的缓存键：输入点 + 网格 + 变差函数 + Z 缩放。"""
+    h = hashlib.sha1()
+    h.update(point_fp.encode())
+    h.update(np.ascontiguousarray(grid_points, dtype=np.float64).tobytes())
+    h.update(f"{variogram}|{z_scale}".encode())
+    return h.hexdigest()
+
+
+def _load_manifest(cache_dir: str) -> dict:
+    path = os.path.join(cache_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_json(data: dict, path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+def grid_fingerprint(grid_points: np.ndarray) -> str:
+    """网格点坐标的指纹。"""
+    return hashlib.sha1(np.ascontiguousarray(grid_points, dtype=np.float64).tobytes()).hexdigest()
+
+
+def prune_surfaces(cache_dir: str, manifest: dict, since: float = None) -> int:
+    """
+    删除 manifest 中各模型均未引用的层面缓存，返回删除的文件数。
+    since: 修改时间不早于该时刻的文件保留（可能属于并发进行中的构建）
+    """
+    surface_dir = os.path.join(cache_dir, "surfaces")
+    if not os.path.isdir(surface_dir):
+        return 0
+    referenced = {key for entry in manifest.values() for key in entry.get("surfaces", [])}
+    removed = 0
+    for name in os.listdir(surface_dir):
+        path = os.path.join(surface_dir, name)
+        if not name.endswith(".npy") or name[:-4] in referenced:
+            continue
+        try:
+            if since is not None and os.path.getmtime(path) >= since:
+                continue
+            os.remove(path)
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def interpolate_layers_cached(
+    layer_points: dict,
+    grid_points: np.ndarray,
+    cache_dir: str,
+    default_variogram: str = "spherical",
+    layer_variogram: dict = None,
+    z_scale: float = 10.0,
+    verbose_krige: bool = False,
+):
+    """
+    与 interpolate_all_layers 相同，但按层面指纹复用缓存的插值结果。
+    返回:
+        (order, z_list, keys, status)，status 为 {层名: "reused" | "kriged"}
+    """
+    if layer_variogram is None:
+        layer_variogram = {}
+    surface_dir = os.path.join(cache_dir, "surfaces")
+    os.makedirs(surface_dir, exist_ok=True)
+
+    # 层按平均 Z 升序排列 (自下而上建模)，与 interpolate_all_layers 保持一致
+    order = sorted(layer_points.keys(), key=lambda k: layer_points[k]["z"].mean())
+    z_list, keys, status = [], [], {}
+    for lname in order:
+        model = layer_variogram.get(lname, default_variogram)
+        key = surface_key(fingerprint_points(layer_points[lname]), grid_points, model, z_scale)
+        path = os.path.join(surface_dir, f"{key}.npy")
+        if os.path.exists(path):
+            z_vals = np.load(path)
+            status[lname] = "reused"
+        else:
+            with metrics.timer("krige_layer", layer=lname):
+                z_vals = tkpm.krige_layer(layer_points[lname], grid_points, model, verbose_krige=verbose_krige) * z_scale
+            np.save(path, z_vals)
+            status[lname] = "kriged"
+        z_list.append(z_vals)
+        keys.append(key)
+    return order, z_list, keys, status
+
+
+def run_incremental(
+    data_path,
+    cache_dir: str,
+    grid_nx: int = 80,
+    grid_ny: int = 80,
+    default_variogram: str = "spherical",
+    layer_variogram: dict = None,
+    verbose_krige: bool = False,
+    z_scale: float = 10.0,
+    save_file_name: str = "output_model.gltf",
+    output_dir: str = "./public/model_gltf",
+    grid_mode: str = "uniform",
+    max_vertices: int = None,
+    max_error: float = None,
+    boundary=None,
+    boundary_alpha: float = None,
+    decimate_ratio: float = None,
+    decimate_error: float = None,
+    thumbnail: bool = True,
+):
+    """
+    增量版 tin_kriging_prism_model.run，参数含义相同。
+    各地层单独导出到 output_dir/<模型名>_layers/*.glb，合并模型仅在有地层变化时重新组装。
+    返回:
+        与 run 相同的结果字典，另含 report（复用/重算明细）
+    """
+    t_start = time.perf_counter()
+    wall_start = time.time()
+    os.makedirs(cache_dir, exist_ok=True)
+    manifest = _load_manifest(cache_dir)
+
+    if isinstance(data_path, dict):
+        layer_points = data_path
+    elif isinstance(data_path, pd.DataFrame):
+        layer_points = tkpm.group_layer_points(data_path)
+    else:
+        layer_points = tkpm.load_layer_points(data_path)
+
+    grid_points = tkpm.build_model_grid(
+        layer_points, grid_nx, grid_ny, grid_mode, max_vertices, max_error,
+        default_variogram, layer_variogram
+    )
+    polygon = resolve_boundary(boundary, layer_points, boundary_alpha)
+    if polygon is not None:
+        grid_points = mask_grid(grid_points, polygon)
+    # 插值网格变化时所有层面缓存键随之改变，在报告中单独注明
+    interp_grid = grid_fingerprint(grid_points)
+    old_grid = manifest.get(save_file_name, {}).get("grid")
+    grid_changed = old_grid is not None and old_grid != interp_grid
+    order, z_list, keys, surface_status = interpolate_layers_cached(
+        layer_points, grid_points, cache_dir,
+        default_variogram, layer_variogram, z_scale, verbose_krige
+    )
+
+    if decimate_ratio is not None or decimate_error is not None:
+        grid_points, z_list, _ = decimate_horizons(
+            grid_points, z_list, decimate_ratio, decimate_error, polygon
+        )
+    # 简化后的平面顶点集由所有层面共同决定，需计入地层指纹
+    grid_tag = grid_fingerprint(grid_points)
+
+    # 排除最顶层地表层
+    layer_names = [name for name in order if name != "地表层"]
+    block = Block(xy=grid_points, z_list=z_list, layer_names=layer_names, boundary=polygon)
+
+    stem = os.path.splitext(save_file_name)[0]
+    layer_dir = os.path.join(output_dir, f"{stem}_layers")
+    os.makedirs(layer_dir, exist_ok=True)
+    old_strata = manifest.get(save_file_name, {}).get("strata", {})
+
+    strata, strata_status = {}, {}
+    for idx in range(len(z_list) - 1):
+        label = block.layer_label(idx)
+        stratum_key = hashlib.sha1(f"{keys[idx]}|{keys[idx + 1]}|{label}|{grid_tag}".encode()).hexdigest()
+        path = os.path.join(layer_dir, f"{idx}_{label}.glb")
+        name = layer_names[idx] if idx < len(layer_names) else label
+        if old_strata.get(str(idx)) == stratum_key and os.path.exists(path):
+            strata_status[name] = "reused"
+        else:
+            # 仅导出受影响的地层
+            block.export_to_gltf_shared(path, strata=[idx])
+            strata_status[name] = "rebuilt"
+        strata[str(idx)] = stratum_key
+
+    # 合并模型：由层面堆栈直接导出（共享界面顶点），仅在有地层变化时重新写出
+    output_path = f"{output_dir}/{save_file_name}"
+    changed = any(v == "rebuilt" for v in strata_status.values()) or len(strata) != len(old_strata)
+    if changed or not os.path.exists(output_path):
+        block.export_to_gltf_shared(output_path)
+        combined_status = "rebuilt"
+    else:
+        combined_status = "reused"
+    if thumbnail and not thumbnail_is_fresh(output_path):
+        write_thumbnail(block, output_path)
+
+    manifest[save_file_name] = {"strata": strata, "surfaces": keys, "grid": interp_grid}
+    _save_json(manifest, os.path.join(cache_dir, MANIFEST_NAME))
+    pruned = prune_surfaces(cache_dir, manifest, since=wall_start)
+
+    report = {
+        "model": save_file_name,
+        "grid_changed": grid_changed,
+        "surfaces": surface_status,
+        "pruned_surfaces": pruned,
+        "strata": strata_status,
+        "combined": combined_status,
+        "seconds": round(time.perf_counter() - t_start, 3),
+    }
+    _save_json(report, os.path.join(cache_dir, REPORT_NAME))
+    print_report(report)
+
+    return {
+        "order": order,
+        "z_list": z_list,
+        "grid_points": grid_points,
+        "layer_names": layer_names,
+        "output_path": output_path,
+        "boundary": polygon,
+        "z_scale": z_scale,
+        "report": report,
+    }
+
+
+def print_report(report: dict):
+    """打印增量构建报告。"""
+    print(f"增量构建报告: {report['model']} ({report['seconds']}s)")
+    if report.get("grid_changed"):
+        print("  插值网格已变化（自适应网格或边界随输入点改变），层面缓存无法复用")
+    for name, st in report["surfaces"].items():
+        print(f"  层面 {name}: {'复用缓存' if st == 'reused' else '重新插值'}")
+    for name, st in report["strata"].items():
+        print(f"  地层 {name}: {'复用' if st == 'reused' else '重建并导出'}")
+    print(f"  合并模型: {'复用' if report['combined'] == 'reused' else '重新组装'}")
+    if report.get("pruned_surfaces"):
+        print(f"  清理未引用的层面缓存: {report['pruned_surfaces']} 个")
@@ -290,17 +290,23 @@ def add_layer_numbering(df: pd.DataFrame) -> pd.DataFrame:
     df['地层名称'] = df.groupby('钻孔名称')['地层名称'].transform(update_layer_name)
     return df
 
-def merge_workbook(input_path: str, sheet_name: str, output_path: str) -> pd.DataFrame:
-    df = pd.read_excel(input_path, sheet_name=sheet_name)
+def merge_dataframe(df: pd.DataFrame, mode: str = MERGE_MODE) -> pd.DataFrame:
+    """
+    对已读入内存的横向四列一组地层统计表执行标准分段合并（不读写文件）。
+    mode: 'horizontal' 或 'vertical'，含义同 MERGE_MODE。
+    """
     groups = split_groups(list(df.columns))
-    if MERGE_MODE == 'horizontal':
+    if mode == 'horizontal':
         final_df = _merge_horizontal(df, groups)
     else:
         final_df = _merge_vertical(df, groups)
 
     # 为每个钻孔的砂岩层添加编号
-    final_df = add_layer_numbering(final_df)
+    return add_layer_numbering(final_df)
 
+def merge_workbook(input_path: str, sheet_name: str, output_path: str) -> pd.DataFrame:
+    df = pd.read_excel(input_path, sheet_name=sheet_name)
+    final_df = merge_dataframe(df)
     final_df.to_excel(output_path, index=False, sheet_name="合并结果")
     return final_df
 
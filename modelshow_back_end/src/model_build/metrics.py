@@ -0,0 +1,223 @@
+"""
+轻量运行指标：计时器、计数器与直方图，按 Prometheus 文本格式导出（/api/metrics）。
+
+建模热点（逐层克里金、Delaunay 三角剖分、网格组装、面三角化、各导出器）用
+    with metrics.timer("krige_layer", layer=name): ...
+    @metrics.timed("export_gltf_shared")
+记录到 modelshow_stage_seconds 直方图；请求处理由 deploy-server.py 记录到
+modelshow_http_request_seconds / modelshow_http_requests_total。
+
+环境变量 MODELSHOW_METRICS=0 关闭采集：timer() 返回共享的空上下文，timed() 只多一次布尔判断。
+
+profile(path) 为单次构建启用采样剖析：后台线程按固定间隔抓取目标线程的调用栈，
+写出 folded stacks 文本（每行 "外层;...;内层 次数"），可直接用 flamegraph.pl / speedscope 查看。
+"""
+import contextlib
+import functools
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+
+STAGE_SECONDS = "modelshow_stage_seconds"
+
+# 直方图桶上界（秒），覆盖毫秒级请求到分钟级建模
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+HELP = {
+    STAGE_SECONDS: "建模各阶段耗时（秒）",
+    "modelshow_http_request_seconds": "请求处理耗时（秒），按路由与方法",
+    "modelshow_http_requests_total": "请求数，按路由、方法与状态码",
+    "modelshow_http_response_bytes_total": "响应字节数，按路由",
+    "modelshow_builds_total": "模型构建次数，按结果",
+    "modelshow_build_worker_restarts_total": "建模工作进程替换次数，按原因",
+}
+
+_enabled = os.environ.get("MODELSHOW_METRICS", "1") != "0"
+_lock = threading.Lock()
+_counters = defaultdict(float)  # (name, labels) -> 值
+_histograms = {}                # (name, labels) -> [各桶计数..., +Inf 计数, 总和]
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def set_enabled(flag: bool):
+    """运行时开关指标采集（已记录的数据保留）。"""
+    global _enabled
+    _enabled = bool(flag)
+
+
+def _key(name: str, labels: dict):
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def inc(name: str, value: float = 1.0, **labels):
+    """计数器加 value。"""
+    if not _enabled:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] += value
+
+
+def observe(name: str, value: float, **labels):
+    """向直方图记录一次观测值。"""
+    if not _enabled:
+        return
+    key = _key(name, labels)
+    slot = next((i for i, b in enumerate(BUCKETS) if value <= b), len(BUCKETS))
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = [0] * (len(BUCKETS) + 1) + [0.0]
+        hist[slot] += 1
+        hist[-1] += value
+
+
+class _Timer:
+    __slots__ = ("name", "labels", "t0")
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.t0, **self.labels)
+        return False
+
+
+_NULL = contextlib.nullcontext()
+
+
+def timer(stage: str, **labels):
+    """计时上下文：耗时记入 modelshow_stage_seconds 直方图，stage 作为 stage 标签。"""
+    if not _enabled:
+        return _NULL
+    return _Timer(STAGE_SECONDS, dict(labels, stage=stage))
+
+
+def timed(stage: str, **labels):
+    """计时装饰器，见 timer()。"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Timer(STAGE_SECONDS, dict(labels, stage=stage)):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+def drain():
+    """取出并清空当前记录（工作进程把任务期间的指标交回主进程）。"""
+    with _lock:
+        snapshot = (dict(_counters), {k: list(v) for k, v in _histograms.items()})
+        _counters.clear()
+        _histograms.clear()
+    return snapshot
+
+
+def merge(snapshot):
+    """合并 drain() 取出的记录。"""
+    counters, histograms = snapshot
+    with _lock:
+        for key, value in counters.items():
+            _counters[key] += value
+        for key, values in histograms.items():
+            hist = _histograms.get(key)
+            if hist is None:
+                _histograms[key] = list(values)
+            else:
+                for i, v in enumerate(values):
+                    hist[i] += v
+
+
+def _format_labels(labels, extra=()):
+    items = list(labels) + list(extra)
+    if not items:
+        return ""
+    escape = lambda v: v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{escape(v)}"' for k, v in items) + "}"
+
+
+def render() -> str:
+    """Prometheus 文本格式 (version 0.0.4)。"""
+    with _lock:
+        counters = sorted(_counters.items())
+        histograms = sorted((k, list(v)) for k, v in _histograms.items())
+
+    lines = []
+    families = set()
+
+    def header(name, kind):
+        if name not in families:
+            families.add(name)
+            if name in HELP:
+                lines.append(f"# HELP {name} {HELP[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+
+    for (name, labels), value in counters:
+        header(name, "counter")
+        lines.append(f"{name}{_format_labels(labels)} {value:g}")
+    for (name, labels), hist in histograms:
+        header(name, "histogram")
+        cumulative = 0
+        for bound, count in zip(BUCKETS + ("+Inf",), hist[:-1]):
+            cumulative += count
+            lines.append(f"{name}_bucket{_format_labels(labels, [('le', str(bound))])} {cumulative}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {hist[-1]:.6f}")
+        lines.append(f"{name}_count{_format_labels(labels)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+@contextlib.contextmanager
+def profile(output_path: str, interval: float = 0.005):
+    """
+    对当前线程执行的代码做采样剖析，结束时把 folded stacks 写入 output_path。
+    参数:
+        output_path: 输出文件（建议 .folded 扩展名）
+        interval: 采样间隔（秒）
+    """
+    target = threading.get_ident()
+    samples = defaultdict(int)
+    stop = threading.Event()
+
+    def sample():
+        while not stop.wait(interval):
+            frame = sys._current_frames().get(target)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                samples[";".join(reversed(stack))] += 1
+
+    sampler = threading.Thread(target=sample, name="metrics-profiler", daemon=True)
+    sampler.start()
+    try:
+        yield samples
+    finally:
+        stop.set()
+        sampler.join()
+        out_dir = os.path.dirname(output_path)
+        if out_dir:
+            os.makedirs(out_dir, exist_ok=True)
+        with open(output_path, "w", encoding="utf-8") as f:
+            for stack, count in sorted(samples.items(), key=lambda kv: -kv[1]):
+                f.write(f"{stack} {count}\n")
+        print(f"[profile] {sum(samples.values())} 个采样已写入 {output_path}")
@@ -0,0 +1,238 @@
+"""
+钻孔数据 → 地质模型 的内存流水线。
+
+原流程需依次运行 convert_borehole_coordinates、merge_layer_standard、
+thickness_to_location 与 tin_kriging_prism_model，每一步都写出 .xlsx 再由下一步读回。
+本模块将各步骤串联为纯 DataFrame 传递，可选地把每步结果以 Parquet 列式格式落盘
+（checkpoint_dir），便于排查或复用中间结果。
+"""
+import contextlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from .convert_borehole_coordinates import to_local_coordinates
+from .merge_layer_standard import merge_dataframe
+from .thickness_to_location import thickness_to_coordinates
+from . import tin_kriging_prism_model as tkpm
+from . import table_io
+from .incremental import run_incremental
+from .horizon_store import HorizonStack, save_horizon_stack
+from .catalog import source_hash
+from .thumbnails import thumbnail_path
+from . import metrics
+
+TableLike = Union[pd.DataFrame, str, Path]
+
+
+def read_table(source: TableLike, sheet_name=0) -> pd.DataFrame:
+    """
+    读取表格输入：DataFrame 原样返回，路径交由 table_io.read_table 识别格式并缓存。
+    """
+    if isinstance(source, pd.DataFrame):
+        return source
+    return table_io.read_table(source, sheet_name=sheet_name)
+
+
+def _checkpoint(df: pd.DataFrame, checkpoint_dir: Optional[str], name: str):
+    """将阶段结果写为 Parquet；未设置 checkpoint_dir 时不落盘。"""
+    if not checkpoint_dir:
+        return None
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    path = os.path.join(checkpoint_dir, f"{name}.parquet")
+    df.to_parquet(path, index=False)
+    return path
+
+
+def stage_local_coordinates(borehole_data: TableLike, checkpoint_dir: Optional[str] = None):
+    """阶段1：钻孔位置转换为自建坐标系，返回 (DataFrame, 原点信息)。"""
+    df_local, origin_info = to_local_coordinates(read_table(borehole_data))
+    if df_local is None:
+        raise ValueError("钻孔位置数据无效，无法转换坐标")
+    _checkpoint(df_local, checkpoint_dir, "borehole_local")
+    return df_local, origin_info
+
+
+def stage_merge_layers(layer_statistics: TableLike, sheet_name="Sheet1",
+                       checkpoint_dir: Optional[str] = None) -> pd.DataFrame:
+    """阶段2：地层统计表按标准地层分段合并（纵向堆叠）。"""
+    merged = merge_dataframe(read_table(layer_statistics, sheet_name), mode="vertical")
+    _checkpoint(merged, checkpoint_dir, "layers_merged")
+    return merged
+
+
+def stage_thickness(layer_data: pd.DataFrame, borehole_data: pd.DataFrame,
+                    checkpoint_dir: Optional[str] = None) -> pd.DataFrame:
+    """阶段3：由孔口高程与厚度计算各地层底板坐标。"""
+    coords = thickness_to_coordinates(layer_data, borehole_data)
+    _checkpoint(coords, checkpoint_dir, "layer_coordinates")
+    return coords
+
+
+def stage_model(layer_points: TableLike, checkpoint_dir: Optional[str] = None,
+                cache_dir: Optional[str] = None, store_dir: Optional[str] = None,
+                **model_options) -> dict:
+    """
+    阶段4：克里金插值并构建/导出块体模型。
+    model_options 透传给 tin_kriging_prism_model.run（grid_nx、save_file_name、output_dir 等）；
+    设置 cache_dir 时改用增量构建，仅重算输入点变化的层面及相邻地层；
+    设置 store_dir 时把层面堆栈保存为 store_dir/<模型名> 内存映射缓存（见 horizon_store.py）。
+    """
+    if cache_dir:
+        result = run_incremental(read_table(layer_points), cache_dir, **model_options)
+    else:
+        result = tkpm.run(read_table(layer_points), **model_options)
+    if checkpoint_dir:
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        np.savez(
+            os.path.join(checkpoint_dir, "horizons.npz"),
+            grid_points=result["grid_points"],
+            z_list=np.asarray(result["z_list"]),
+            order=np.asarray(result["order"]),
+        )
+    if store_dir:
+        stem = os.path.splitext(os.path.basename(result["output_path"]))[0]
+        result["store_path"] = save_horizon_stack(
+            os.path.join(store_dir, stem), result["grid_points"], result["z_list"], result["order"],
+            result["layer_names"], result.get("z_scale", 1.0), result.get("boundary"),
+        )
+    return result
+
+
+def stage_subsidence(store_path: str, output_path: str, mining_layer, q_base: float, H_base: float,
+                     tan_beta_base: float, theta0_base: float, center_x: float, center_y: float,
+                     Lx: float, Ly: float, alpha: float = 0.0, layer_types: Optional[dict] = None,
+                     target_name: str = "subsided") -> dict:
+    """
+    阶段5（可选）：在层面堆栈上计算开采沉陷，导出带变形目标的模型。
+    沉陷只改变层面顶点高程，平面三角网与地层拓扑不变，因此不重建块体：
+    导出的 GLTF/GLB 顶点为开采前层面，沉陷后的层面以 morph target 位移写入同一文件，
+    前端调节 morphTargetInfluences 即可在开采前后之间过渡，无需再下载第二个完整模型。
+    参数:
+        store_path: 层面缓存目录（stage_model 结果中的 store_path）
+        output_path: 输出 .gltf / .glb 路径
+        mining_layer: 采矿层面名称 (str) / 序号 (int)，或采矿层平均高程 (float)
+        layer_types: {层面名称: 'rock' 或 'loose'}
+        其余参数同 subsidence_multilayer
+    返回:
+        {output_path, target, max_subsidence, layers: [{name, mean, max}], export, seconds}
+    """
+    from .subsidence import subsidence_horizons
+
+    t0 = time.perf_counter()
+    stack = HorizonStack.open(store_path)
+    subsidence = subsidence_horizons(
+        stack, mining_layer, q_base, H_base, tan_beta_base, theta0_base,
+        center_x, center_y, Lx, Ly, alpha, layer_types
+    )
+    block = stack.to_block()
+    subsided = block.z_stack - subsidence * stack.z_scale
+    export = block.export_to_gltf_shared(output_path, targets={target_name: subsided})
+    seconds = time.perf_counter() - t0
+    print(f"[pipeline] subsidence: {seconds:.3f}s")
+    return {
+        "output_path": output_path,
+        "target": target_name,
+        "max_subsidence": float(subsidence.max()),
+        "layers": [
+            {"name": name, "mean": float(s.mean()), "max": float(s.max())}
+            for name, s in zip(stack.order, subsidence)
+        ],
+        "export": export,
+        "seconds": seconds,
+    }
+
+
+def record_in_catalog(catalog, result: dict, layer_points: pd.DataFrame, model_options: dict):
+    """把导出的模型及其元数据登记到模型目录（catalog.ModelCatalog）。"""
+    output_path = result["output_path"]
+    stem = os.path.splitext(output_path)[0]
+    # 只登记模型目录内的文件名，层面缓存记为逻辑名 horizons/<名称>，不暴露服务器路径
+    assets = [os.path.basename(path) for path in (f"{stem}.bin", thumbnail_path(output_path), f"{stem}_layers")
+              if os.path.exists(path)]
+    store_path = result.get("store_path")
+    if store_path and os.path.exists(store_path):
+        assets.append(f"horizons/{os.path.basename(os.path.normpath(store_path))}")
+    params = json.loads(json.dumps({k: v for k, v in model_options.items() if k != "output_dir"}, default=str))
+    return catalog.record_model(
+        output_path, "gltf", layer_names=result["layer_names"],
+        source_hash=source_hash(layer_points), params=params, assets=assets,
+    )
+
+
+def run_pipeline(
+    borehole_data: Optional[TableLike] = None,
+    layer_statistics: Optional[TableLike] = None,
+    layer_points: Optional[TableLike] = None,
+    sheet_name="Sheet1",
+    checkpoint_dir: Optional[str] = None,
+    cache_dir: Optional[str] = None,
+    store_dir: Optional[str] = None,
+    catalog=None,
+    profile_path: Optional[str] = None,
+    **model_options,
+) -> dict:
+    """
+    一次调用完成 钻孔数据 → 模型 的全部流程，中间结果全程在内存中传递。
+    参数:
+        borehole_data: 钻孔位置（钻孔名称、x、y、z），DataFrame 或文件路径
+        layer_statistics: 横向四列一组的地层统计表，DataFrame 或文件路径
+        layer_points: 已计算好的地层坐标（地层名称、x、y、z）；给出时跳过前三个阶段
+        sheet_name: 地层统计表工作表名
+        checkpoint_dir: 若设置，各阶段结果以 Parquet/NPZ 写入该目录
+        cache_dir: 若设置，启用增量构建（见 incremental.py），结果中附带 report
+        store_dir: 若设置，层面堆栈持久化到 store_dir/<模型名>，结果中附带 store_path
+        catalog: 若设置（catalog.ModelCatalog），导出后登记模型元数据
+        profile_path: 若设置，对本次构建做采样剖析并写出 folded stacks（见 metrics.profile）
+        model_options: 透传给 tin_kriging_prism_model.run 的建模参数
+    返回:
+        字典，包含建模结果及 layer_points、origin_info、timings（各阶段耗时，秒）
+    """
+    timings = {}
+    origin_info = None
+    profiler = metrics.profile(profile_path) if profile_path else contextlib.nullcontext()
+    try:
+        with profiler:
+            if layer_points is None:
+                if borehole_data is None or layer_statistics is None:
+                    raise ValueError("需提供 layer_points，或同时提供 borehole_data 与 layer_statistics")
+
+                t0 = time.perf_counter()
+                borehole_local, origin_info = stage_local_coordinates(borehole_data, checkpoint_dir)
+                timings["local_coordinates"] = time.perf_counter() - t0
+
+                t0 = time.perf_counter()
+                merged = stage_merge_layers(layer_statistics, sheet_name, checkpoint_dir)
+                timings["merge_layers"] = time.perf_counter() - t0
+
+                t0 = time.perf_counter()
+                layer_points = stage_thickness(merged, borehole_local, checkpoint_dir)
+                timings["thickness"] = time.perf_counter() - t0
+            else:
+                layer_points = read_table(layer_points)
+
+            t0 = time.perf_counter()
+            result = stage_model(layer_points, checkpoint_dir, cache_dir, store_dir, **model_options)
+            timings["model"] = time.perf_counter() - t0
+            if catalog is not None:
+                record_in_catalog(catalog, result, layer_points, model_options)
+    except Exception:
+        metrics.inc("modelshow_builds_total", result="error")
+        raise
+    metrics.inc("modelshow_builds_total", result="ok")
+
+    for stage, seconds in timings.items():
+        metrics.observe(metrics.STAGE_SECONDS, seconds, stage=f"pipeline_{stage}")
+        print(f"[pipeline] {stage}: {seconds:.3f}s")
+
+    result.update({
+        "layer_points": layer_points,
+        "origin_info": origin_info,
+        "timings": timings,
+    })
+    return result
@@ -0,0 +1,149 @@
+"""
+基于层面堆栈的剖面与虚拟钻孔查询。
+
+直接在克里金层面网格上向量化采样所有层面，不构建任何网格：
+- 规则网格：双线性插值，只读取查询点周围四个节点所在的内存映射页；
+- 自适应 / 按边界裁剪的网格：与 Block 相同的 Delaunay 三角网上做重心坐标线性插值。
+范围外（或边界多边形外）的点返回 NaN。
+返回的高程为实际高程（已除以 z_scale），z_scale 随结果一并返回。
+"""
+import numpy as np
+from matplotlib.path import Path
+
+
+def _sample_regular(stack, xy: np.ndarray) -> np.ndarray:
+    xi, yi = stack.axes()
+    grid = stack.as_grid()
+    nx, ny = len(xi), len(yi)
+    fx = np.interp(xy[:, 0], xi, np.arange(nx), left=np.nan, right=np.nan)
+    fy = np.interp(xy[:, 1], yi, np.arange(ny), left=np.nan, right=np.nan)
+    out = np.full((grid.shape[0], len(xy)), np.nan)
+    ok = np.isfinite(fx) & np.isfinite(fy)
+    fx, fy = fx[ok], fy[ok]
+    i0 = np.minimum(fx.astype(int), nx - 2)
+    j0 = np.minimum(fy.astype(int), ny - 2)
+    tx, ty = fx - i0, fy - j0
+    z00 = grid[:, j0, i0]
+    z10 = grid[:, j0, i0 + 1]
+    z01 = grid[:, j0 + 1, i0]
+    z11 = grid[:, j0 + 1, i0 + 1]
+    out[:, ok] = (z00 * (1 - tx) * (1 - ty) + z10 * tx * (1 - ty)
+                  + z01 * (1 - tx) * ty + z11 * tx * ty)
+    return out
+
+
+def _sample_tin(stack, xy: np.ndarray) -> np.ndarray:
+    tri, valid = stack.triangulation()
+    simplex = tri.find_simplex(xy)
+    ok = simplex >= 0
+    ok[ok] = valid[simplex[ok]]
+    out = np.full((stack.z.shape[0], len(xy)), np.nan)
+    if not ok.any():
+        return out
+    s = simplex[ok]
+    transform = tri.transform[s]
+    bary = np.einsum("ijk,ik->ij", transform[:, :2], xy[ok] - transform[:, 2])
+    weights = np.c_[bary, 1 - bary.sum(axis=1)]
+    verts = tri.simplices[s]
+    # 只读取涉及的节点列
+    cols, inverse = np.unique(verts, return_inverse=True)
+    z = np.asarray(stack.z[:, cols])[:, inverse.reshape(verts.shape)]
+    out[:, ok] = (z * weights[None]).sum(axis=-1)
+    return out
+
+
+def sample_horizons(stack, xy) -> np.ndarray:
+    """
+    在任意平面点处采样全部层面。
+    参数:
+        stack: HorizonStack
+        xy: 查询点 (M, 2)
+    返回:
+        (n_layers, M) 实际高程，范围外为 NaN
+    """
+    xy = np.atleast_2d(np.asarray(xy, dtype=float))
+    if stack.grid_shape is not None:
+        z = _sample_regular(stack, xy)
+        if stack.boundary is not None:
+            z[:, ~Path(stack.boundary).contains_points(xy)] = np.nan
+    else:
+        z = _sample_tin(stack, xy)
+    return z / stack.z_scale
+
+
+def densify_polyline(polyline, num: int = 200, spacing: float = None, max_points: int = None):
+    """
+    沿折线等距取样；给出 spacing 时按间距取样，超过 max_points 时报错。
+    返回:
+        (xy (M, 2), 沿线距离 (M,))
+    """
+    polyline = np.asarray(polyline, dtype=float)
+    if polyline.ndim != 2 or polyline.shape[1] != 2 or len(polyline) < 2:
+        raise ValueError("剖面线需为至少 2 个 (x, y) 顶点")
+    seg = np.linalg.norm(np.diff(polyline, axis=0), axis=1)
+    cum = np.r_[0.0, np.cumsum(seg)]
+    if cum[-1] == 0:
+        raise ValueError("剖面线长度为 0")
+    if spacing:
+        num = int(np.ceil(cum[-1] / spacing)) + 1
+    if max_points and num > max_points:
+        raise ValueError(f"剖面采样点过多（{num} > {max_points}）")
+    dist = np.linspace(0.0, cum[-1], max(int(num), 2))
+    xy = np.column_stack((np.interp(dist, cum, polyline[:, 0]), np.interp(dist, cum, polyline[:, 1])))
+    return xy, dist
+
+
+def cross_section(stack, polyline, num: int = 200, spacing: float = None, max_points: int = None) -> dict:
+    """
+    沿折线的竖直剖面。
+    返回:
+        {distance, x, y, z (n_layers, M), order, layer_names, z_scale}
+    """
+    xy, dist = densify_polyline(polyline, num, spacing, max_points)
+    return {
+        "distance": dist,
+        "x": xy[:, 0],
+        "y": xy[:, 1],
+        "z": sample_horizons(stack, xy),
+        "order": stack.order,
+        "layer_names": stack.layer_names,
+        "z_scale": stack.z_scale,
+    }
+
+
+def borehole_profiles(stack, xy) -> list:
+    """
+    任意平面位置的虚拟钻孔：各地层的顶、底板高程与厚度（自上而下）。
+    参数:
+        xy: 查询位置 (M, 2)，所有位置一次采样
+    返回:
+        [{x, y, surface, strata: [{name, top, bottom, thickness}, ...]}, ...]，范围外时 strata 为空
+    """
+    xy = np.atleast_2d(np.asarray(xy, dtype=float))
+    z_all = sample_horizons(stack, xy)
+    names = stack.layer_names
+    profiles = []
+    for k, (x, y) in enumerate(xy):
+        z = z_all[:, k]
+        strata = []
+        if np.all(np.isfinite(z)):
+            for i in range(len(z) - 2, -1, -1):
+                name = names[i] if i < len(names) else stack.order[i]
+                strata.append({
+                    "name": name,
+                    "top": float(z[i + 1]),
+                    "bottom": float(z[i]),
+                    "thickness": float(max(z[i + 1] - z[i], 0.0)),
+                })
+        profiles.append({
+            "x": float(x),
+            "y": float(y),
+            "surface": float(z[-1]) if np.isfinite(z[-1]) else None,
+            "strata": strata,
+        })
+    return profiles
+
+
+def borehole_profile(stack, x: float, y: float) -> dict:
+    """单点虚拟钻孔，见 borehole_profiles。"""
+    return borehole_profiles(stack, [[x, y]])[0]
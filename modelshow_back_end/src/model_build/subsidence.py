@@ -0,0 +1,345 @@
+"""
+概率积分法沉陷计算的 NumPy 数组引擎。
+
+post-subsidence_point_conversion.py 中的 subsidence_probability_integral 以 pandas Series
+逐层计算并向 DataFrame 写入新列，subsidence_multilayer 还会为每层复制一份 DataFrame。
+这里改为纯数组计算，公式与其保持一致：
+- 规则网格且 alpha = 0 时 fx 只与 x 有关、fy 只与 y 有关，
+  每个坐标轴只计算一次一维 erf 项，再取外积 fy ⊗ fx，erf 调用量由 nx·ny 降为 nx + ny；
+- 多个层面的参数 (q, H, tan_beta, theta0) 可为长度 L 的数组，一次广播计算得到 (L, ny, nx)；
+- alpha ≠ 0 或散点输入时退化为逐点二维计算，同样按层广播；
+- subsidence_horizons 直接在克里金层面堆栈（horizon_store）上计算，供模型导出变形目标；
+- 多工作面叠加（superpose_points / superpose_grid）：所有工作面对一批点一次性向量化计算，
+  点按平面分块排序后分块计算以限制内存，每块只计算影响范围覆盖到该块的工作面，
+  块之间可用线程池并行（erf 等 ufunc 计算时释放 GIL），
+  可按开采顺序与 Knothe 时间函数给出任意时刻的累计下沉。
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy.special import erf
+
+SQRT2 = np.sqrt(2.0)
+
+
+def _as_column(value, dtype):
+    """标量或 (L,) 参数 → (L, 1)，便于与坐标广播。"""
+    return np.atleast_1d(np.asarray(value, dtype=dtype))[:, None]
+
+
+def influence_1d(u, half_length, delta, B):
+    """
+    单个方向的影响函数 0.5·[erf((u + L/2 + δ)/(√2B)) − erf((u − L/2 − δ)/(√2B))]。
+    u 与参数按 NumPy 规则广播。
+    """
+    scale = 1.0 / (SQRT2 * B)
+    return 0.5 * (erf((u + half_length + delta) * scale) - erf((u - half_length - delta) * scale))
+
+
+def subsidence_grid(xi, yi, q, H, tan_beta, theta0, center_x, center_y, Lx, Ly,
+                    alpha: float = 0.0, dtype=np.float64) -> np.ndarray:
+    """
+    规则网格上的下沉量。
+    参数:
+        xi, yi: 网格坐标轴 (nx,)、(ny,)
+        q, H, tan_beta, theta0: 标量或长度为 L 的数组（每个层面一组参数）
+        center_x, center_y, Lx, Ly, alpha: 工作面中心、走向/倾向长度与方位角（弧度）
+        dtype: 计算精度，float32 可减半内存
+    返回:
+        (L, ny, nx) 下沉量
+    """
+    xi = np.asarray(xi, dtype=dtype)
+    yi = np.asarray(yi, dtype=dtype)
+    q, H, tan_beta, theta0 = (_as_column(v, dtype) for v in (q, H, tan_beta, theta0))
+    B = H * tan_beta
+    delta = H / np.tan(theta0)
+    amplitude = (q * H)[:, :, None]
+
+    if alpha == 0:
+        # 可分离：每个轴只算一次 erf，再做外积
+        fx = influence_1d((xi - center_x)[None, :], Lx / 2, delta, B)   # (L, nx)
+        fy = influence_1d((yi - center_y)[None, :], Ly / 2, delta, B)   # (L, ny)
+        return amplitude * fy[:, :, None] * fx[:, None, :]
+
+    gx, gy = np.meshgrid(xi, yi)
+    return subsidence_points(
+        gx, gy, q[:, 0], H[:, 0], tan_beta[:, 0], theta0[:, 0],
+        center_x, center_y, Lx, Ly, alpha, dtype
+    )
+
+
+def subsidence_points(x, y, q, H, tan_beta, theta0, center_x, center_y, Lx, Ly,
+                      alpha: float = 0.0, dtype=np.float64) -> np.ndarray:
+    """
+    任意点（散点或任意形状数组）上的下沉量，与 subsidence_probability_integral 公式一致。
+    返回:
+        (L, *x.shape) 下沉量
+    """
+    x = np.asarray(x, dtype=dtype)
+    y = np.asarray(y, dtype=dtype)
+    shape = (-1,) + (1,) * x.ndim
+    q, H, tan_beta, theta0 = (np.atleast_1d(np.asarray(v, dtype=dtype)).reshape(shape)
+                              for v in (q, H, tan_beta, theta0))
+    B = H * tan_beta
+    delta = H / np.tan(theta0)
+
+    dx = x - center_x
+    dy = y - center_y
+    if alpha != 0:
+        # 倾角修正
+        dx, dy = dx * np.cos(alpha) + dy * np.sin(alpha), -dx * np.sin(alpha) + dy * np.cos(alpha)
+    fx = influence_1d(dx[None], Lx / 2, delta, B)
+    fy = influence_1d(dy[None], Ly / 2, delta, B)
+    return q * H * fx * fy
+
+
+def transfer_parameters(delta_h, H_base, tan_beta_base, theta0_base, q_base, loose=False):
+    """
+    parameter_transfer 的向量化版本：delta_h 与 loose 可为 (L,) 数组。
+    返回:
+        (H, tan_beta, theta0, q)，均为 (L,) 数组
+    """
+    delta_h = np.atleast_1d(np.asarray(delta_h, dtype=np.float64))
+    H = H_base - delta_h
+    H = np.where(H <= 0, 1e-3, H)  # 避免为零或负值
+    B = H_base * tan_beta_base - delta_h * tan_beta_base
+    tan_beta = B / H
+    theta0 = np.arctan(np.tan(theta0_base) * (H_base / H))
+    q = q_base * np.where(np.asarray(loose, dtype=bool), 0.9, 1.0) * np.ones_like(H)
+    return H, tan_beta, theta0, q
+
+
+def subsidence_multilayer_grid(xi, yi, z_stack, mining_layer_depth, q_base, H_base,
+                               tan_beta_base, theta0_base, center_x, center_y, Lx, Ly,
+                               alpha: float = 0.0, layer_names=None, layer_types=None,
+                               dtype=np.float64):
+    """
+    多层沉陷的网格版 subsidence_multilayer：所有层面一次广播计算。
+    参数:
+        xi, yi: 网格坐标轴
+        z_stack: (L, ny, nx) 各层面高程
+        mining_layer_depth: 采矿层平均高程
+        layer_names / layer_types: 与 subsidence_multilayer 相同的松散层标记方式
+        其余参数同 subsidence_multilayer
+    返回:
+        (subsidence, z_subsided)，均为 (L, ny, nx)
+    """
+    z_stack = np.asarray(z_stack)
+    delta_h = z_stack.reshape(len(z_stack), -1).mean(axis=1) - mining_layer_depth
+    loose = np.zeros(len(z_stack), dtype=bool)
+    if layer_names is not None and layer_types:
+        loose = np.array([layer_types.get(name) == "loose" for name in layer_names])
+    H, tan_beta, theta0, q = transfer_parameters(delta_h, H_base, tan_beta_base, theta0_base, q_base, loose)
+    subsidence = subsidence_grid(xi, yi, q, H, tan_beta, theta0, center_x, center_y, Lx, Ly, alpha, dtype)
+    return subsidence, z_stack - subsidence
+
+
+def subsidence_horizons(stack, mining_layer, q_base, H_base, tan_beta_base, theta0_base,
+                        center_x, center_y, Lx, Ly, alpha: float = 0.0, layer_types=None,
+                        dtype=np.float64) -> np.ndarray:
+    """
+    直接在层面堆栈（HorizonStack）的插值网格上计算多层沉陷。
+    参数:
+        stack: HorizonStack，层面高程为乘过 z_scale 的值
+        mining_layer: 采矿层面名称 (str) 或序号 (int)，或采矿层平均高程 (float，实际高程)；
+                      其它类型（含 bool）抛出 TypeError
+        layer_types: {层面名称: 'rock' 或 'loose'}，层面名称同 stack.order
+        其余参数同 subsidence_multilayer
+    返回:
+        (n_layers, N) 各层面节点的下沉量 (m)，与 stack.z 的行对应
+    """
+    z_scale = stack.z_scale
+    means = np.array([np.mean(stack.z[i], dtype=np.float64) for i in range(stack.z.shape[0])]) / z_scale
+    if isinstance(mining_layer, (bool, np.bool_)):
+        raise TypeError("mining_layer 不能为布尔值")
+    if isinstance(mining_layer, (str, int, np.integer)):
+        idx = stack.index(mining_layer)
+        if not 0 <= idx < len(means):
+            raise IndexError(f"层面序号超出范围: {mining_layer}")
+        mining_layer = means[idx]
+    elif not isinstance(mining_layer, (float, np.floating)):
+        raise TypeError(f"mining_layer 需为层面名称/序号或高程 (float)，得到 {type(mining_layer).__name__}")
+    loose = np.zeros(len(means), dtype=bool)
+    if layer_types:
+        loose = np.array([layer_types.get(name) == "loose" for name in stack.order])
+    H, tan_beta, theta0, q = transfer_parameters(
+        means - float(mining_layer), H_base, tan_beta_base, theta0_base, q_base, loose
+    )
+    if stack.grid_shape is not None:
+        xi, yi = stack.axes()
+        s = subsidence_grid(xi, yi, q, H, tan_beta, theta0, center_x, center_y, Lx, Ly, alpha, dtype)
+        return s.reshape(len(means), -1)
+    xy = np.asarray(stack.xy)
+    return subsidence_points(xy[:, 0], xy[:, 1], q, H, tan_beta, theta0,
+                             center_x, center_y, Lx, Ly, alpha, dtype)
+
+
+PANEL_FIELDS = ("center_x", "center_y", "Lx", "Ly", "alpha", "q", "H", "tan_beta", "theta0", "start", "rate")
+PANEL_DEFAULTS = {"alpha": 0.0, "start": 0.0, "rate": np.inf}
+
+
+def normalize_panels(panels, **defaults) -> dict:
+    """
+    工作面参数整理为等长数组字典。
+    参数:
+        panels: DataFrame、字典列表或数组字典，字段见 PANEL_FIELDS：
+                center_x, center_y, Lx, Ly, alpha（方位角，弧度）, q, H, tan_beta, theta0,
+                start（开采开始时间）, rate（Knothe 时间系数 c，inf 表示瞬时下沉）；
+                也可给出 sequence（开采顺序），缺少 start 时作为开始时间
+        defaults: 所有工作面共用的参数（如 q=0.9, H=150.0）
+    返回:
+        {字段: (P,) float64 数组}
+    """
+    if isinstance(panels, pd.DataFrame):
+        table = {k: panels[k].to_numpy() for k in panels.columns}
+    elif isinstance(panels, dict):
+        table = dict(panels)
+    else:
+        table = pd.DataFrame(list(panels)).to_dict("series")
+    if "start" not in table and "sequence" in table:
+        table["start"] = table["sequence"]
+    count = len(next(iter(table.values())))
+    out = {}
+    for field in PANEL_FIELDS:
+        if field in table:
+            value = table[field]
+        elif field in defaults:
+            value = defaults[field]
+        elif field in PANEL_DEFAULTS:
+            value = PANEL_DEFAULTS[field]
+        else:
+            raise ValueError(f"工作面缺少参数: {field}")
+        out[field] = np.broadcast_to(np.asarray(value, dtype=np.float64), (count,)).copy()
+    return out
+
+
+def time_factor(times, start, rate) -> np.ndarray:
+    """
+    Knothe 时间函数 W(t) = 1 − exp(−c·(t − t0))，开采前为 0；c 为 inf 时为阶跃函数。
+    返回:
+        (T, P)
+    """
+    elapsed = np.atleast_1d(np.asarray(times, dtype=np.float64))[:, None] - start[None, :]
+    with np.errstate(invalid="ignore", over="ignore"):
+        w = np.where(np.isinf(rate)[None, :], 1.0, -np.expm1(-rate[None, :] * np.maximum(elapsed, 0.0)))
+    return np.where(elapsed >= 0, w, 0.0)
+
+
+# |z| ≥ 6 时 erf(z) 与 ±1 的差小于 1e-16，影响函数在双精度下恰为 0
+ERF_CUTOFF = 6.0
+
+
+def panel_reach(p) -> np.ndarray:
+    """各工作面影响范围半径：超出该距离的点下沉贡献为 0（双精度）。"""
+    B = p["H"] * p["tan_beta"]
+    delta = p["H"] / np.tan(p["theta0"])
+    margin = ERF_CUTOFF * SQRT2 * np.abs(B) + delta
+    return np.hypot(p["Lx"] / 2 + margin, p["Ly"] / 2 + margin)
+
+
+def _spatial_order(x, y, chunk_size):
+    """按平面分块排序，使每个计算块内的点在空间上聚集，便于剔除影响不到的工作面。"""
+    cells = max(int(np.ceil(np.sqrt(len(x) / chunk_size))), 1)
+    x0, y0 = x.min(), y.min()
+    w = max(np.ptp(x), 1e-9) / cells
+    h = max(np.ptp(y), 1e-9) / cells
+    ix = np.minimum(((x - x0) / w).astype(np.int64), cells - 1)
+    iy = np.minimum(((y - y0) / h).astype(np.int64), cells - 1)
+    return np.argsort(iy * cells + ix, kind="stable")
+
+
+def _panel_chunk(x, y, p, dtype):
+    """一块点上各工作面的下沉贡献 (P, n)。"""
+    B = (p["H"] * p["tan_beta"])[:, None]
+    delta = (p["H"] / np.tan(p["theta0"]))[:, None]
+    cos_a = np.cos(p["alpha"])[:, None]
+    sin_a = np.sin(p["alpha"])[:, None]
+    dx = x[None, :] - p["center_x"][:, None]
+    dy = y[None, :] - p["center_y"][:, None]
+    u = dx * cos_a + dy * sin_a
+    v = dy * cos_a - dx * sin_a
+    fx = influence_1d(u, (p["Lx"] / 2)[:, None], delta, B)
+    fy = influence_1d(v, (p["Ly"] / 2)[:, None], delta, B)
+    return ((p["q"] * p["H"])[:, None] * fx * fy).astype(dtype, copy=False)
+
+
+def superpose_points(x, y, panels, times=None, chunk_size: int = 16384, workers: int = None,
+                     dtype=np.float64, **defaults) -> np.ndarray:
+    """
+    多工作面下沉叠加（任意点）。
+    参数:
+        x, y: 点坐标 (N,)
+        panels: 工作面参数，见 normalize_panels
+        times: None 表示全部开采完成后的最终下沉；给出时间序列时返回各时刻的累计下沉
+        chunk_size: 每块点数，单块内存约 P × chunk_size × 8 字节 × 数个临时数组
+        workers: 线程数，默认 CPU 核数；1 为串行
+        defaults: 工作面共用参数
+    返回:
+        times 为 None 时 (N,)，否则 (T, N)
+    """
+    p = normalize_panels(panels, **defaults)
+    x = np.ascontiguousarray(x, dtype=np.float64).ravel()
+    y = np.ascontiguousarray(y, dtype=np.float64).ravel()
+    n = len(x)
+    weights = None if times is None else time_factor(times, p["start"], p["rate"]).astype(dtype)
+    out = np.zeros(n if weights is None else (len(weights), n), dtype=dtype)
+    if n == 0:
+        return out
+    reach = panel_reach(p)
+    order = _spatial_order(x, y, chunk_size)
+
+    def work(lo):
+        idx = order[lo:lo + chunk_size]
+        cx, cy = x[idx], y[idx]
+        # 只计算影响范围与本块包围盒相交的工作面
+        gap_x = np.maximum.reduce([cx.min() - p["center_x"], p["center_x"] - cx.max(), np.zeros_like(reach)])
+        gap_y = np.maximum.reduce([cy.min() - p["center_y"], p["center_y"] - cy.max(), np.zeros_like(reach)])
+        active = np.hypot(gap_x, gap_y) <= reach
+        if not active.any():
+            return
+        sub = {k: v[active] for k, v in p.items()}
+        contrib = _panel_chunk(cx, cy, sub, dtype)
+        if weights is None:
+            out[idx] = contrib.sum(axis=0)
+        else:
+            out[:, idx] = weights[:, active] @ contrib
+
+    starts = range(0, n, chunk_size)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or n <= chunk_size:
+        for lo in starts:
+            work(lo)
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(work, starts))
+    return out
+
+
+def superpose_grid(xi, yi, panels, times=None, chunk_size: int = 16384, workers: int = None,
+                   dtype=np.float64, **defaults) -> np.ndarray:
+    """
+    多工作面下沉叠加（规则网格）。
+    全部工作面 alpha = 0 时可分离：S = Σ_p A_p · fy_p ⊗ fx_p = fyᵀ · diag(A) · fx，
+    一次矩阵乘法完成叠加；否则按点分块计算。
+    返回:
+        times 为 None 时 (ny, nx)，否则 (T, ny, nx)
+    """
+    p = normalize_panels(panels, **defaults)
+    xi = np.asarray(xi, dtype=np.float64)
+    yi = np.asarray(yi, dtype=np.float64)
+    if np.any(p["alpha"] != 0):
+        gx, gy = np.meshgrid(xi, yi)
+        out = superpose_points(gx, gy, p, times, chunk_size, workers, dtype)
+        return out.reshape(out.shape[:-1] + (len(yi), len(xi)))
+
+    B = (p["H"] * p["tan_beta"])[:, None]
+    delta = (p["H"] / np.tan(p["theta0"]))[:, None]
+    fx = influence_1d(xi[None, :] - p["center_x"][:, None], (p["Lx"] / 2)[:, None], delta, B)  # (P, nx)
+    fy = influence_1d(yi[None, :] - p["center_y"][:, None], (p["Ly"] / 2)[:, None], delta, B)  # (P, ny)
+    amplitude = p["q"] * p["H"]
+    if times is None:
+        return ((fy.T * amplitude) @ fx).astype(dtype, copy=False)
+    weights = time_factor(times, p["start"], p["rate"]) * amplitude  # (T, P)
+    return np.einsum("tp,py,px->tyx", weights, fy, fx, optimize=True).astype(dtype, copy=False)
@@ -0,0 +1,293 @@
+"""
+沉陷参数扫描与敏感性分析。
+
+post-subsidence_point_conversion.main 中 q_base、tan_beta_base、theta0_base、H_base 为写死的常量，
+调参需要改代码后整体重跑一遍。这里给出批量扫描接口：
+- parameter_combinations：参数网格（笛卡尔积）或分布抽样（Monte Carlo）生成参数组合；
+- run_sweep / iter_sweep：按批把参数组合分发到进程池，每批内 parameter_transfer 与概率积分法
+  对“组合 × 层面”一次广播计算，只返回汇总统计（最大下沉、影响面积、各层平均下沉），
+  不保留完整下沉场，结果可边算边写入 CSV；
+- sensitivity：各参数与输出指标的 Spearman 秩相关系数。
+规则网格且 alpha = 0 时利用 fy ⊗ fx 的可分离性直接得到精确统计量：
+最大值 = A·max(fx)·max(fy)，平均值 = A·mean(fx)·mean(fy)，
+超过阈值的节点数按行对排序后的 fx 二分查找，不生成 (ny, nx) 场；其余情况按点分块计算。
+"""
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+
+import numpy as np
+import pandas as pd
+
+from .subsidence import subsidence_points, transfer_parameters, influence_1d
+
+SWEEP_PARAMS = ("q_base", "H_base", "tan_beta_base", "theta0_base")
+# 与 post-subsidence_point_conversion.main 中的基础参数一致
+SWEEP_DEFAULTS = {
+    "q_base": 0.9,
+    "H_base": 150.0,
+    "tan_beta_base": float(np.tan(np.deg2rad(45))),
+    "theta0_base": float(np.deg2rad(70)),
+}
+
+# 每个工作进程的计算域（由 _init_worker 设置，避免每批重复传输网格）
+_CONTEXT = None
+
+
+def _sample(spec, size, rng) -> np.ndarray:
+    """
+    按分布描述抽样：
+        ("uniform", low, high) / ("normal", mean, std) / ("lognormal", mean, sigma)
+        ("triangular", left, mode, right) / ("choice", [取值...])
+        数组：直接作为样本（长度须为 size）；可调用对象：func(rng, size)
+    """
+    if callable(spec):
+        return np.asarray(spec(rng, size), dtype=np.float64)
+    if isinstance(spec, tuple) and spec and isinstance(spec[0], str):
+        kind, *args = spec
+        if kind == "choice":
+            return rng.choice(np.asarray(args[0], dtype=np.float64), size)
+        if kind not in ("uniform", "normal", "lognormal", "triangular"):
+            raise ValueError(f"不支持的分布: {kind}")
+        return getattr(rng, kind)(*args, size)
+    values = np.asarray(spec, dtype=np.float64)
+    if values.shape != (size,):
+        raise ValueError(f"样本长度应为 {size}")
+    return values
+
+
+def parameter_combinations(grid: dict = None, distributions: dict = None, samples: int = 0,
+                           random_state: int = None, **fixed) -> pd.DataFrame:
+    """
+    生成参数组合。
+    参数:
+        grid: {参数名: 取值列表}，取笛卡尔积
+        distributions: {参数名: 分布描述}，见 _sample；与 grid 同时给出时每个网格点抽样 samples 次
+        samples: Monte Carlo 样本数
+        random_state: 随机种子
+        fixed: 固定参数，未给出的参数取 SWEEP_DEFAULTS
+    返回:
+        DataFrame，列为 SWEEP_PARAMS
+    """
+    grid = grid or {}
+    distributions = distributions or {}
+    unknown = set(grid) | set(distributions) | set(fixed)
+    unknown -= set(SWEEP_PARAMS)
+    if unknown:
+        raise ValueError(f"未知参数: {sorted(unknown)}")
+    if distributions and samples <= 0:
+        raise ValueError("给出分布时 samples 须大于 0")
+
+    names = list(grid)
+    rows = list(product(*(np.asarray(grid[n], dtype=np.float64) for n in names))) if names else [()]
+    table = pd.DataFrame(rows, columns=names)
+    if distributions:
+        table = table.loc[table.index.repeat(samples)].reset_index(drop=True)
+        rng = np.random.default_rng(random_state)
+        for name, spec in distributions.items():
+            table[name] = _sample(spec, len(table), rng)
+    for name in SWEEP_PARAMS:
+        if name not in table:
+            table[name] = float(fixed.get(name, SWEEP_DEFAULTS[name]))
+    return table[list(SWEEP_PARAMS)]
+
+
+def _init_worker(context):
+    global _CONTEXT
+    _CONTEXT = context
+
+
+def _layer_parameters(ctx, params):
+    """parameter_transfer 对“组合 × 层面”广播，返回各 (K, L) 数组。"""
+    base = [params[:, i][:, None] for i in range(len(SWEEP_PARAMS))]
+    q_base, H_base, tan_beta_base, theta0_base = base
+    H, tan_beta, theta0, q = transfer_parameters(
+        ctx["delta_h"][None, :], H_base, tan_beta_base, theta0_base, q_base, ctx["loose"][None, :]
+    )
+    return q, H, tan_beta, theta0
+
+
+def _count_above(fx, fy, amplitude, threshold):
+    """可分离场 A·fy[j]·fx[i] ≥ threshold 的节点数（fx 排序后逐行二分查找）。"""
+    if amplitude <= 0:
+        return 0
+    fx = np.sort(fx)
+    with np.errstate(divide="ignore"):
+        limits = threshold / (amplitude * fy)
+    return int((len(fx) - np.searchsorted(fx, limits, side="left")).sum())
+
+
+def _grid_stats(ctx, q, H, tan_beta, theta0):
+    """规则网格、alpha = 0：由一维影响函数直接得到统计量，(K, L) 各一组。"""
+    xi, yi, w = ctx["xi"], ctx["yi"], ctx["workface"]
+    B = H * tan_beta
+    delta = H / np.tan(theta0)
+    amplitude = q * H
+    K, L = q.shape
+    fx = influence_1d(xi[None, None, :] - w["center_x"], w["Lx"] / 2, delta[..., None], B[..., None])
+    fy = influence_1d(yi[None, None, :] - w["center_y"], w["Ly"] / 2, delta[..., None], B[..., None])
+    peak = amplitude * fx.max(axis=2) * fy.max(axis=2)
+    mean = amplitude * fx.mean(axis=2) * fy.mean(axis=2)
+    count = np.array([
+        [_count_above(fx[k, l], fy[k, l], amplitude[k, l], ctx["threshold"]) for l in range(L)]
+        for k in range(K)
+    ])
+    return peak, mean, count * ctx["cell_area"]
+
+
+def _point_stats(ctx, q, H, tan_beta, theta0):
+    """散点或倾斜工作面：逐层按点分块计算并累计最大值、总和与超阈值点数。"""
+    w = ctx["workface"]
+    K, L = q.shape
+    peak = np.zeros((K, L))
+    total = np.zeros((K, L))
+    count = np.zeros((K, L))
+    chunk = max(ctx["chunk_elements"] // K, 1)
+    for l, (x, y) in enumerate(ctx["points"]):
+        for lo in range(0, len(x), chunk):
+            s = subsidence_points(
+                x[lo:lo + chunk], y[lo:lo + chunk], q[:, l], H[:, l], tan_beta[:, l], theta0[:, l],
+                w["center_x"], w["center_y"], w["Lx"], w["Ly"], w["alpha"]
+            )
+            peak[:, l] = np.maximum(peak[:, l], s.max(axis=1))
+            total[:, l] += s.sum(axis=1)
+            count[:, l] += np.count_nonzero(s >= ctx["threshold"], axis=1)
+    sizes = np.array([len(x) for x, _ in ctx["points"]], dtype=np.float64)
+    return peak, total / sizes, count * ctx["point_area"]
+
+
+def _evaluate_batch(params: np.ndarray) -> np.ndarray:
+    """一批参数组合 (K, 4) → 汇总统计 (K, 3L)：各层最大值、平均值、影响面积。"""
+    ctx = _CONTEXT
+    q, H, tan_beta, theta0 = _layer_parameters(ctx, params)
+    stats = _grid_stats if ctx["separable"] else _point_stats
+    peak, mean, area = stats(ctx, q, H, tan_beta, theta0)
+    return np.hstack([peak, mean, area])
+
+
+def sweep_context(mining_layer_depth, center_x, center_y, Lx, Ly, alpha=0.0,
+                  layers: dict = None, grid=None, layer_names=None, layer_types=None,
+                  threshold: float = 0.01, chunk_elements: int = 2_000_000) -> dict:
+    """
+    整理扫描计算域。
+    参数:
+        mining_layer_depth: 采矿层平均高程
+        center_x, center_y, Lx, Ly, alpha: 工作面参数（同 subsidence_multilayer）
+        layers: {层名: DataFrame(X, Y, Z)}，与 subsidence_multilayer 的输入相同
+        grid: (xi, yi, z_stack) 规则网格与 (L, ny, nx) 层面高程，与 layers 二选一
+        layer_names: grid 输入时的层名
+        layer_types: {层名: 'rock' 或 'loose'}
+        threshold: 计入影响面积的下沉阈值 (m)
+        chunk_elements: 散点计算时单块 “组合 × 点数” 上限，控制内存
+    """
+    workface = {"center_x": float(center_x), "center_y": float(center_y),
+                "Lx": float(Lx), "Ly": float(Ly), "alpha": float(alpha)}
+    ctx = {"workface": workface, "threshold": float(threshold), "chunk_elements": int(chunk_elements)}
+    if grid is not None:
+        xi, yi, z_stack = grid
+        xi = np.asarray(xi, dtype=np.float64)
+        yi = np.asarray(yi, dtype=np.float64)
+        z_stack = np.asarray(z_stack)
+        names = list(layer_names) if layer_names is not None else [f"layer_{i}" for i in range(len(z_stack))]
+        means = z_stack.reshape(len(z_stack), -1).mean(axis=1)
+        ctx.update(xi=xi, yi=yi, separable=alpha == 0)
+        ctx["cell_area"] = float(np.ptp(xi) / max(len(xi) - 1, 1) * np.ptp(yi) / max(len(yi) - 1, 1))
+        if alpha != 0:
+            gx, gy = np.meshgrid(xi, yi)
+            ctx["points"] = [(gx.ravel(), gy.ravel())] * len(z_stack)
+            ctx["point_area"] = ctx["cell_area"]
+    elif layers is not None:
+        names = list(layers)
+        means = np.array([layers[n]["Z"].mean() for n in names])
+        ctx["points"] = [(layers[n]["X"].to_numpy(np.float64), layers[n]["Y"].to_numpy(np.float64)) for n in names]
+        all_x = np.concatenate([x for x, _ in ctx["points"]])
+        all_y = np.concatenate([y for _, y in ctx["points"]])
+        # 散点无单元面积，按各层平均每点代表的包围盒面积估计
+        ctx["point_area"] = float(np.ptp(all_x) * np.ptp(all_y) * len(names) / len(all_x))
+        ctx["separable"] = False
+    else:
+        raise ValueError("须给出 layers 或 grid")
+
+    layer_types = layer_types or {}
+    ctx["layer_names"] = names
+    ctx["delta_h"] = np.asarray(means, dtype=np.float64) - mining_layer_depth
+    ctx["loose"] = np.array([layer_types.get(n) == "loose" for n in names])
+    # 平均高程最高的层面视为地表，影响面积按地表统计
+    ctx["surface"] = int(np.argmax(means))
+    return ctx
+
+
+def _summary_frame(ctx, params, values) -> pd.DataFrame:
+    names = ctx["layer_names"]
+    L = len(names)
+    frame = pd.DataFrame(params, columns=list(SWEEP_PARAMS))
+    peak, mean, area = values[:, :L], values[:, L:2 * L], values[:, 2 * L:]
+    frame["max_subsidence"] = peak.max(axis=1)
+    frame["affected_area"] = area[:, ctx["surface"]]
+    for i, name in enumerate(names):
+        frame[f"{name}_mean"] = mean[:, i]
+        frame[f"{name}_max"] = peak[:, i]
+        frame[f"{name}_area"] = area[:, i]
+    return frame
+
+
+def iter_sweep(combinations, context: dict, batch_size: int = 64, workers: int = None):
+    """
+    逐批计算参数组合，按输入顺序产出每批的汇总 DataFrame。
+    参数:
+        combinations: parameter_combinations 的结果（或含 SWEEP_PARAMS 列的 DataFrame）
+        context: sweep_context 的结果
+        batch_size: 每批组合数
+        workers: 进程数，默认 CPU 核数；1 时在当前进程计算
+    """
+    params = combinations[list(SWEEP_PARAMS)].to_numpy(np.float64)
+    batches = [params[i:i + batch_size] for i in range(0, len(params), batch_size)]
+    workers = min(workers or os.cpu_count() or 1, max(len(batches), 1))
+    if workers == 1:
+        _init_worker(context)
+        results = map(_evaluate_batch, batches)
+        for batch, values in zip(batches, results):
+            yield _summary_frame(context, batch, values)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(context,)) as pool:
+        for batch, values in zip(batches, pool.map(_evaluate_batch, batches)):
+            yield _summary_frame(context, batch, values)
+
+
+def run_sweep(combinations, context: dict, batch_size: int = 64, workers: int = None,
+              output_path: str = None) -> pd.DataFrame:
+    """
+    运行参数扫描。
+    参数:
+        output_path: 给出时每批结果立即追加写入该 CSV
+    返回:
+        全部组合的汇总 DataFrame（每个组合一行，不含完整下沉场）
+    """
+    frames = []
+    writer = None
+    f = open(output_path, "w", newline="", encoding="utf-8") if output_path else None
+    try:
+        for i, frame in enumerate(iter_sweep(combinations, context, batch_size, workers)):
+            if f is not None:
+                if writer is None:
+                    writer = csv.writer(f)
+                    writer.writerow(frame.columns)
+                writer.writerows(frame.itertuples(index=False))
+                f.flush()
+            frames.append(frame)
+            print(f"[sweep] 第 {i + 1} 批完成，累计 {sum(len(x) for x in frames)} 组")
+    finally:
+        if f is not None:
+            f.close()
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def sensitivity(summary: pd.DataFrame, outputs=("max_subsidence", "affected_area")) -> pd.DataFrame:
+    """
+    各参数与输出指标的 Spearman 秩相关系数（行为参数，列为输出）。
+    取值固定的参数结果为 NaN。
+    """
+    params = [p for p in SWEEP_PARAMS if p in summary]
+    corr = summary[params + list(outputs)].corr(method="spearman")
+    return corr.loc[params, list(outputs)]
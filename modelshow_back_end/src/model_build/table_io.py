@@ -0,0 +1,135 @@
+"""
+表格数据读取：按扩展名（或文件头）识别 Excel / CSV / Parquet / Feather / NPZ。
+
+Excel 与 CSV 解析较慢，首次读取后会在同目录的 .loader_cache/ 下写出以文件内容哈希命名的
+Parquet 旁路缓存；再次读取同一内容的文件时直接加载缓存（毫秒级）。
+文件内容一旦变化哈希随之改变，不会读到过期缓存。
+"""
+import hashlib
+import os
+import zipfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+CACHE_DIR_NAME = ".loader_cache"
+CACHE_VERSION = "1"
+
+# 需要旁路缓存的慢速格式
+_SLOW_FORMATS = {"excel", "csv"}
+
+
+def detect_format(path) -> str:
+    """
+    识别表格文件格式，返回 excel / csv / parquet / feather / npz。
+    优先使用扩展名，无法判断时读取文件头魔数。
+    """
+    suffix = Path(path).suffix.lower()
+    if suffix in (".xlsx", ".xls", ".xlsm"):
+        return "excel"
+    if suffix == ".csv":
+        return "csv"
+    if suffix in (".parquet", ".pq"):
+        return "parquet"
+    if suffix in (".feather", ".arrow"):
+        return "feather"
+    if suffix == ".npz":
+        return "npz"
+
+    with open(path, "rb") as f:
+        head = f.read(8)
+    if head[:4] == b"PAR1":
+        return "parquet"
+    if head[:6] == b"ARROW1":
+        return "feather"
+    if head[:4] == b"PK\x03\x04":
+        # xlsx 与 npz 均为 zip 容器，按成员区分：xlsx 含 xl/workbook.xml，npz 全部为 .npy
+        try:
+            with zipfile.ZipFile(path) as zf:
+                names = zf.namelist()
+        except zipfile.BadZipFile:
+            return "excel"
+        if "xl/workbook.xml" not in names and names and all(n.endswith(".npy") for n in names):
+            return "npz"
+        return "excel"
+    if head[:8] == b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1":
+        return "excel"  # 旧版 .xls
+    return "csv"
+
+
+def file_hash(path, chunk_size: int = 1 << 20) -> str:
+    """按内容计算文件哈希。"""
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _read_csv(path) -> pd.DataFrame:
+    # C 引擎快速路径；UTF-8 失败时依次尝试常见中文编码
+    for encoding in ("utf-8", "utf-8-sig", "gbk"):
+        try:
+            return pd.read_csv(path, engine="c", encoding=encoding)
+        except UnicodeDecodeError:
+            continue
+    return pd.read_csv(path, engine="c", encoding="utf-8", encoding_errors="ignore")
+
+
+def _read_npz(path) -> pd.DataFrame:
+    # 每个一维数组作为一列，如 地层名称/x/y/z
+    with np.load(path, allow_pickle=False) as data:
+        return pd.DataFrame({key: data[key] for key in data.files})
+
+
+def _read_uncached(path, fmt: str, sheet_name=0) -> pd.DataFrame:
+    if fmt == "excel":
+        return pd.read_excel(path, sheet_name=sheet_name)
+    if fmt == "csv":
+        return _read_csv(path)
+    if fmt == "parquet":
+        return pd.read_parquet(path)
+    if fmt == "feather":
+        return pd.read_feather(path)
+    return _read_npz(path)
+
+
+def cache_path_for(path, sheet_name=0) -> str:
+    """返回文件对应的旁路缓存路径（以内容哈希 + 工作表名为键）。"""
+    key = hashlib.sha1(f"{file_hash(path)}|{sheet_name}|{CACHE_VERSION}".encode()).hexdigest()
+    return os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR_NAME, f"{key}.parquet")
+
+
+def read_table(path, sheet_name=0, use_cache: bool = True) -> pd.DataFrame:
+    """
+    读取任意支持格式的表格文件。
+    参数:
+        path: 文件路径
+        sheet_name: Excel 工作表（其他格式忽略）
+        use_cache: 对 Excel/CSV 启用 Parquet 旁路缓存
+    返回:
+        DataFrame
+    """
+    fmt = detect_format(path)
+    if not use_cache or fmt not in _SLOW_FORMATS:
+        return _read_uncached(path, fmt, sheet_name)
+
+    sidecar = cache_path_for(path, sheet_name)
+    if os.path.exists(sidecar):
+        try:
+            return pd.read_parquet(sidecar)
+        except Exception as e:
+            print(f"读取缓存失败，重新解析源文件: {e}")
+
+    df = _read_uncached(path, fmt, sheet_name)
+    try:
+        os.makedirs(os.path.dirname(sidecar), exist_ok=True)
+        # 先写临时文件再替换，避免并发读取到半写的缓存
+        tmp_path = f"{sidecar}.{os.getpid()}.tmp"
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, sidecar)
+    except Exception as e:
+        # 未安装 pyarrow 或存在混合类型列时不缓存，不影响读取结果
+        print(f"写入读取缓存失败（已忽略）: {e}")
+    return df
@@ -1,54 +1,64 @@
 import pandas as pd
 
-def process_thickness_to_coordinates():
-    # 读取地层统计数据
-    layer_data_path = './data/real_data/地层统计_标准分段_合并结果.xlsx'
-    layer_data = pd.read_excel(layer_data_path)
-    # print(layer_data)
-    # 读取钻孔位置数据
-    borehole_data_path = './data/real_data/钻孔位置统计_局部坐标系.xlsx'
-    borehole_data = pd.read_excel(borehole_data_path)
-    # print(borehole_data)
-    # 合并数据，计算地层底板坐标
-    results = []
-    for _, borehole in borehole_data.iterrows():
-        borehole_name = borehole['钻孔名称']
-        x, y, z_top = borehole['x'], borehole['y'], borehole['z']
+LAYER_DATA_PATH = './data/real_data/地层统计_标准分段_合并结果.xlsx'
+BOREHOLE_DATA_PATH = './data/real_data/钻孔位置统计_局部坐标系.xlsx'
+OUTPUT_PATH = './data/real_data/地层坐标.xlsx'
 
-        # 筛选对应钻孔的地层数据
-        borehole_layers = layer_data[layer_data['钻孔名称'] == borehole_name]
 
-        z_current = z_top
+def thickness_to_coordinates(layer_data: pd.DataFrame, borehole_data: pd.DataFrame) -> pd.DataFrame:
+    """
+    由钻孔孔口坐标与分层厚度计算各地层底板坐标（纯内存计算，不读写文件）。
+    参数:
+        layer_data: 地层统计数据，需包含 钻孔名称、地层名称、厚度 列，
+                    同一钻孔内按自上而下的顺序排列
+        borehole_data: 钻孔位置数据，需包含 钻孔名称、x、y、z 列，z 为孔口高程
+    返回:
+        DataFrame，列为 地层名称、x、y、z；其中“地表层”为孔口坐标，其余为各层底板坐标
+    """
+    collars = borehole_data[['钻孔名称', 'x', 'y', 'z']].reset_index(drop=True)
+    collars['_row'] = collars.index
 
-        for _, layer in borehole_layers.iterrows():
-            layer_name = layer['地层名称']
-            thickness = layer['厚度']
-            z_bottom = z_current - thickness
+    # 一次合并代替逐钻孔筛选，inner 合并保持左表钻孔顺序及右表层序
+    merged = collars.merge(
+        layer_data[['钻孔名称', '地层名称', '厚度']], on='钻孔名称', how='inner'
+    )
+    # 按孔口行累计厚度（以行号分组，重名钻孔互不干扰）；
+    # 厚度缺失时其下各层深度均为 NaN，与逐层累减一致，不把缺失当作 0
+    depth = merged.groupby('_row', sort=False)['厚度'].cumsum(skipna=False)
 
-            # 保存地层底板坐标
-            results.append({
-                '地层名称': layer_name,
-                'x': x,
-                'y': y,
-                'z': z_bottom
-            })
-
-            z_current = z_bottom
+    results_df = pd.DataFrame({
+        '地层名称': merged['地层名称'],
+        'x': merged['x'],
+        'y': merged['y'],
+        'z': merged['z'] - depth,
+    })
 
     # 添加地表层数据到地层坐标
-    surface_data = borehole_data[['钻孔名称', 'x', 'y', 'z']].copy()
-    surface_data.rename(columns={'钻孔名称': '地层名称'}, inplace=True)
-    surface_data['地层名称'] = '地表层'
+    surface_data = collars[['x', 'y', 'z']].copy()
+    surface_data.insert(0, '地层名称', '地表层')
 
-    # 合并地表层和地层数据
-    results_df = pd.DataFrame(results)
+    # 合并地表层和地层数据，并按地层名称排序
     combined_df = pd.concat([surface_data, results_df], ignore_index=True)
-
-    # 按地层名称排序
     combined_df.sort_values(by=['地层名称'], inplace=True)
+    return combined_df
+
+
+def process_thickness_to_coordinates(
+    layer_data_path: str = LAYER_DATA_PATH,
+    borehole_data_path: str = BOREHOLE_DATA_PATH,
+    output_path: str = OUTPUT_PATH,
+) -> pd.DataFrame:
+    # 读取地层统计数据与钻孔位置数据
+    layer_data = pd.read_excel(layer_data_path)
+    borehole_data = pd.read_excel(borehole_data_path)
+
+    # 合并数据，计算地层底板坐标
+    combined_df = thickness_to_coordinates(layer_data, borehole_data)
 
     # 写出地层坐标数据
-    output_path = './data/real_data/地层坐标.xlsx'
     combined_df.to_excel(output_path, index=False)
+    return combined_df
+
 
-process_thickness_to_coordinates()
\ No newline at end of file
+if __name__ == "__main__":
+    process_thickness_to_coordinates()
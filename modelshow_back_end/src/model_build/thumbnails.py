@@ -0,0 +1,40 @@
+"""
+模型预览缩略图：导出时用 PyVista 离屏渲染 <模型名>.thumb.png，与模型文件放在同一目录。
+"""
+import os
+
+THUMBNAIL_SUFFIX = ".thumb.png"
+THUMBNAIL_SIZE = (320, 240)
+
+
+def thumbnail_path(model_path: str) -> str:
+    """模型文件对应的缩略图路径。"""
+    return os.path.splitext(model_path)[0] + THUMBNAIL_SUFFIX
+
+
+def thumbnail_is_fresh(model_path: str) -> bool:
+    """缩略图存在且不早于模型文件。"""
+    path = thumbnail_path(model_path)
+    if not os.path.exists(path):
+        return False
+    return not os.path.exists(model_path) or os.path.getmtime(path) >= os.path.getmtime(model_path)
+
+
+def write_thumbnail(block, model_path: str, window_size=THUMBNAIL_SIZE):
+    """
+    为 block 渲染缩略图，写到 model_path 旁边。
+    返回:
+        缩略图路径；渲染失败时返回 None
+    """
+    path = thumbnail_path(model_path)
+    tmp = f"{path}.tmp.png"
+    try:
+        block.render_thumbnail(tmp, window_size=window_size)
+        os.replace(tmp, path)
+    except Exception as e:
+        print(f"[警告] 缩略图渲染失败: {e}")
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        return None
+    print(f"缩略图已保存到 {path}")
+    return path
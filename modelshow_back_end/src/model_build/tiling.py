@@ -0,0 +1,198 @@
+"""
+3D Tiles 分块与多级细节（LOD）导出。
+
+每个地层的外壳网格按平面四叉树递归划分：
+- 叶节点保存该范围内的全分辨率三角形，geometricError 为 0；
+- 父节点保存同一范围经二次误差（quadric）简化后的网格，
+  geometricError 取简化网格相对原始网格的最大偏差（模型坐标单位）；
+- 包围体由节点内实际顶点计算的 box 给出，不再使用估算的经纬度范围。
+根节点通过 ENU→ECEF 变换矩阵把模型中心放到 center_coords 指定的经纬度与高程，
+Cesium 等客户端据此按屏幕误差只加载可见范围与所需精度的瓦片。
+"""
+import json
+import os
+
+import numpy as np
+import pyvista as pv
+import trimesh
+
+from .build_block_pyvista import GLTF_COLORS, shell_mesh
+
+WGS84_A = 6378137.0
+WGS84_E2 = 6.69437999014e-3
+
+
+def enu_to_ecef_transform(lon: float, lat: float, height: float) -> list:
+    """返回以 (lon, lat, height)（度、度、米）为原点的 ENU→ECEF 变换，列主序 16 元素。"""
+    lon_r, lat_r = np.radians(lon), np.radians(lat)
+    sin_lat, cos_lat = np.sin(lat_r), np.cos(lat_r)
+    sin_lon, cos_lon = np.sin(lon_r), np.cos(lon_r)
+    n = WGS84_A / np.sqrt(1 - WGS84_E2 * sin_lat ** 2)
+    origin = [
+        (n + height) * cos_lat * cos_lon,
+        (n + height) * cos_lat * sin_lon,
+        (n * (1 - WGS84_E2) + height) * sin_lat,
+    ]
+    east = [-sin_lon, cos_lon, 0.0]
+    north = [-sin_lat * cos_lon, -sin_lat * sin_lon, cos_lat]
+    up = [cos_lat * cos_lon, cos_lat * sin_lon, sin_lat]
+    return [float(v) for v in (*east, 0.0, *north, 0.0, *up, 0.0, *origin, 1.0)]
+
+
+def bounding_box(points: np.ndarray) -> list:
+    """由顶点计算 3D Tiles box 包围体：中心 + 三个半轴。"""
+    lo, hi = points.min(axis=0), points.max(axis=0)
+    center = (lo + hi) / 2
+    half = np.maximum((hi - lo) / 2, 1e-3)
+    return [float(v) for v in (*center, half[0], 0, 0, 0, half[1], 0, 0, 0, half[2])]
+
+
+def _submesh(points: np.ndarray, faces: np.ndarray):
+    """按面索引提取紧凑子网格，返回 (points, faces)。"""
+    used, inverse = np.unique(faces, return_inverse=True)
+    return points[used], inverse.reshape(-1, 3)
+
+
+def _to_polydata(points: np.ndarray, faces: np.ndarray) -> pv.PolyData:
+    return pv.PolyData(points, np.c_[np.full(len(faces), 3), faces].ravel())
+
+
+def simplify(points: np.ndarray, faces: np.ndarray, target_faces: int):
+    """
+    二次误差简化到约 target_faces 个三角形，保留网格边界。
+    返回:
+        (points, faces, error)，error 为原始顶点到简化网格的最大距离
+    """
+    mesh = _to_polydata(points, faces)
+    reduction = 1.0 - target_faces / max(len(faces), 1)
+    if reduction <= 0:
+        return points, faces, 0.0
+    reduced = mesh.decimate(min(reduction, 0.99), boundary_constraints=True)
+    if reduced.n_cells == 0:
+        return points, faces, 0.0
+    error = float(np.abs(mesh.compute_implicit_distance(reduced)["implicit_distance"]).max())
+    reduced_faces = reduced.faces.reshape(-1, 4)[:, 1:]
+    return np.asarray(reduced.points), reduced_faces, error
+
+
+def write_glb(points: np.ndarray, faces: np.ndarray, color, path: str):
+    """写出瓦片内容 .glb；3D Tiles 约定 glTF 为 Y 轴向上，故 (x, y, z) 写为 (x, z, -y)。"""
+    vertices = np.column_stack((points[:, 0], points[:, 2], -points[:, 1]))
+    tri_mesh = trimesh.Trimesh(vertices=vertices, faces=faces, process=False)
+    tri_mesh.visual.face_colors = color
+    tri_mesh.export(path)
+
+
+class _QuadtreeTiler:
+    """单个地层的四叉树分块器。"""
+
+    def __init__(self, points, faces, color, output_dir, prefix, max_faces, max_depth):
+        self.points = points
+        self.faces = faces
+        self.centroids = points[faces].mean(axis=1)[:, :2]
+        self.color = color
+        self.output_dir = output_dir
+        self.prefix = prefix
+        self.max_faces = max_faces
+        self.max_depth = max_depth
+        self.stats = {"tiles": 0, "faces": 0}
+
+    def build(self):
+        lo = self.centroids.min(axis=0)
+        hi = self.centroids.max(axis=0)
+        return self._node(np.arange(len(self.faces)), lo, hi, depth=0, address="0")
+
+    def _node(self, face_ids, lo, hi, depth, address):
+        node_points, node_faces = _submesh(self.points, self.faces[face_ids])
+        tile = {"boundingVolume": {"box": bounding_box(node_points)}}
+
+        if len(face_ids) <= self.max_faces or depth >= self.max_depth:
+            content_points, content_faces, error = node_points, node_faces, 0.0
+            children = []
+        else:
+            mid = (lo + hi) / 2
+            children = []
+            c = self.centroids[face_ids]
+            right = c[:, 0] >= mid[0]
+            top = c[:, 1] >= mid[1]
+            for q, (mask, qlo, qhi) in enumerate([
+                (~right & ~top, lo, mid),
+                (right & ~top, np.array([mid[0], lo[1]]), np.array([hi[0], mid[1]])),
+                (~right & top, np.array([lo[0], mid[1]]), np.array([mid[0], hi[1]])),
+                (right & top, mid, hi),
+            ]):
+                if mask.any():
+                    children.append(self._node(face_ids[mask], qlo, qhi, depth + 1, f"{address}{q}"))
+            content_points, content_faces, error = simplify(node_points, node_faces, self.max_faces)
+            # 父节点误差不得小于子节点，保证客户端逐级细化
+            error = max([error] + [ch["geometricError"] for ch in children])
+
+        uri = f"{self.prefix}_{address}.glb"
+        write_glb(content_points, content_faces, self.color, os.path.join(self.output_dir, uri))
+        self.stats["tiles"] += 1
+        self.stats["faces"] += len(content_faces)
+
+        tile["geometricError"] = error
+        tile["content"] = {"uri": uri}
+        if children:
+            tile["refine"] = "REPLACE"
+            tile["children"] = children
+        return tile
+
+
+def export_tileset(block, output_dir: str, center_coords=None, max_faces_per_tile: int = 20000, max_depth: int = 4):
+    """
+    将 Block 的各地层导出为带 LOD 层级的 3D Tiles（tileset.json + .glb 内容）。
+    参数:
+        block: 已构建 mesh_list 的 Block
+        output_dir: 输出目录
+        center_coords: 模型中心 [经度, 纬度, 高程]，默认为 [116.0, 39.0, 0]
+        max_faces_per_tile: 单个瓦片的三角形上限，超过则继续四叉划分
+        max_depth: 四叉树最大深度
+    返回:
+        tileset.json 路径
+    """
+    if not block.mesh_list:
+        raise ValueError("没有可导出的网格数据，请先执行 visualization_block 方法")
+    os.makedirs(output_dir, exist_ok=True)
+    if center_coords is None:
+        center_coords = [116.0, 39.0, 0]
+    lon, lat, height = center_coords
+
+    shells = [shell_mesh(mesh) for mesh in block.mesh_list]
+    all_points = np.vstack([np.asarray(s.points) for s in shells if s.n_points])
+    # 以模型包围盒中心为局部原点，减小 float32 精度损失
+    origin = (all_points.min(axis=0) + all_points.max(axis=0)) / 2
+
+    children = []
+    for idx, shell in enumerate(shells):
+        if shell.n_cells == 0:
+            print(f"警告：第{idx}层网格没有有效的面数据，跳过")
+            continue
+        points = np.asarray(shell.points) - origin
+        faces = shell.faces.reshape(-1, 4)[:, 1:]
+        tiler = _QuadtreeTiler(
+            points, faces, GLTF_COLORS[idx % len(GLTF_COLORS)], output_dir,
+            f"{block.layer_label(idx)}_{idx}", max_faces_per_tile, max_depth
+        )
+        children.append(tiler.build())
+        print(f"已导出地层 {block.layer_label(idx)}：{tiler.stats['tiles']} 个瓦片，"
+              f"{tiler.stats['faces']} 个三角形，根误差 {children[-1]['geometricError']:.3f}")
+
+    root_box = bounding_box(all_points - origin)
+    diagonal = float(np.linalg.norm(all_points.max(axis=0) - all_points.min(axis=0)))
+    tileset = {
+        "asset": {"version": "1.1"},
+        "geometricError": diagonal,
+        "root": {
+            "transform": enu_to_ecef_transform(lon, lat, height),
+            "boundingVolume": {"box": root_box},
+            "geometricError": diagonal,
+            "refine": "ADD",
+            "children": children,
+        },
+    }
+    tileset_path = os.path.join(output_dir, "tileset.json")
+    with open(tileset_path, "w", encoding="utf-8") as f:
+        json.dump(tileset, f, indent=2, ensure_ascii=False)
+    return tileset_path
@@ -1,21 +1,39 @@
+import heapq
+
 import numpy as np
 import pandas as pd
+from scipy.ndimage import maximum_filter
 from pykrige.ok import OrdinaryKriging
 from .build_block_pyvista import Block
-import matplotlib.pyplot as plt
+from .table_io import read_table
+from .boundary import resolve_boundary, mask_grid
+from .decimation import decimate_horizons
+from .thumbnails import write_thumbnail
+from . import metrics
 
 
-def load_layer_points(path: str):
+def load_layer_points(path: str, use_cache: bool = True):
     """
     读取地层坐标数据，文件格式为地层名称、x、y、z。
+    支持 Excel / CSV / Parquet / Feather / NPZ，按扩展名或文件头自动识别。
     参数:
         path: 文件路径
+        use_cache: Excel/CSV 是否使用以文件哈希为键的 Parquet 旁路缓存
     返回:
         字典，key是地层名称，value是包含 x, y, z 的 DataFrame。
     """
-    # 读取 Excel 文件
-    df = pd.read_excel(path)
+    df = read_table(path, use_cache=use_cache)
+    return group_layer_points(df)
+
 
+def group_layer_points(df: pd.DataFrame):
+    """
+    将内存中的地层坐标 DataFrame（地层名称、x、y、z）按地层分组。
+    参数:
+        df: 地层坐标数据
+    返回:
+        字典，key是地层名称，value是包含 x, y, z 的 DataFrame。
+    """
     # 检查必要列是否存在
     required_columns = {"地层名称", "x", "y", "z"}
     if not required_columns.issubset(df.columns):
@@ -35,15 +53,16 @@ def load_layer_points(path: str):
     return groups
 
 
-def load_borehole_locations(path: str):
+def load_borehole_locations(path: str, use_cache: bool = True):
     """
-    读取钻孔位置和名称。
+    读取钻孔位置和名称。格式支持同 load_layer_points。
     参数:
         path: 文件路径
+        use_cache: Excel/CSV 是否使用旁路缓存
     返回:
         DataFrame，包含 x, y 坐标和钻孔名称。
     """
-    df = pd.read_excel(path)
+    df = read_table(path, use_cache=use_cache)
 
     # 检查必要列是否存在
     required_columns = {"钻孔名称", "x", "y"}
@@ -55,7 +74,8 @@ def load_borehole_locations(path: str):
     return df
 
 
-def build_unified_grid(layers: dict, grid_nx: int = 80, grid_ny: int = 80):
+def layer_bounds(layers: dict):
+    """返回所有地层点的平面范围 (x_min, x_max, y_min, y_max)。"""
     xs = []
     ys = []
     for df in layers.values():
@@ -65,6 +85,11 @@ def build_unified_grid(layers: dict, grid_nx: int = 80, grid_ny: int = 80):
     x_max = max(s.max() for s in xs)
     y_min = min(s.min() for s in ys)
     y_max = max(s.max() for s in ys)
+    return x_min, x_max, y_min, y_max
+
+
+def build_unified_grid(layers: dict, grid_nx: int = 80, grid_ny: int = 80):
+    x_min, x_max, y_min, y_max = layer_bounds(layers)
     print(
         f"生成模型的面积：{((x_max - x_min) * (y_max - y_min))/1000000}km²,长度：{(y_max - y_min)/1000}km,宽度：{(x_max - x_min)/1000}km  "
     )
@@ -143,6 +168,145 @@ def krige_layer(
     return np.asarray(z_pred)
 
 
+def build_adaptive_grid(
+    layers: dict,
+    max_vertices: int = None,
+    max_error: float = None,
+    base_n: int = 8,
+    pilot_n: int = 40,
+    max_level: int = 6,
+    default_variogram: str = "spherical",
+    layer_variogram: dict = None,
+    borehole_xy: np.ndarray = None,
+):
+    """
+    生成自适应（非均匀）网格点，供 Block 按 TIN 构建三棱柱。
+    在钻孔附近和克里金曲面曲率大的位置加密，平坦区域保持稀疏。
+
+    做法：先在 pilot_n × pilot_n 的粗网格上试插值所有层，估算二阶导数；
+    再从 base_n × base_n 的四叉树单元开始，按误差从大到小逐个细分。
+    单元误差取线性插值误差上界 (w² + h²) · |z''| / 8（数据 z 单位），
+    含钻孔的单元优先细分到最深层级。
+    参数:
+        layers: 地层点字典（同 load_layer_points 返回值）
+        max_vertices: 顶点数上限
+        max_error: 误差上限，所有单元误差低于该值时停止细分
+        base_n: 初始单元划分数
+        pilot_n: 曲率估算用粗网格点数
+        max_level: 最大细分层级
+        default_variogram / layer_variogram: 同 interpolate_all_layers
+        borehole_xy: 钻孔平面坐标 (N, 2)，默认取各层输入点的去重平面坐标
+    返回:
+        网格点坐标 (N, 2)
+    """
+    if max_vertices is None and max_error is None:
+        raise ValueError("自适应网格需要指定 max_vertices 或 max_error")
+    if layer_variogram is None:
+        layer_variogram = {}
+
+    x_min, x_max, y_min, y_max = layer_bounds(layers)
+    if not (x_max - x_min > 0 and y_max - y_min > 0):
+        # 钻孔共线时平面范围退化，无法估算曲率和定位单元，退回规则网格
+        n = max(int(np.sqrt(max_vertices)), 2) if max_vertices is not None else pilot_n
+        print(f"钻孔平面范围退化，自适应网格退回 {n}x{n} 规则网格")
+        return build_unified_grid(layers, n, n)[2]
+
+    # 1) 粗网格试插值，估算各层曲率并取最大值
+    pxi = np.linspace(x_min, x_max, pilot_n)
+    pyi = np.linspace(y_min, y_max, pilot_n)
+    pgx, pgy = np.meshgrid(pxi, pyi)
+    pilot_points = np.c_[pgx.ravel(), pgy.ravel()]
+    curvature = np.zeros((pilot_n, pilot_n))
+    for lname, df in layers.items():
+        model = layer_variogram.get(lname, default_variogram)
+        z = krige_layer(df, pilot_points, model).reshape(pilot_n, pilot_n)
+        zy, zx = np.gradient(z, pyi, pxi)
+        zxy, zxx = np.gradient(zx, pyi, pxi)
+        zyy, _ = np.gradient(zy, pyi, pxi)
+        curvature = np.maximum(curvature, np.abs(zxx) + 2 * np.abs(zxy) + np.abs(zyy))
+    # 取邻域最大值，避免单元中心恰好落在拐点上而低估误差
+    curvature = maximum_filter(curvature, size=3)
+
+    if borehole_xy is None:
+        borehole_xy = np.unique(
+            np.vstack([df[["x", "y"]].to_numpy() for df in layers.values()]), axis=0
+        )
+    bx, by = borehole_xy[:, 0], borehole_xy[:, 1]
+
+    def cell_priority(x0, y0, w, h, level):
+        if level < max_level and np.any((bx >= x0) & (bx <= x0 + w) & (by >= y0) & (by <= y0 + h)):
+            return np.inf
+        jx = int(round((x0 + w / 2 - x_min) / (x_max - x_min) * (pilot_n - 1)))
+        jy = int(round((y0 + h / 2 - y_min) / (y_max - y_min) * (pilot_n - 1)))
+        return curvature[jy, jx] * (w * w + h * h) / 8.0
+
+    # 2) 四叉树贪心细分
+    w0 = (x_max - x_min) / base_n
+    h0 = (y_max - y_min) / base_n
+    # 钻孔位置本身也作为顶点，保证插值面经过实测点
+    vertices = {(round(x, 6), round(y, 6)) for x, y in borehole_xy}
+    vertices.update(
+        (round(x, 6), round(y, 6))
+        for x in np.linspace(x_min, x_max, base_n + 1)
+        for y in np.linspace(y_min, y_max, base_n + 1)
+    )
+    heap = []
+    for i in range(base_n):
+        for j in range(base_n):
+            x0, y0 = x_min + i * w0, y_min + j * h0
+            heapq.heappush(heap, (-cell_priority(x0, y0, w0, h0, 0), x0, y0, w0, h0, 0))
+
+    while heap:
+        neg_p, x0, y0, w, h, level = heap[0]
+        if level >= max_level:
+            heapq.heappop(heap)
+            continue
+        if max_error is not None and -neg_p <= max_error:
+            break
+        if max_vertices is not None and len(vertices) + 5 > max_vertices:
+            break
+        heapq.heappop(heap)
+        hw, hh = w / 2, h / 2
+        for x, y in ((x0 + hw, y0), (x0, y0 + hh), (x0 + hw, y0 + hh), (x0 + w, y0 + hh), (x0 + hw, y0 + h)):
+            vertices.add((round(x, 6), round(y, 6)))
+        for cx0, cy0 in ((x0, y0), (x0 + hw, y0), (x0, y0 + hh), (x0 + hw, y0 + hh)):
+            heapq.heappush(heap, (-cell_priority(cx0, cy0, hw, hh, level + 1), cx0, cy0, hw, hh, level + 1))
+
+    grid_points = np.array(sorted(vertices))
+    print(f"自适应网格顶点数: {len(grid_points)}")
+    return grid_points
+
+
+def build_model_grid(
+    layers: dict,
+    grid_nx: int = 80,
+    grid_ny: int = 80,
+    grid_mode: str = "uniform",
+    max_vertices: int = None,
+    max_error: float = None,
+    default_variogram: str = "spherical",
+    layer_variogram: dict = None,
+):
+    """
+    按 grid_mode 生成建模网格点：
+        "uniform"  — build_unified_grid 的 grid_nx × grid_ny 规则网格
+        "adaptive" — build_adaptive_grid；未给出预算时 max_vertices 取 grid_nx*grid_ny/4
+    返回:
+        网格点坐标 (N, 2)
+    """
+    if grid_mode == "adaptive":
+        if max_vertices is None and max_error is None:
+            max_vertices = grid_nx * grid_ny // 4
+        return build_adaptive_grid(
+            layers, max_vertices=max_vertices, max_error=max_error,
+            default_variogram=default_variogram, layer_variogram=layer_variogram,
+        )
+    if grid_mode != "uniform":
+        raise ValueError(f"未知的网格模式: {grid_mode}")
+    _, _, grid_points = build_unified_grid(layers, grid_nx, grid_ny)
+    return grid_points
+
+
 def interpolate_all_layers(
     layer_points: dict, 
     grid_points: np.ndarray,
@@ -159,7 +323,8 @@ def interpolate_all_layers(
     z_list = []
     for lname in order:
         model = layer_variogram.get(lname, default_variogram)
-        z_vals = krige_layer(layer_points[lname], grid_points, model, verbose_krige=verbose_krige) * z_scale
+        with metrics.timer("krige_layer", layer=lname):
+            z_vals = krige_layer(layer_points[lname], grid_points, model, verbose_krige=verbose_krige) * z_scale
         z_list.append(z_vals)
     return order, z_list
 
@@ -168,7 +333,10 @@ def build_block_model(
     grid_points: np.ndarray,
     z_list: list,
     layer_names: list,
-    filename: str = "./public/model_gltf/output_model.gltf",
+    filename: str = "output_model.gltf",
+    output_dir: str = "./public/model_gltf",
+    boundary: np.ndarray = None,
+    thumbnail: bool = True,
 ):
     """
     构建块体模型，并将地层名称写入模型。
@@ -176,18 +344,28 @@ def build_block_model(
         grid_points: 网格点坐标。
         z_list: 每个地层的 z 值列表。
         layer_names: 地层名称列表。
+        filename: 输出 GLTF 文件名。
+        output_dir: 输出目录。
+        boundary: 边界多边形，边界外的三角形不生成块体。
+        thumbnail: 是否在模型旁离屏渲染预览缩略图（见 thumbnails.py）。
+    返回:
+        导出的 GLTF 文件路径。
     """
     # 创建块体模型
-    block = Block(xy=grid_points, z_list=z_list)
+    block = Block(xy=grid_points, z_list=z_list, boundary=boundary)
 
     # 将地层名称写入模型
     block.layer_names = layer_names
 
-    # 执行模型构建
-    block.execute()
+    # 直接由层面堆栈导出，相邻地层共享界面顶点（不再逐层构建三棱柱网格）
+    # block.execute()
     # block.export_model("./data/output_model.vtm")
-    block.export_to_gltf_trimesh(f"./public/model_gltf/{filename}")
+    output_path = f"{output_dir}/{filename}"
+    block.export_to_gltf_shared(output_path)
     # block.export_to_3dtiles("./data/model_3dtiles/output_model")
+    if thumbnail:
+        write_thumbnail(block, output_path)
+    return output_path
 
 
 def run(
@@ -198,13 +376,23 @@ def run(
     layer_variogram: dict = None,
     verbose_krige: bool = False,
     z_scale: float = 10.0,
-    save_file_name: str = "output_model.gltf"
+    save_file_name: str = "output_model.gltf",
+    output_dir: str = "./public/model_gltf",
+    grid_mode: str = "uniform",
+    max_vertices: int = None,
+    max_error: float = None,
+    boundary=None,
+    boundary_alpha: float = None,
+    decimate_ratio: float = None,
+    decimate_error: float = None,
+    thumbnail: bool = True,
 ):
     """
     运行地层建模主函数
     
     参数:
-        data_path: 输入数据文件路径，包含地层名称、x、y、z坐标
+        data_path: 输入数据文件路径，包含地层名称、x、y、z坐标；
+                   也可直接传入同结构的 DataFrame 或 load_layer_points 返回的分组字典
         grid_nx: 网格X方向点数
         grid_ny: 网格Y方向点数
         default_variogram: 默认变差函数模型 ("spherical", "linear", "gaussian"等)
@@ -212,12 +400,37 @@ def run(
         verbose_krige: 是否显示克里金插值详细信息
         z_scale: Z轴缩放因子
         save_file_name: 输出模型文件名
+        output_dir: 输出模型目录
+        grid_mode: "uniform" 规则网格，或 "adaptive" 按钻孔密度与曲率自适应加密的 TIN
+        max_vertices: 自适应网格顶点预算
+        max_error: 自适应网格插值误差上限（数据 z 单位）
+        boundary: 建模范围边界，None（整个外包矩形）、"convex"（钻孔凸包）、
+                  "concave"（alpha-shape 凹包）或多边形顶点 [(x, y), ...]
+        boundary_alpha: 凹包的外接圆半径阈值
+        decimate_ratio: 层面简化后保留的三角形比例，见 decimation.decimate_horizons
+        decimate_error: 层面简化允许的最大偏差（模型坐标单位，已乘 z_scale）
+        thumbnail: 是否生成模型预览缩略图
+    返回:
+        字典，包含 order、z_list、grid_points、layer_names、output_path、
+        boundary（边界多边形或 None）与 z_scale
     """
     if layer_variogram is None:
         layer_variogram = {}
 
-    layer_points = load_layer_points(data_path)
-    xi, yi, grid_points = build_unified_grid(layer_points, grid_nx, grid_ny)
+    if isinstance(data_path, dict):
+        layer_points = data_path
+    elif isinstance(data_path, pd.DataFrame):
+        layer_points = group_layer_points(data_path)
+    else:
+        layer_points = load_layer_points(data_path)
+    grid_points = build_model_grid(
+        layer_points, grid_nx, grid_ny, grid_mode, max_vertices, max_error,
+        default_variogram, layer_variogram
+    )
+    # 插值前裁剪到边界内，只对边界内节点克里金
+    polygon = resolve_boundary(boundary, layer_points, boundary_alpha)
+    if polygon is not None:
+        grid_points = mask_grid(grid_points, polygon)
     order, z_list = interpolate_all_layers(
         layer_points, 
         grid_points,
@@ -227,10 +440,25 @@ def run(
         verbose_krige
     )
 
+    if decimate_ratio is not None or decimate_error is not None:
+        grid_points, z_list, _ = decimate_horizons(
+            grid_points, z_list, decimate_ratio, decimate_error, polygon
+        )
+
     # 排除最顶层地表层
     layer_names = [name for name in order if name != "地表层"]
 
-    build_block_model(grid_points, z_list, layer_names, save_file_name)
+    output_path = build_block_model(grid_points, z_list, layer_names, save_file_name, output_dir, polygon,
+                                    thumbnail)
+    return {
+        "order": order,
+        "z_list": z_list,
+        "grid_points": grid_points,
+        "layer_names": layer_names,
+        "output_path": output_path,
+        "boundary": polygon,
+        "z_scale": z_scale,
+    }
 
 
 if __name__ == "__main__":
@@ -0,0 +1,141 @@
+"""
+地层体积与厚度统计。
+
+在层面堆栈（horizon_store）上逐地层向量化计算，不构建网格：
+- 规则网格：节点厚度为相邻层面之差，单元厚度取四角平均（双线性插值面的精确积分），
+  体积 = Σ 单元面积 × 单元厚度；
+- 自适应 / 裁剪后的 TIN 网格：按与 Block 相同的三角网，三棱柱体积 = 三角形面积 × 三顶点厚度均值
+  （上下层面均为线性插值时精确）。
+厚度为实际厚度（已除以 z_scale），层面交叉处的负厚度按 0 计，并统计交叉节点数。
+每次只读取两个层面，网格大于内存时同样适用；结果按 build_id 与阈值缓存在
+模型缓存目录的 statistics.json 中。
+"""
+import json
+import os
+import time
+import uuid
+
+import numpy as np
+
+STATS_NAME = "statistics.json"
+
+
+def _cell_geometry(stack):
+    """返回 (单元厚度计算函数, 单元面积数组, 参与统计的节点掩码)。"""
+    if stack.grid_shape is not None:
+        xi, yi = stack.axes()
+        dx, dy = np.diff(xi), np.diff(yi)
+        if np.allclose(dx, dx[0]) and np.allclose(dy, dy[0]):
+            # 等间距网格：单元面积为常数，避免逐单元乘面积
+            area = np.float64(dx[0] * dy[0])
+        else:
+            area = np.outer(dy, dx)
+
+        def cell_thickness(t):
+            t = t.reshape(stack.grid_shape)
+            return 0.25 * (t[:-1, :-1] + t[1:, :-1] + t[:-1, 1:] + t[1:, 1:])
+
+        return cell_thickness, area, None
+
+    tri, valid = stack.triangulation()
+    simplices = tri.simplices[valid]
+    p = np.asarray(stack.xy)[simplices]
+    area = 0.5 * np.abs(
+        (p[:, 1, 0] - p[:, 0, 0]) * (p[:, 2, 1] - p[:, 0, 1])
+        - (p[:, 2, 0] - p[:, 0, 0]) * (p[:, 1, 1] - p[:, 0, 1])
+    )
+    used = np.zeros(len(stack.xy), dtype=bool)
+    used[simplices.ravel()] = True
+
+    def cell_thickness(t):
+        return t[simplices].mean(axis=1)
+
+    return cell_thickness, area, used
+
+
+def compute_statistics(stack, thresholds=()) -> dict:
+    """
+    计算各地层体积与厚度统计。
+    参数:
+        stack: HorizonStack
+        thresholds: 厚度阈值列表，统计厚度不小于各阈值的面积
+    返回:
+        {model_area, cells, strata: [{name, volume, area, mean_thickness, min_thickness, max_thickness,
+         crossing_nodes, area_above: {阈值: 面积}}, ...], seconds}
+        strata 自上而下排列；area 为厚度大于 0 的面积，mean_thickness 为全模型面积加权平均
+    """
+    t0 = time.perf_counter()
+    thresholds = [float(t) for t in thresholds]
+    cell_thickness, area, used = _cell_geometry(stack)
+    uniform = np.ndim(area) == 0
+    n_cells = None
+
+    def area_where(mask):
+        # 满足条件的单元面积之和
+        if uniform:
+            return float(area * np.count_nonzero(mask))
+        return float(area[mask].sum())
+
+    names = stack.layer_names
+    strata = []
+    model_area = None
+    lower = np.asarray(stack.z[0], dtype=np.float64)
+    for i in range(stack.z.shape[0] - 1):
+        upper = np.asarray(stack.z[i + 1], dtype=np.float64)
+        raw = (upper - lower) / stack.z_scale
+        raw_used = raw if used is None else raw[used]
+        cell_t = cell_thickness(np.maximum(raw, 0.0))
+        if model_area is None:
+            n_cells = cell_t.size
+            model_area = float(area * n_cells) if uniform else float(area.sum())
+        volume = float(area * cell_t.sum()) if uniform else float(np.sum(area * cell_t))
+        strata.append({
+            "name": names[i] if i < len(names) else stack.order[i],
+            "volume": volume,
+            "area": area_where(cell_t > 0),
+            "mean_thickness": volume / model_area if model_area > 0 else 0.0,
+            "min_thickness": float(max(raw_used.min(), 0.0)),
+            "max_thickness": float(raw_used.max()),
+            "crossing_nodes": int(np.count_nonzero(raw_used < 0)),
+            "area_above": {str(thr): area_where(cell_t >= thr) for thr in thresholds},
+        })
+        lower = upper
+    return {
+        "model_area": model_area,
+        "cells": n_cells,
+        "strata": strata[::-1],
+        "seconds": round(time.perf_counter() - t0, 4),
+    }
+
+
+def model_statistics(stack, thresholds=(), use_cache: bool = True) -> dict:
+    """
+    带缓存的 compute_statistics：层面缓存未重建且阈值相同时直接读取 statistics.json。
+    """
+    thresholds = sorted(float(t) for t in thresholds)
+    cache_path = os.path.join(stack.path, STATS_NAME)
+    if use_cache and os.path.exists(cache_path):
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            if cached.get("build_id") == stack.build_id and cached.get("thresholds") == thresholds:
+                cached["cached"] = True
+                return cached
+        except (OSError, ValueError):
+            pass
+
+    result = compute_statistics(stack, thresholds)
+    result.update({"build_id": stack.build_id, "thresholds": thresholds})
+    if use_cache:
+        # 并发请求各写各的临时文件；缓存写入失败不影响本次结果
+        tmp = f"{cache_path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(result, f, ensure_ascii=False, indent=2)
+            os.replace(tmp, cache_path)
+        except OSError as e:
+            print(f"[警告] 统计结果缓存写入失败: {e}")
+            if os.path.exists(tmp):
+                os.remove(tmp)
+    result["cached"] = False
+    return result
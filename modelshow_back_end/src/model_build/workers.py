@@ -0,0 +1,257 @@
+"""
+建模工作进程池：在预加载建模模块的独立进程中执行建模任务，按任务数、内存占用或异常替换进程。
+"""
+import atexit
+import multiprocessing
+import os
+import queue
+import shutil
+import sys
+import tempfile
+import threading
+import traceback
+import uuid
+
+import numpy as np
+
+from . import metrics
+
+PRELOAD_MODULES = (
+    "src.model_build.pipeline",
+    "src.model_build.tin_kriging_prism_model",
+    "src.model_build.build_block_pyvista",
+    "src.model_build.subsidence",
+)
+
+
+class BuildWorkerError(RuntimeError):
+    """任务在工作进程中抛出异常，或工作进程异常退出。"""
+
+    def __init__(self, message, remote_traceback=None):
+        super().__init__(message)
+        self.remote_traceback = remote_traceback
+
+
+def _rss_mb():
+    """当前常驻内存 (MB)：Linux 读 /proc/self/statm，其它平台取峰值，不支持时返回 None。"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (2 ** 20 if sys.platform == "darwin" else 1024)
+
+
+class _SpilledArray:
+    """写入共享内存目录的数组，由主进程映射读取。"""
+
+    def __init__(self, path):
+        self.path = path
+
+
+def _spill(obj, spill_dir, spill_bytes):
+    if isinstance(obj, np.ndarray) and obj.nbytes >= spill_bytes and obj.dtype != object:
+        path = os.path.join(spill_dir, f"{uuid.uuid4().hex}.npy")
+        np.save(path, obj)
+        return _SpilledArray(path)
+    if isinstance(obj, dict):
+        return {k: _spill(v, spill_dir, spill_bytes) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(_spill(v, spill_dir, spill_bytes) for v in obj)
+    return obj
+
+
+def _restore(obj):
+    if isinstance(obj, _SpilledArray):
+        array = np.load(obj.path, mmap_mode="r")
+        try:
+            # 映射建立后即可删除文件（Windows 上删除失败的文件在进程池关闭时统一清理）
+            os.remove(obj.path)
+        except OSError:
+            pass
+        return array
+    if isinstance(obj, dict):
+        return {k: _restore(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(_restore(v) for v in obj)
+    return obj
+
+
+def _worker_main(conn, preload, spill_dir, spill_bytes):
+    """工作进程主循环：预加载 → 就绪 → 逐个执行 (func, args, kwargs)，收到 None 退出。"""
+    import importlib
+
+    for name in preload:
+        importlib.import_module(name)
+    metrics.drain()
+    conn.send(("ready", os.getpid(), _rss_mb()))
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+        func, args, kwargs = job
+        try:
+            result = _spill(func(*args, **kwargs), spill_dir, spill_bytes)
+            reply = ("ok", result)
+        except Exception as e:
+            reply = ("error", f"{type(e).__name__}: {e}", traceback.format_exc())
+        conn.send(reply + (_rss_mb(), metrics.drain()))
+
+
+class _Worker:
+    def __init__(self, ctx, preload, spill_dir, spill_bytes):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_worker_main, args=(child_conn, preload, spill_dir, spill_bytes),
+            name="modelshow-build-worker", daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self.ready = False
+        self.jobs = 0
+        self.rss_mb = None
+
+    def recv(self, timeout=None):
+        if not self.conn.poll(timeout):
+            raise TimeoutError(f"建模任务超过 {timeout}s 未完成")
+        try:
+            return self.conn.recv()
+        except (EOFError, OSError):
+            self.process.join(1)
+            raise BuildWorkerError(f"建模进程异常退出 (exit code {self.process.exitcode})")
+
+    def call(self, func, args, kwargs, timeout=None):
+        if not self.ready:
+            _, _, self.rss_mb = self.recv()
+            self.ready = True
+        self.conn.send((func, args, kwargs))
+        reply = self.recv(timeout)
+        self.jobs += 1
+        self.rss_mb = reply[-2]
+        metrics.merge(reply[-1])
+        if reply[0] == "error":
+            raise BuildWorkerError(reply[1], reply[2])
+        return _restore(reply[1])
+
+    def stop(self, timeout=5):
+        if self.process.is_alive():
+            try:
+                self.conn.send(None)
+            except OSError:
+                pass
+            self.process.join(timeout)
+            if self.process.is_alive():
+                self.process.terminate()
+                self.process.join(timeout)
+        self.conn.close()
+
+
+class BuildWorkerPool:
+    """
+    预热的建模工作进程池。
+    参数:
+        workers: 进程数
+        max_jobs: 单个进程最多执行的任务数，之后替换为新进程
+        max_rss_mb: 任务完成后进程常驻内存超过该值 (MB) 即替换，None 不限制
+        preload: 进程启动时预先导入的模块
+        spill_bytes: 返回结果中不小于该字节数的数组经共享内存目录传回
+    """
+
+    def __init__(self, workers: int = 1, max_jobs: int = 20, max_rss_mb: float = 2048,
+                 preload=PRELOAD_MODULES, spill_bytes: int = 1 << 20):
+        self.max_jobs = max_jobs
+        self.max_rss_mb = max_rss_mb
+        self._preload = tuple(preload)
+        self._spill_bytes = spill_bytes
+        self._spill_dir = tempfile.mkdtemp(prefix="modelshow_workers_",
+                                           dir="/dev/shm" if os.path.isdir("/dev/shm") else None)
+        # spawn：不继承 Flask 进程的线程与锁状态，各平台行为一致
+        self._ctx = multiprocessing.get_context("spawn")
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+        self.replaced = 0
+        for _ in range(workers):
+            self._idle.put(self._spawn())
+        atexit.register(self.close)
+
+    def _spawn(self):
+        return _Worker(self._ctx, self._preload, self._spill_dir, self._spill_bytes)
+
+    def _replace(self, worker, reason):
+        worker.stop()
+        with self._lock:
+            self.replaced += 1
+        print(f"[workers] 替换建模进程 {worker.process.pid}：{reason}")
+        metrics.inc("modelshow_build_worker_restarts_total", reason=reason.split(" ")[0])
+        return self._spawn()
+
+    def run(self, func, *args, timeout: float = None, **kwargs):
+        """在空闲的工作进程中执行 func(*args, **kwargs)，阻塞直到返回结果。"""
+        if self._closed:
+            raise RuntimeError("建模进程池已关闭")
+        worker = self._idle.get()
+        try:
+            result = worker.call(func, args, kwargs, timeout)
+        except (TimeoutError, BuildWorkerError) as e:
+            if not worker.process.is_alive() or isinstance(e, TimeoutError):
+                worker = self._replace(worker, "timeout" if isinstance(e, TimeoutError) else "crashed")
+            raise
+        finally:
+            if worker.process.is_alive() and worker.ready:
+                if worker.jobs >= self.max_jobs:
+                    worker = self._replace(worker, f"max_jobs ({worker.jobs})")
+                elif self.max_rss_mb and worker.rss_mb and worker.rss_mb > self.max_rss_mb:
+                    worker = self._replace(worker, f"memory ({worker.rss_mb:.0f}MB)")
+            self._idle.put(worker)
+        return result
+
+    def close(self):
+        """停止全部工作进程并清理共享内存目录。"""
+        if self._closed:
+            return
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().stop()
+            except queue.Empty:
+                break
+        shutil.rmtree(self._spill_dir, ignore_errors=True)
+
+
+# --------------- 任务函数（在工作进程中执行） ---------------
+def build_model(layer_points, catalog_path: str = None, **options) -> dict:
+    """
+    运行 pipeline.run_pipeline，只返回可序列化的摘要；插值结果已保存在 store_path 层面缓存中。
+    catalog_path: 模型目录索引数据库，导出后登记模型
+    """
+    from .catalog import ModelCatalog
+    from .pipeline import run_pipeline
+
+    catalog = ModelCatalog(catalog_path) if catalog_path else None
+    result = run_pipeline(layer_points=layer_points, catalog=catalog, **options)
+    keys = ("output_path", "layer_names", "order", "timings", "report", "store_path", "z_scale")
+    return {k: result.get(k) for k in keys}
+
+
+def subsidence_model(store_path: str, output_path: str, mining_layer, **params) -> dict:
+    """pipeline.stage_subsidence，结果只含路径与统计值。"""
+    from .pipeline import stage_subsidence
+
+    return stage_subsidence(store_path, output_path, mining_layer, **params)
+
+
+def store_thumbnail(store_path: str, model_path: str):
+    """由层面缓存渲染模型缩略图，返回缩略图路径或 None。"""
+    from .horizon_store import HorizonStack
+    from .thumbnails import write_thumbnail
+
+    return write_thumbnail(HorizonStack.open(store_path).to_block(), model_path)
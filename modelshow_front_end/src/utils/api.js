@@ -107,6 +107,30 @@ export const modelAPI = {
             console.error('生成地质模型失败:', error.response || error);
             throw new Error(`生成模型失败: ${error.response?.data?.message || error.message}`);
         }
+    },
+
+    // 获取模型目录（/api/models），params 如 { type: 'gltf' }
+    async getModelList(params = {}) {
+        try {
+            const response = await apiClient.get('/api/models', { params });
+            return response.data;
+        } catch (error) {
+            console.error('获取模型列表失败:', error.response || error);
+            throw new Error(`获取模型列表失败: ${error.message}`);
+        }
+    },
+
+    // 开采沉陷：在模型的层面缓存上计算沉陷，返回带变形目标的派生模型地址 (url)
+    async computeSubsidence(model, data) {
+        try {
+            const response = await apiClient.post(`/api/model/${encodeURIComponent(model)}/subsidence`, data, {
+                timeout: 120000 // 沉陷计算与导出在建模进程中执行
+            });
+            return response.data;
+        } catch (error) {
+            console.error('计算开采沉陷失败:', error.response || error);
+            throw new Error(`计算沉陷失败: ${error.response?.data?.message || error.message}`);
+        }
     }
 };
 
@@ -162,6 +186,8 @@ export const uploadStratumData = stratumAPI.uploadData;
 export const getStratumFiles = stratumAPI.getFileList;
 export const getStratumData = stratumAPI.getData;
 export const generateGeologicalModel = modelAPI.generateGeological;
+export const getModelList = modelAPI.getModelList;
+export const computeSubsidence = modelAPI.computeSubsidence;
 
 // 导出默认的 axios 实例
 export default apiClient;
\ No newline at end of file